@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Persistent cache for YouTube Data API responses
+SQLite-backed, keyed by endpoint + parameters, with per-endpoint TTLs and LRU/size eviction,
+plus a dedicated per-video cache of caption availability
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# Seconds a cached response stays fresh, per endpoint (0 disables caching for that endpoint)
+DEFAULT_TTLS = {
+    'channels.list': 7 * 24 * 3600,
+    'playlistItems.list': 12 * 3600,
+    'videos.list': 6 * 3600,
+    'commentThreads.list': 24 * 3600,
+    'comments.list': 24 * 3600,
+    'captions.list': 0,  # Cached per video by CaptionInfoCache instead
+    'search.list': 30 * 24 * 3600,
+}
+
+
+class ApiResponseCache:
+    """Thread-safe on-disk response cache shared by every extractor worker"""
+
+    def __init__(self, path: str, ttls: Optional[Dict[str, int]] = None,
+                 max_entries: int = 200_000, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_eviction = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                params TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """Stable cache key for an endpoint and its request parameters"""
+        canonical = json.dumps(params, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(f"{endpoint}?{canonical}".encode('utf-8')).hexdigest()
+
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Return a fresh cached response, or None"""
+        if not self.ttls.get(endpoint):
+            return None
+
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, endpoint: str, params: Dict, response: Dict):
+        """Store a response under its endpoint TTL"""
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return
+
+        key = self.make_key(endpoint, params)
+        body = zlib.compress(json.dumps(response, separators=(',', ':')).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(params, sort_keys=True, default=str),
+                 body, len(body), now, now + ttl, now)
+            )
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= 100:
+                self._evict()
+
+    def _evict(self):
+        """Drop expired rows, then least recently used rows beyond the entry/size limits (caller holds the lock)"""
+        self._writes_since_eviction = 0
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Walk rows oldest-access first and cut once both limits are satisfied
+        cutoff = None
+        for last_access, size in self._conn.execute(
+            "SELECT last_access, size FROM responses ORDER BY last_access"
+        ):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            count -= 1
+            total_bytes -= size
+            cutoff = last_access
+        if cutoff is not None:
+            self._conn.execute("DELETE FROM responses WHERE last_access <= ?", (cutoff,))
+            self.logger.info(f"🧹 API cache evicted entries last used before {cutoff:.0f}")
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Forget cached responses for one endpoint, or everything"""
+        with self._lock:
+            if endpoint:
+                self._conn.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            else:
+                self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and on-disk footprint"""
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'entries': count, 'bytes': total_bytes}
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+
+# Caption tracks rarely change once a video is public
+CAPTION_INFO_TTL = 180 * 24 * 3600
+
+
+class CaptionInfoCache:
+    """
+    Parsed caption availability keyed by video_id, so each video's 50-unit captions.list call
+    is paid once per TTL instead of on every run that touches its channel
+    """
+
+    def __init__(self, path: str, ttl: int = CAPTION_INFO_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS caption_info (
+                video_id TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """Caption info checked within the TTL, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info, checked_at FROM caption_info WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if row is None or row[1] + self.ttl < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, video_id: str, info: Dict):
+        self.set_many([(video_id, info)])
+
+    def set_many(self, items: Iterable[Tuple[str, Dict]]) -> int:
+        """Store caption info for several videos in one transaction; returns how many were written"""
+        now = time.time()
+        rows = [(video_id, json.dumps(info), now) for video_id, info in items]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO caption_info VALUES (?, ?, ?)", rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM caption_info LIMIT 1").fetchone() is None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM caption_info").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': count}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
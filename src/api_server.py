@@ -10,7 +10,7 @@ import sys
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 try:
     from fastapi import FastAPI, HTTPException, UploadFile, File, Form
@@ -19,7 +19,7 @@ try:
     from fastapi.responses import FileResponse
     import pandas as pd
     # Import ML prediction system with relative import
-    from .prediction_api import YouTubePredictionSystem
+    from .prediction_api import YouTubePredictionSystem, parse_batch_candidates, parse_sweep_titles
 except ImportError:
     print("Missing dependencies! Install with: pip install fastapi uvicorn pandas")
     sys.exit(1)
@@ -717,6 +717,42 @@ async def get_services_status():
         "timestamp": datetime.now().isoformat()
     }
 
+VALID_PREDICTION_GENRES = ['gaming', 'education_science', 'challenge_stunts', 'catholic', 'other', 'kids_family']
+
+
+def build_video_data(tags: Optional[Union[str, List[str]]] = None, description: Optional[str] = None,
+                     duration_seconds: Optional[int] = None, like_count: Optional[int] = None,
+                     comment_count: Optional[int] = None, has_captions: Optional[bool] = True) -> Dict:
+    """Optional prediction inputs as the video_data dict used for feature engineering"""
+    video_data = {}
+    
+    # Parse tags if provided; a list (batch JSON) is used as given so tags may contain commas
+    if isinstance(tags, list):
+        video_data['tags'] = tags
+    elif tags:
+        try:
+            import ast
+            video_data['tags'] = ast.literal_eval(tags) if tags.startswith('[') else tags.split(',')
+        except (ValueError, SyntaxError):
+            video_data['tags'] = tags.split(',')
+    
+    # Add other features if provided
+    if description:
+        video_data['description'] = description
+        video_data['description_length'] = len(description)
+    
+    if duration_seconds:
+        video_data['duration_seconds'] = duration_seconds
+        
+    if like_count is not None:
+        video_data['like_count'] = like_count
+        
+    if comment_count is not None:
+        video_data['comment_count'] = comment_count
+        
+    video_data['has_captions'] = has_captions
+    return video_data
+
 # ML Prediction endpoint
 @app.post("/api/predict")
 async def predict_video_performance(
@@ -739,9 +775,8 @@ async def predict_video_performance(
     
     try:
         # Validate genre
-        valid_genres = ['gaming', 'education_science', 'challenge_stunts', 'catholic', 'other', 'kids_family']
-        if genre not in valid_genres:
-            raise HTTPException(status_code=400, detail=f"Invalid genre. Must be one of: {valid_genres}")
+        if genre not in VALID_PREDICTION_GENRES:
+            raise HTTPException(status_code=400, detail=f"Invalid genre. Must be one of: {VALID_PREDICTION_GENRES}")
         
         # Process thumbnail if provided
         thumbnail_data = None
@@ -749,31 +784,7 @@ async def predict_video_performance(
             thumbnail_data = await thumbnail.read()
         
         # Prepare additional video data for feature engineering
-        video_data = {}
-        
-        # Parse tags if provided
-        if tags:
-            try:
-                import ast
-                video_data['tags'] = ast.literal_eval(tags) if tags.startswith('[') else tags.split(',')
-            except (ValueError, SyntaxError):
-                video_data['tags'] = tags.split(',')
-        
-        # Add other features if provided
-        if description:
-            video_data['description'] = description
-            video_data['description_length'] = len(description)
-        
-        if duration_seconds:
-            video_data['duration_seconds'] = duration_seconds
-            
-        if like_count is not None:
-            video_data['like_count'] = like_count
-            
-        if comment_count is not None:
-            video_data['comment_count'] = comment_count
-            
-        video_data['has_captions'] = has_captions
+        video_data = build_video_data(tags, description, duration_seconds, like_count, comment_count, has_captions)
         
         # Make prediction using the ML system
         result = predictor.predict_performance(
@@ -792,6 +803,93 @@ async def predict_video_performance(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Internal server error during prediction.")
 
+@app.post("/api/predict/batch")
+async def predict_video_performance_batch(
+    candidates: str = Form(...),
+    thumbnails: Optional[List[UploadFile]] = File(None)
+):
+    """
+    Predict many title/thumbnail candidates at once (one model call per model for the whole batch)
+    `candidates` is a JSON list of objects with the /api/predict fields plus an optional
+    thumbnail_index into the uploaded `thumbnails`
+    """
+    
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="ML prediction system not available")
+    
+    thumbnail_data = [await thumbnail.read() for thumbnail in thumbnails or []]
+    candidates = parse_batch_candidates(candidates, len(thumbnail_data))
+    
+    for i, candidate in enumerate(candidates):
+        if candidate['genre'] not in VALID_PREDICTION_GENRES:
+            raise HTTPException(status_code=400, detail=f"Candidate {i}: invalid genre. Must be one of: {VALID_PREDICTION_GENRES}")
+    
+    try:
+        batch = []
+        for candidate in candidates:
+            video_data = build_video_data(
+                tags=candidate.get('tags'),
+                description=candidate.get('description'),
+                duration_seconds=candidate.get('duration_seconds'),
+                like_count=candidate.get('like_count'),
+                comment_count=candidate.get('comment_count'),
+                has_captions=candidate.get('has_captions', True)
+            )
+            batch.append({
+                'title': candidate['title'],
+                'genre': candidate['genre'],
+                'subscriber_count': candidate['subscriber_count'],
+                'thumbnail_index': candidate.get('thumbnail_index'),
+                'video_data': video_data
+            })
+        
+        predictions = predictor.predict_performance_batch(batch, thumbnail_data)
+        return {"count": len(predictions), "predictions": predictions}
+        
+    except Exception as e:
+        print(f"❌ Batch prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Internal server error during prediction.")
+
+@app.post("/api/predict/sweep")
+async def predict_variant_sweep(
+    title: str = Form(...),
+    genre: str = Form(...),
+    subscriber_count: int = Form(...),
+    title_variants: Optional[str] = Form(None),
+    thumbnails: Optional[List[UploadFile]] = File(None),
+    tags: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    duration_seconds: Optional[int] = Form(None),
+    like_count: Optional[int] = Form(None),
+    comment_count: Optional[int] = Form(None),
+    has_captions: Optional[bool] = Form(True)
+):
+    """
+    A/B sweep: score every title x thumbnail combination of one video, ranked by performance score
+    `title_variants` is a JSON list of alternative titles; the other fields are held fixed
+    """
+    
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="ML prediction system not available")
+    
+    if genre not in VALID_PREDICTION_GENRES:
+        raise HTTPException(status_code=400, detail=f"Invalid genre. Must be one of: {VALID_PREDICTION_GENRES}")
+    
+    thumbnail_data = [await thumbnail.read() for thumbnail in thumbnails or []]
+    titles = parse_sweep_titles(title, title_variants, len(thumbnail_data))
+    
+    try:
+        video_data = build_video_data(tags, description, duration_seconds, like_count, comment_count, has_captions)
+        return predictor.predict_variant_sweep(titles, genre, subscriber_count, thumbnail_data, video_data)
+        
+    except Exception as e:
+        print(f"❌ Sweep prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Internal server error during prediction.")
+
 # API Health check endpoint
 @app.get("/api/health")
 async def health_check():
@@ -814,6 +912,7 @@ async def get_models_status():
         "models_loaded": list(predictor.models.keys()),
         "scalers_loaded": list(predictor.scalers.keys()),
         "total_models": len(predictor.models),
+        "thumbnail_cache": predictor.thumbnail_processor.feature_cache.stats(),
         "status": "ready"
     }
 
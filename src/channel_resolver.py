@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Channel ID resolution and batched channel metadata for the YouTube extractor
+Handles resolve through a persistent handle -> ID cache, then channels.list(forHandle) (1 unit),
+then search.list (100 units) as a last resort; metadata is fetched 50 channel IDs per call
+(statistics included: channels.list costs 1 unit whatever parts are requested)
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from rate_limiter import QuotaExhaustedError
+from youtube_client import ApiCallFailed
+
+
+CHANNEL_PARTS = 'snippet,contentDetails,statistics'
+BATCH_SIZE = 50  # channels.list accepts up to 50 comma-separated IDs
+
+
+def is_placeholder_id(channel_id: Optional[str]) -> bool:
+    """Channel lists use "TBD" (or nothing) for IDs nobody has looked up yet"""
+    return not channel_id or channel_id.strip().upper() == 'TBD'
+
+
+def load_channel_list(path: str) -> Dict[str, List[Dict]]:
+    """
+    Load a {genre: [channel, ...]} list such as config/channel_lists/*.json
+    Lists that only carry a single `tier` get it as global_tier, matching the built-in configuration
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        channel_lists = json.load(f)
+
+    for channels in channel_lists.values():
+        for channel_info in channels:
+            if 'tier' in channel_info:
+                channel_info.setdefault('global_tier', channel_info['tier'])
+            if is_placeholder_id(channel_info.get('channel_id')):
+                channel_info['channel_id'] = None
+    return channel_lists
+
+
+class ChannelResolver:
+    """Resolve handles and prefetch channel metadata; `execute` is the extractor's quota-aware API call"""
+
+    def __init__(self, execute: Callable[..., Dict], cache_file: Optional[str] = None):
+        self.execute = execute
+        self.cache_file = cache_file
+        self.logger = logging.getLogger(__name__)
+        self.handle_ids = {}   # normalised handle -> channel ID (persisted)
+        self.channels = {}     # channel ID -> channels.list item (this run only)
+        self._unresolved = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    self.handle_ids = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Could not read channel ID cache {cache_file}: {e}")
+
+    @staticmethod
+    def normalize_handle(handle: str) -> str:
+        return handle.strip().lstrip('@').lower()
+
+    def resolve_handle(self, handle: str) -> Optional[str]:
+        """Channel ID for an @handle: cache, then channels.list(forHandle), then search.list"""
+        key = self.normalize_handle(handle)
+        if not key:
+            return None
+        with self._lock:
+            if key in self.handle_ids:
+                return self.handle_ids[key]
+            if key in self._unresolved:
+                return None
+
+        channel_id = None
+        try:
+            response = self.execute('channels.list', part=CHANNEL_PARTS, forHandle=f"@{key}")
+            if response.get('items'):
+                channel = response['items'][0]
+                channel_id = channel['id']
+                with self._lock:
+                    self.channels[channel_id] = channel
+            else:
+                # Legacy custom names are not handles; fall back to the expensive search
+                response = self.execute('search.list', part='snippet', q=key, type='channel', maxResults=1)
+                if response.get('items'):
+                    channel_id = response['items'][0]['snippet']['channelId']
+        except (QuotaExhaustedError, ApiCallFailed):
+            # A failed call says nothing about the handle, so it is not marked unresolved
+            raise
+        except Exception as e:
+            self.logger.error(f"Error resolving handle {handle}: {e}")
+            return None
+
+        with self._lock:
+            if channel_id:
+                self.handle_ids[key] = channel_id
+                self._dirty = True
+            else:
+                self._unresolved.add(key)
+        return channel_id
+
+    def prefetch(self, channel_ids: Iterable[str]) -> int:
+        """Fetch metadata for channels not seen yet, 50 IDs per channels.list call; returns calls made"""
+        with self._lock:
+            missing = list(dict.fromkeys(cid for cid in channel_ids if cid and cid not in self.channels))
+
+        calls = 0
+        for i in range(0, len(missing), BATCH_SIZE):
+            batch = missing[i:i + BATCH_SIZE]
+            response = self.execute('channels.list', part=CHANNEL_PARTS, id=','.join(batch), maxResults=BATCH_SIZE)
+            calls += 1
+            with self._lock:
+                for channel in response.get('items', []):
+                    self.channels[channel['id']] = channel
+        return calls
+
+    def get(self, channel_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self.channels.get(channel_id)
+
+    def save(self):
+        """Persist newly learned handle -> ID mappings"""
+        with self._lock:
+            if not self.cache_file or not self._dirty:
+                return
+            if os.path.dirname(self.cache_file):
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = f"{self.cache_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.handle_ids, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.cache_file)
+            self._dirty = False
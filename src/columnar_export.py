@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Typed columnar (Parquet) export of the flattened ML video table
+Same rows as api_only_ml_dataset.csv, but with int64/bool/timestamp dtypes and parsed
+duration seconds, so analysis can read only the columns and row groups it needs
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from isodate import parse_duration
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency: pip install pyarrow
+    pa = None
+    pq = None
+
+
+ML_PARQUET_FILE = "extracted_data/api_only_ml_dataset.parquet"
+
+# CSV columns plus duration_seconds, in CSV order
+COLUMNS = ('video_id', 'channel_name', 'genre', 'global_tier', 'genre_tier', 'title',
+           'view_count', 'like_count', 'comment_count', 'duration', 'duration_seconds',
+           'published_at', 'tags_count', 'title_length', 'description_length',
+           'channel_subscriber_count', 'performance_category',
+           'has_captions', 'has_english_captions', 'has_auto_captions', 'has_manual_captions')
+
+INT_COLUMNS = ('view_count', 'like_count', 'comment_count', 'duration_seconds', 'tags_count',
+               'title_length', 'description_length', 'channel_subscriber_count')
+BOOL_COLUMNS = ('has_captions', 'has_english_captions', 'has_auto_captions', 'has_manual_captions')
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def _schema():
+    fields = []
+    for name in COLUMNS:
+        if name in INT_COLUMNS:
+            fields.append(pa.field(name, pa.int64()))
+        elif name in BOOL_COLUMNS:
+            fields.append(pa.field(name, pa.bool_()))
+        elif name == 'published_at':
+            fields.append(pa.field(name, pa.timestamp('s', tz='UTC')))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _duration_seconds(duration: str) -> Optional[int]:
+    try:
+        return int(parse_duration(duration).total_seconds())
+    except Exception:
+        return None
+
+
+def _timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _typed_row(row: Dict) -> Dict:
+    """Coerce one CSV-shaped row to the Parquet schema"""
+    typed = dict(row)
+    typed['duration_seconds'] = _duration_seconds(row.get('duration', ''))
+    typed['published_at'] = _timestamp(row.get('published_at', ''))
+    for name in INT_COLUMNS:
+        if name != 'duration_seconds':
+            typed[name] = int(row.get(name) or 0)
+    for name in BOOL_COLUMNS:
+        typed[name] = bool(row.get(name))
+    return typed
+
+
+def write_ml_parquet(rows: Iterable[Dict], path: str = ML_PARQUET_FILE, batch_size: int = 10000) -> int:
+    """
+    Stream rows into a Parquet file in record batches; returns the row count
+    Rows arrive grouped by channel, so row-group min/max statistics let filters on
+    channel_name/genre skip whole groups
+    """
+    if not parquet_available():
+        raise ImportError("pyarrow is required for Parquet export: pip install pyarrow")
+
+    schema = _schema()
+    tmp_path = f"{path}.tmp"
+    total = 0
+    batch = []
+    with pq.ParquetWriter(tmp_path, schema, compression='zstd') as writer:
+        for row in rows:
+            batch.append(_typed_row(row))
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                total += len(batch)
+                batch = []
+        if batch or total == 0:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            total += len(batch)
+    os.replace(tmp_path, path)
+    return total
+
+
+def load_ml_dataset(path: str = ML_PARQUET_FILE, columns: Optional[List[str]] = None,
+                    filters=None):
+    """
+    Load the ML table as a pandas DataFrame, reading only `columns` and row groups matching `filters`
+    e.g. load_ml_dataset(columns=['view_count', 'genre'], filters=[('genre', '=', 'education')])
+    """
+    if not parquet_available():
+        raise ImportError("pyarrow is required to read the Parquet dataset: pip install pyarrow")
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
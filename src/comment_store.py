@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Indexed store for raw comments
+SQLite tables keyed by comment_id / video_id / channel name give O(1) "already stored?" checks
+and append-only inserts; the JSON files sentiment tooling reads are exported on demand
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+
+COMMENT_DB_FILENAME = "comments.sqlite"
+ALL_COMMENTS_FILENAME = "all_comments_raw.json"
+
+# Channel-level fields carried on every record of all_comments_raw.json but not the per-channel files
+CHANNEL_FIELDS = ('channel_name', 'genre', 'global_tier', 'genre_tier')
+
+
+def channel_file_name(channel_name: str) -> str:
+    safe_name = channel_name.replace(' ', '_').replace('/', '_')
+    return f"{safe_name}_comments.json"
+
+
+class CommentStore:
+    """Thread-safe comment store shared by the extractor's merge loop and exports"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS comments (
+                comment_id TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                channel_name TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_comments_video ON comments (video_id);
+            CREATE INDEX IF NOT EXISTS idx_comments_channel ON comments (channel_name);
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                channel_name TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS channels (
+                channel_name TEXT PRIMARY KEY,
+                stored_at REAL NOT NULL
+            );
+        """)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM comments LIMIT 1").fetchone() is None
+
+    def has_channel(self, channel_name: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM channels WHERE channel_name = ?", (channel_name,)
+            ).fetchone() is not None
+
+    def has_video(self, video_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone() is not None
+
+    def has_comment(self, comment_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM comments WHERE comment_id = ?", (comment_id,)
+            ).fetchone() is not None
+
+    def add_channel(self, channel_name: str, channel_record: Dict) -> int:
+        """Insert every comment of a finished channel record; returns how many were new"""
+        channel_info = channel_record['channel_info']
+        channel_fields = {
+            'channel_name': channel_name,
+            'genre': channel_record['genre'],
+            'global_tier': channel_info.get('global_tier', 'Unknown'),
+            'genre_tier': channel_info.get('genre_tier', 'Unknown')
+        }
+        now = time.time()
+        rows = []
+        videos = []
+        for video in channel_record['videos']:
+            videos.append((video['video_id'], channel_name, now))
+            for comment in video.get('comments', []):
+                record = {
+                    'video_id': video['video_id'],
+                    **channel_fields,
+                    'performance_category': video.get('performance_category', 'unknown'),
+                    **comment
+                }
+                rows.append((comment['comment_id'], video['video_id'], channel_name,
+                             json.dumps(record, ensure_ascii=False)))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany("INSERT OR IGNORE INTO comments VALUES (?, ?, ?, ?)", rows)
+                inserted = self._conn.total_changes - before
+                self._conn.executemany("INSERT OR REPLACE INTO videos VALUES (?, ?, ?)", videos)
+                self._conn.execute("INSERT OR REPLACE INTO channels VALUES (?, ?)", (channel_name, now))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return inserted
+
+    def iter_comments(self, channel_name: Optional[str] = None) -> Iterator[Dict]:
+        """Comment records in insertion order, optionally for one channel"""
+        query = "SELECT record FROM comments"
+        params = ()
+        if channel_name is not None:
+            query += " WHERE channel_name = ?"
+            params = (channel_name,)
+        query += " ORDER BY rowid"
+
+        # A separate read connection keeps long exports from blocking inserts
+        conn = sqlite3.connect(self.path)
+        try:
+            for (record,) in conn.execute(query, params):
+                yield json.loads(record)
+        finally:
+            conn.close()
+
+    def export_json(self, path: str, channel_name: Optional[str] = None):
+        """
+        Stream comments into a JSON array (same layout as json.dump(..., indent=2))
+        Per-channel exports drop the channel-level fields, matching <channel>_comments.json
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            first = True
+            for record in self.iter_comments(channel_name):
+                if channel_name is not None:
+                    record = {key: value for key, value in record.items() if key not in CHANNEL_FIELDS}
+                body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+                f.write(f'{"" if first else ","}\n  {body}')
+                first = False
+            f.write(']' if first else '\n]')
+        os.replace(tmp_path, path)
+
+    def import_json(self, path: str) -> int:
+        """Load a legacy all_comments_raw.json into the store (existing comment_ids are kept)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO comments VALUES (?, ?, ?, ?)",
+                    ((r['comment_id'], r['video_id'], r['channel_name'], json.dumps(r, ensure_ascii=False))
+                     for r in records)
+                )
+                inserted = self._conn.total_changes - before
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO videos VALUES (?, ?, ?)",
+                    {(r['video_id'], r['channel_name'], now) for r in records}
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO channels VALUES (?, ?)",
+                    {(r['channel_name'], now) for r in records}
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return inserted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'comments': self._conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0],
+                'videos': self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0],
+                'channels': self._conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -7,22 +7,37 @@ Focus: Reliable data extraction with realistic expectations
 
 import os
 import json
-import csv
 import logging
+import threading
 import time
-import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional
-import requests
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 from isodate import parse_duration
 from scipy import stats
 
+from rate_limiter import QuotaScheduler, QuotaExhaustedError, QuotaDeferredError
+from thumbnail_store import ThumbnailDownloader
+from api_cache import CAPTION_INFO_TTL, ApiResponseCache, CaptionInfoCache
+from video_selection import StreamingSelector, split_target
+from extraction_storage import ExtractionStore
+from columnar_export import parquet_available, write_ml_parquet
+from csv_upsert import UpsertCsvWriter
+from comment_store import ALL_COMMENTS_FILENAME, COMMENT_DB_FILENAME, CommentStore, channel_file_name
+from channel_resolver import CHANNEL_PARTS, ChannelResolver, is_placeholder_id, load_channel_list
+from youtube_client import ApiCallFailed, KeyPool, RETRYABLE, RetryPolicy, classify_error, is_quota_exceeded, mask_key
+from retry_queue import CHANNEL_UNIT, RETRY_QUEUE_FILENAME, RetryQueue
+from enrichment_journal import ENRICHMENT_FIELDS, JOURNAL_FILENAME, EnrichmentJournal
+
 load_dotenv()
 PROGRESS_FILE = "extracted_data/progress_tracker.json"
 CHANNEL_ID_CACHE_FILE = "extracted_data/channel_id_cache.json"
+API_CACHE_FILE = "extracted_data/api_cache.sqlite"
+KEY_USAGE_FILE = "extracted_data/key_usage.json"
+CAPTION_CACHE_FILE = "extracted_data/caption_cache.sqlite"
 
 class CorrectedDataExtractor:
     """
@@ -30,14 +45,96 @@ class CorrectedDataExtractor:
     No transcript download (requires video ownership)
     """
     
-    def __init__(self, api_key: str, test_mode: bool = False, max_channels: int = 2):
+    def __init__(self, api_key: str, test_mode: bool = False, max_channels: int = 2,
+                 max_workers: int = 1, max_video_workers: int = 8, api_rate_limit: float = 10.0,
+                 daily_quota: int = 10000, quota_reserve: int = 500,
+                 thumbnail_pool_size: Optional[int] = None, thumbnail_timeout: float = 15.0,
+                 thumbnail_retries: int = 3, revalidate_thumbnails: bool = False,
+                 api_cache_file: Optional[str] = API_CACHE_FILE, api_cache_ttls: Optional[Dict[str, int]] = None,
+                 max_uploads_scanned: Optional[int] = None, published_after: Optional[str] = None,
+                 videos_per_channel: int = 40, selection_strata: Optional[Tuple[int, int, int]] = None,
+                 export_all_comments: bool = False, comments_per_video: int = 100,
+                 include_comment_replies: bool = False, comment_quota_budget: Optional[int] = None,
+                 caption_cache_file: Optional[str] = CAPTION_CACHE_FILE, caption_cache_ttl: int = CAPTION_INFO_TTL,
+                 refresh_captions: bool = False, channel_list_file: Optional[str] = None,
+                 channel_id_cache_file: Optional[str] = CHANNEL_ID_CACHE_FILE,
+                 api_keys: Optional[List[str]] = None, quota_per_key: int = 10000,
+                 key_usage_file: Optional[str] = KEY_USAGE_FILE,
+                 max_retries: int = 5, retry_base_delay: float = 1.0,
+                 client_factory: Optional[Callable[[str], Any]] = None, api_endpoint: Optional[str] = None):
         self.api_key = api_key
-        self.youtube = build('youtube', 'v3', developerKey=api_key)
+        # Alternative API root (e.g. mock_youtube_api.py serve) or a factory building clients
+        # per key (e.g. mock_client_factory for an in-process fake transport)
+        self.api_endpoint = api_endpoint
+        # Calls are spread over every key given (api_key alone by default), each with its own daily quota;
+        # usage is saved per quota day so a restart does not hand each key a fresh budget.
+        # googleapiclient (httplib2) is not thread-safe, so each worker thread gets its own client per key
+        self.key_pool = KeyPool(api_keys or [api_key], client_factory or self._build_client,
+                                quota_per_key=quota_per_key, usage_file=key_usage_file)
+        self.key_pool.client(self.key_pool.keys[0])
         self.setup_logging()
 
         # Test mode controls
         self.test_mode = test_mode
         self.max_channels = max_channels
+
+        # Number of channels extracted concurrently (1 = sequential)
+        self.max_workers = max(1, max_workers)
+        self._state_lock = threading.RLock()
+
+        # Per-video enrichment pool size
+        self.max_video_workers = max(1, max_video_workers)
+
+        # Optional stopping rules for scanning each uploads playlist
+        self.max_uploads_scanned = max_uploads_scanned
+        self.published_after = published_after
+
+        # Per-channel selection target and optional (top, bottom, random) override
+        self.videos_per_channel = videos_per_channel
+        self.selection_strata = selection_strata
+
+        # Rebuild comments_raw/all_comments_raw.json from the comment store at the end of a run
+        self.export_all_comments = export_all_comments
+
+        # Comment harvest depth: comments (threads + replies) per video, and units this run may
+        # spend on comment pages in total, first pages included (None = no separate cap)
+        self.comments_per_video = comments_per_video
+        self.include_comment_replies = include_comment_replies
+        self.comment_quota_budget = comment_quota_budget
+        self.comment_units_used = 0
+
+        # Rate-limit and transient errors are retried with jittered exponential backoff; units that
+        # still fail are queued (retry_queue.json in the output folder) and replayed on the next run
+        self.retry_policy = RetryPolicy(max_attempts=max_retries, base_delay=retry_base_delay)
+        self.retry_queue = None
+        
+        # Write-ahead journal of each channel's selection and finished per-video steps
+        # (enrichment_journal.jsonl in the output folder), replayed when a channel is resumed
+        self.journal = None
+        
+        # Every API call is paced and charged against the daily budget by one shared scheduler
+        self.scheduler = QuotaScheduler(daily_budget=daily_quota, rate=api_rate_limit,
+                                        reserve_units=quota_reserve)
+
+        # Responses are served from the on-disk cache before any quota is spent (None disables it)
+        self.api_cache = ApiResponseCache(api_cache_file, ttls=api_cache_ttls) if api_cache_file else None
+
+        # Caption availability per video; refresh_captions re-checks every video regardless of age
+        self.caption_cache = CaptionInfoCache(caption_cache_file, ttl=caption_cache_ttl) if caption_cache_file else None
+        self.refresh_captions = refresh_captions
+
+        # Optional {genre: [channel, ...]} list replacing the built-in configuration;
+        # handle -> ID lookups are cached on disk and channel metadata is fetched in batches of 50
+        self.channel_list_file = channel_list_file
+        self.channel_resolver = ChannelResolver(self._execute, cache_file=channel_id_cache_file)
+
+        # Pooled keep-alive session for thumbnails; sized so every enrichment worker gets a connection
+        self.thumbnail_downloader = ThumbnailDownloader(
+            pool_size=thumbnail_pool_size or self.max_workers * self.max_video_workers,
+            timeout=(5.0, thumbnail_timeout),
+            max_retries=thumbnail_retries,
+            revalidate=revalidate_thumbnails
+        )
         
         # Track extraction progress
         self.quota_used = 0
@@ -53,6 +150,62 @@ class CorrectedDataExtractor:
         # Also remove any other potential API key patterns
         sanitized = re.sub(r'AIza[a-zA-Z0-9_-]{35}', '[API_KEY_REDACTED]', sanitized)
         return sanitized
+
+    def _build_client(self, api_key: str):
+        if self.api_endpoint:
+            return build('youtube', 'v3', developerKey=api_key, client_options={'api_endpoint': self.api_endpoint})
+        return build('youtube', 'v3', developerKey=api_key)
+
+    def _add_quota(self, units: int):
+        """Record quota usage (safe to call from worker threads)"""
+        with self._state_lock:
+            self.quota_used += units
+
+    def _execute(self, endpoint: str, **params) -> Dict:
+        """Execute an API call (e.g. 'videos.list'), from the response cache or once the quota scheduler admits it"""
+        if self.api_cache:
+            cached = self.api_cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+        
+        resource, method = endpoint.split('.')
+        attempt = 0
+        while True:
+            attempt += 1
+            # Every attempt is paced and charged: YouTube bills failed requests too
+            cost = self.scheduler.admit(endpoint)
+            self._add_quota(cost)
+            try:
+                response = self._send(resource, method, cost, params)
+                break
+            except Exception as e:
+                error_class = classify_error(e)
+                if not self.retry_policy.should_retry(error_class, attempt):
+                    if error_class in RETRYABLE:
+                        raise ApiCallFailed(endpoint, error_class, attempt,
+                                            self._sanitize_error_message(str(e))) from e
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                self.logger.warning(f"🔁 {endpoint} {error_class} error (attempt {attempt}/{self.retry_policy.max_attempts}), "
+                                    f"retrying in {delay:.1f}s: {self._sanitize_error_message(str(e))}")
+                time.sleep(delay)
+        
+        if self.api_cache:
+            self.api_cache.set(endpoint, params, response)
+        return response
+    
+    def _send(self, resource: str, method: str, cost: int, params: Dict) -> Dict:
+        """Send one request on the key with the most budget left; on quotaExceeded retire the key and try the next"""
+        while True:
+            api_key = self.key_pool.acquire(cost)
+            request = getattr(getattr(self.key_pool.client(api_key), resource)(), method)(**params)
+            try:
+                return request.execute()
+            except HttpError as e:
+                if not is_quota_exceeded(e):
+                    raise
+                self.key_pool.mark_exhausted(api_key)
+                self.logger.warning(f"🔑 Key {mask_key(api_key)} is out of quota, failing over")
         
     def setup_logging(self):
         """Setup logging for extraction process"""
@@ -74,10 +227,13 @@ class CorrectedDataExtractor:
         return set()
 
     def _save_progress(self):
-        """Save progress tracker"""
+        """Save progress tracker (atomic write, serialized across worker threads)"""
         os.makedirs(os.path.dirname(PROGRESS_FILE), exist_ok=True)
-        with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
-            json.dump({"processed_channels": list(self.processed_channels)}, f, indent=2)
+        with self._state_lock:
+            tmp_file = f"{PROGRESS_FILE}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"processed_channels": sorted(self.processed_channels)}, f, indent=2)
+            os.replace(tmp_file, PROGRESS_FILE)
 
     def global_size_bucket(self, subs):
         """Raw subscriber bucket (global)"""
@@ -97,7 +253,9 @@ class CorrectedDataExtractor:
         else:                  return "New"
 
     def get_channel_configuration(self) -> Dict:
-        """Get the 25-channel configuration with updated stats and buckets"""
+        """Get the 25-channel configuration with updated stats and buckets (or the configured channel list)"""
+        if self.channel_list_file:
+            return load_channel_list(self.channel_list_file)
         return {
         "challenge_stunts": [
             {"name": "MrBeast", "handle": "@MrBeast", "subs": 430000000, "global_tier": "Mega", "genre_tier": "Large", "channel_id": "UCX6OQ3DkcsbYNE6H8uQQuVA"},
@@ -138,35 +296,49 @@ class CorrectedDataExtractor:
 
     
     def resolve_channel_handle(self, handle: str) -> Optional[str]:
-        """Resolve @handle to channel ID"""
-        try:
-            # Remove @ if present
-            handle = handle.lstrip('@')
-            
-            # Search for channel by handle
-            response = self.youtube.search().list(
-                part='snippet',
-                q=handle,
-                type='channel',
-                maxResults=1
-            ).execute()
-            
-            self.quota_used += 100  # Search costs 100 units
-            
-            if response['items']:
-                return response['items'][0]['snippet']['channelId']
-            
-        except Exception as e:
-            self.logger.error(f"Error resolving handle {handle}: {e}")
+        """Resolve @handle to channel ID (cached, forHandle lookup first, search as a last resort)"""
+        return self.channel_resolver.resolve_handle(handle)
+    
+    def _resolve_channels(self, pending_channels: List[Tuple[str, Dict]]):
+        """Resolve missing channel IDs and batch-fetch channel metadata for the whole queue up front"""
+        unresolved = 0
+        for _, channel_info in pending_channels:
+            if not is_placeholder_id(channel_info.get('channel_id')):
+                continue
+            try:
+                channel_id = self.resolve_channel_handle(channel_info.get('handle', ''))
+            except QuotaDeferredError as e:
+                self.logger.info(f"⏸️ Deferring handle lookup for {channel_info['name']}: {e}")
+                channel_id = None
+            except QuotaExhaustedError as e:
+                self.logger.warning(f"⛽ Stopping handle resolution before running out of quota: {e}")
+                break
+            except ApiCallFailed as e:
+                # Resolved again when the channel is processed, which queues it for retry if it still fails
+                self.logger.warning(f"🔁 Handle lookup for {channel_info['name']} failed: {e}")
+                channel_id = None
+            if channel_id:
+                channel_info['channel_id'] = channel_id
+            else:
+                unresolved += 1
+        self.channel_resolver.save()
         
-        return None
+        try:
+            calls = self.channel_resolver.prefetch(
+                channel_info['channel_id'] for _, channel_info in pending_channels
+                if not is_placeholder_id(channel_info.get('channel_id'))
+            )
+            self.logger.info(f"🔎 Channel metadata prefetched in {calls} call(s); {unresolved} handle(s) unresolved")
+        except (QuotaExhaustedError, ApiCallFailed) as e:
+            # Channels missing from the prefetch fetch their metadata singly
+            self.logger.warning(f"⛽ Channel metadata prefetch stopped: {e}")
     
     def extract_channel_data(self, channel_info: Dict) -> Dict:
         """Extract basic channel information - optimized to use pre-included data"""
         try:
             # Use pre-included channel_id instead of resolving handle
             channel_id = channel_info.get('channel_id')
-            if not channel_id:
+            if is_placeholder_id(channel_id):
                 # Fallback to handle resolution if channel_id not provided
                 self.logger.warning(f"No channel_id provided for {channel_info.get('name')}, falling back to handle resolution")
                 channel_id = self.resolve_channel_handle(channel_info.get('handle', ''))
@@ -174,56 +346,63 @@ class CorrectedDataExtractor:
                     self.logger.error(f"Could not resolve channel: {channel_info.get('name')}")
                     return {}
             
-            # Get only essential data we don't already have (description, thumbnail, uploads playlist)
-            response = self.youtube.channels().list(
-                part='snippet,contentDetails',  # Removed 'statistics' since we have subscriber count
-                id=channel_id
-            ).execute()
-            
-            self.quota_used += 1
-            
-            if not response['items']:
-                return {}
-            
-            channel = response['items'][0]
+            # Metadata normally comes from the batched prefetch; fetch singly if it missed
+            channel = self.channel_resolver.get(channel_id)
+            if channel is None:
+                # Description, thumbnail, uploads playlist and statistics (for lists without subscriber counts)
+                response = self._execute('channels.list', part=CHANNEL_PARTS, id=channel_id)
+                
+                if not response['items']:
+                    return {}
+                
+                channel = response['items'][0]
             
             # Use pre-included metrics when available, fallback to API data
+            # (channel lists such as config/channel_lists/*.json carry no subscriber counts)
+            statistics = channel.get('statistics', {})
             return {
                 'channel_id': channel_id,
                 'handle': channel_info.get('handle', ''),
                 'name': channel_info.get('name', channel['snippet']['title']),
                 'title': channel['snippet']['title'],
                 'description': channel['snippet']['description'],
-                'subscriber_count': channel_info.get('subs', 0),  # Use pre-included subscriber count
+                'subscriber_count': channel_info.get('subs', int(statistics.get('subscriberCount', 0))),
                 'global_tier': channel_info.get('global_tier', 'Unknown'),
                 'genre_tier': channel_info.get('genre_tier', 'Unknown'),
-                'video_count': channel_info.get('video_count', 0),  # Can add this to config if needed
-                'view_count': channel_info.get('total_views', 0),   # Can add this to config if needed
+                'video_count': channel_info.get('video_count', int(statistics.get('videoCount', 0))),
+                'view_count': channel_info.get('total_views', int(statistics.get('viewCount', 0))),
                 'thumbnail_url': channel['snippet']['thumbnails']['high']['url'],
                 'uploads_playlist_id': channel['contentDetails']['relatedPlaylists']['uploads']
             }
             
+        except (QuotaExhaustedError, ApiCallFailed):
+            raise
         except Exception as e:
             channel_name = channel_info.get('name', 'Unknown')
             self.logger.error(f"Error extracting channel data for {channel_name}: {e}")
             return {}
     
-    def get_all_channel_videos(self, uploads_playlist_id: str) -> List[Dict]:
-        """Get all videos from a channel's uploads playlist"""
-        videos = []
+    def iter_channel_video_pages(self, uploads_playlist_id: str, max_uploads: Optional[int] = None,
+                                 published_after: Optional[str] = None) -> Iterator[List[Dict]]:
+        """
+        Yield pages of a channel's uploads playlist as they arrive (newest first)
+        Stops early after `max_uploads` videos or at the first upload older than `published_after` (ISO 8601)
+        """
         next_page_token = None
+        scanned = 0
         
         try:
             while True:
-                response = self.youtube.playlistItems().list(
+                response = self._execute(
+                    'playlistItems.list',
                     part='snippet',
                     playlistId=uploads_playlist_id,
                     maxResults=50,
                     pageToken=next_page_token
-                ).execute()
-                
-                self.quota_used += 1
+                )
                 
+                page = []
+                reached_cutoff = False
                 for item in response['items']:
                     video_data = {
                         'video_id': item['snippet']['resourceId']['videoId'],
@@ -231,18 +410,36 @@ class CorrectedDataExtractor:
                         'published_at': item['snippet']['publishedAt'],
                         'thumbnail_url': item['snippet']['thumbnails']['high']['url']
                     }
-                    videos.append(video_data)
+                    if published_after and video_data['published_at'] < published_after:
+                        reached_cutoff = True
+                        break
+                    if max_uploads is not None and scanned >= max_uploads:
+                        reached_cutoff = True
+                        break
+                    page.append(video_data)
+                    scanned += 1
                 
+                if page:
+                    yield page
+                
+                # A limit that lands exactly on a page boundary must not cost another page
+                if max_uploads is not None and scanned >= max_uploads:
+                    reached_cutoff = True
                 next_page_token = response.get('nextPageToken')
-                if not next_page_token:
+                if reached_cutoff or not next_page_token:
                     break
                 
-                # Rate limiting
-                time.sleep(0.1)
-                
+        except (QuotaExhaustedError, ApiCallFailed):
+            raise
         except Exception as e:
             self.logger.error(f"Error getting channel videos: {e}")
-        
+    
+    def get_all_channel_videos(self, uploads_playlist_id: str, max_uploads: Optional[int] = None,
+                               published_after: Optional[str] = None) -> List[Dict]:
+        """Get all videos from a channel's uploads playlist"""
+        videos = []
+        for page in self.iter_channel_video_pages(uploads_playlist_id, max_uploads, published_after):
+            videos.extend(page)
         return videos
     
     def get_video_details(self, video_ids: List[str]) -> List[Dict]:
@@ -254,12 +451,11 @@ class CorrectedDataExtractor:
             batch_ids = video_ids[i:i+50]
             
             try:
-                response = self.youtube.videos().list(
+                response = self._execute(
+                    'videos.list',
                     part='snippet,statistics,contentDetails',
                     id=','.join(batch_ids)
-                ).execute()
-                
-                self.quota_used += 1
+                )
                 
                 for video in response['items']:
                     video_data = {
@@ -276,9 +472,8 @@ class CorrectedDataExtractor:
                     }
                     detailed_videos.append(video_data)
                 
-                # Rate limiting
-                time.sleep(0.1)
-                
+            except (QuotaExhaustedError, ApiCallFailed):
+                raise
             except Exception as e:
                 self.logger.error(f"Error getting video details: {e}")
                 continue
@@ -288,101 +483,266 @@ class CorrectedDataExtractor:
         ]
         return filtered_videos
     
-    def intelligent_video_selection(self, videos: List[Dict], target_count: int = 40) -> Dict:
-        """Intelligent video selection: top 10 + bottom 10 + random 20"""
+    def get_video_statistics(self, video_ids: List[str]) -> List[Dict]:
+        """Selection phase one: counts and duration only (no snippet/description payload)"""
+        video_stats = []
         
-        if len(videos) <= target_count:
-            return {
-                'selected_videos': videos,
-                'selection_method': 'all_available',
-                'total_selected': len(videos)
-            }
+        # Process in batches of 50 (API limit)
+        for i in range(0, len(video_ids), 50):
+            batch_ids = video_ids[i:i+50]
+            
+            try:
+                response = self._execute(
+                    'videos.list',
+                    part='statistics,contentDetails',
+                    id=','.join(batch_ids),
+                    fields='items(id,statistics(viewCount,likeCount,commentCount),contentDetails(duration))'
+                )
+                
+                for video in response['items']:
+                    video_stats.append({
+                        'video_id': video['id'],
+                        'duration': video['contentDetails']['duration'],
+                        'view_count': int(video['statistics'].get('viewCount', 0)),
+                        'like_count': int(video['statistics'].get('likeCount', 0)),
+                        'comment_count': int(video['statistics'].get('commentCount', 0))
+                    })
+                
+            except (QuotaExhaustedError, ApiCallFailed):
+                raise
+            except Exception as e:
+                self.logger.error(f"Error getting video statistics: {e}")
+                continue
+        return [
+            video for video in video_stats
+            if parse_duration(video['duration']).total_seconds() >= 180  # Filter out videos shorter than 3 minutes
+        ]
+    
+    def _add_video_snippets(self, videos: List[Dict], playlist_items: Dict[str, Dict]) -> List[Dict]:
+        """Selection phase two: fetch title/description/tags only for the chosen videos"""
+        snippets = {}
+        video_ids = [video['video_id'] for video in videos]
         
-        # Get detailed stats for all videos to sort by views
-        video_ids = [v['video_id'] for v in videos]
-        detailed_videos = self.get_video_details(video_ids)
+        for i in range(0, len(video_ids), 50):
+            batch_ids = video_ids[i:i+50]
+            
+            try:
+                response = self._execute(
+                    'videos.list',
+                    part='snippet',
+                    id=','.join(batch_ids),
+                    fields='items(id,snippet(title,description,publishedAt,tags,thumbnails/high/url))'
+                )
+                for video in response['items']:
+                    snippets[video['id']] = video['snippet']
+                
+            except (QuotaExhaustedError, ApiCallFailed):
+                raise
+            except Exception as e:
+                self.logger.error(f"Error getting video snippets: {e}")
+                continue
         
-        # Sort by view count
-        sorted_videos = sorted(
-            detailed_videos, 
-            key=lambda x: x.get('view_count', 0), 
-            reverse=True
-        )
+        detailed_videos = []
+        for video in videos:
+            # Fall back to the uploads playlist entry if a snippet is missing
+            playlist_item = playlist_items.get(video['video_id'], {})
+            snippet = snippets.get(video['video_id'], {})
+            detailed_videos.append({
+                'video_id': video['video_id'],
+                'title': snippet.get('title', playlist_item.get('title', '')),
+                'description': snippet.get('description', ''),
+                'published_at': snippet.get('publishedAt', playlist_item.get('published_at', '')),
+                'duration': video['duration'],
+                'view_count': video['view_count'],
+                'like_count': video['like_count'],
+                'comment_count': video['comment_count'],
+                'tags': snippet.get('tags', []),
+                'thumbnail_url': snippet.get('thumbnails', {}).get('high', {}).get('url', playlist_item.get('thumbnail_url'))
+            })
+        return detailed_videos
+    
+    def intelligent_video_selection(self, videos: List[Dict], target_count: Optional[int] = None) -> Dict:
+        """Intelligent video selection: top 10 + bottom 10 + random 20"""
+        return self.select_videos_from_pages([videos], target_count)
+    
+    def select_videos_from_pages(self, pages: Iterable[List[Dict]], target_count: Optional[int] = None) -> Dict:
+        """
+        Streaming selection over uploads pages: top K + bottom K by views + random sample of the rest
+        Stats are fetched page by page, so memory stays bounded however long the back-catalogue is
+        """
+        target_count = target_count or self.videos_per_channel
+        top_k, bottom_k, sample_k = self.selection_strata or split_target(target_count)
         
-        # Select top 10, bottom 10, and random 20 from middle
-        top_10 = sorted_videos[:10]
-        bottom_10 = sorted_videos[-10:]
+        # Hold uploads back until there are more than we need; small channels keep everything
+        buffered = []
+        selector = None
+        for page in pages:
+            if selector is None:
+                buffered.extend(page)
+                if len(buffered) <= target_count:
+                    continue
+                selector = StreamingSelector(top_k, bottom_k, sample_k)
+                page = buffered
+            
+            # Phase one: lightweight stats, merged with the playlist entry as a snippet fallback
+            playlist_items = {v['video_id']: v for v in page}
+            for stats in self.get_video_statistics(list(playlist_items)):
+                playlist_item = playlist_items[stats['video_id']]
+                selector.add({
+                    **stats,
+                    'title': playlist_item.get('title', ''),
+                    'published_at': playlist_item.get('published_at', ''),
+                    'thumbnail_url': playlist_item.get('thumbnail_url')
+                })
         
-        # Random 20 from middle (excluding top 10 and bottom 10)
-        if len(sorted_videos) > 20:
-            middle_videos = sorted_videos[10:-10]
-            random_20 = random.sample(middle_videos, min(20, len(middle_videos)))
-        else:
-            random_20 = []
+        if selector is None:
+            return {
+                'selected_videos': buffered,
+                'selection_method': 'all_available',
+                'total_selected': len(buffered)
+            }
         
-        selected = top_10 + bottom_10 + random_20
+        strata = selector.result()
+        selected = []
+        categories = []
+        for stratum, category in (('top', 'top_performer'), ('bottom', 'bottom_performer'),
+                                  ('sample', 'random_sample')):
+            selected.extend(strata[stratum])
+            categories.extend([category] * len(strata[stratum]))
         
-        # Add performance categories
-        for video in selected:
-            if video in top_10:
-                video['performance_category'] = 'top_performer'
-            elif video in bottom_10:
-                video['performance_category'] = 'bottom_performer'
-            else:
-                video['performance_category'] = 'random_sample'
+        # Phase two: full snippet only for the chosen videos
+        playlist_items = {v['video_id']: v for v in selected}
+        selected = self._add_video_snippets(selected, playlist_items)
+        for video, category in zip(selected, categories):
+            video['performance_category'] = category
         
         return {
             'selected_videos': selected,
             'selection_method': 'intelligent_sampling',
             'total_selected': len(selected),
             'breakdown': {
-                'top_performers': len(top_10),
-                'bottom_performers': len(bottom_10),
-                'random_sample': len(random_20)
+                'top_performers': len(strata['top']),
+                'bottom_performers': len(strata['bottom']),
+                'random_sample': len(strata['sample'])
             }
         }
     
-    def extract_video_comments(self, video_id: str, max_comments: int = 100) -> List[Dict]:
-        """Extract comments for a video (raw data for user's sentiment analysis)"""
+    def extract_video_comments(self, video_id: str, max_comments: Optional[int] = None,
+                               include_replies: Optional[bool] = None) -> List[Dict]:
+        """
+        Extract comments for a video (raw data for user's sentiment analysis)
+        Pages through comment threads until `max_comments` (threads + replies) are collected
+        """
+        max_comments = self.comments_per_video if max_comments is None else max_comments
+        include_replies = self.include_comment_replies if include_replies is None else include_replies
         comments = []
+        next_page_token = None
         
         try:
-            response = self.youtube.commentThreads().list(
-                part='snippet',
-                videoId=video_id,
-                maxResults=min(max_comments, 100),
-                order='relevance'
-            ).execute()
-            
-            self.quota_used += 1
-            
-            for item in response['items']:
-                comment = item['snippet']['topLevelComment']['snippet']
-                comment_data = {
-                    'comment_id': item['snippet']['topLevelComment']['id'],
-                    'text': comment['textDisplay'],
-                    'author': comment['authorDisplayName'],
-                    'published_at': comment['publishedAt'],
-                    'like_count': comment.get('likeCount', 0),
-                    'reply_count': item['snippet'].get('totalReplyCount', 0)
+            while len(comments) < max_comments:
+                # Every page, the first included, draws on the per-run comment budget
+                if not self._take_comment_budget():
+                    break
+                params = {
+                    'part': 'snippet,replies' if include_replies else 'snippet',
+                    'videoId': video_id,
+                    'maxResults': min(max_comments - len(comments), 100),
+                    'order': 'relevance'
                 }
-                comments.append(comment_data)
+                if next_page_token:
+                    params['pageToken'] = next_page_token
+                response = self._execute('commentThreads.list', **params)
+                
+                for item in response['items']:
+                    if len(comments) >= max_comments:
+                        break
+                    comments.append(self._comment_record(
+                        item['snippet']['topLevelComment'],
+                        item['snippet'].get('totalReplyCount', 0)
+                    ))
+                    if include_replies:
+                        comments.extend(self._thread_replies(item, max_comments - len(comments)))
+                
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token:
+                    break
             
+        except (QuotaExhaustedError, ApiCallFailed):
+            raise
         except Exception as e:
             self.logger.error(f"Error extracting comments for {video_id}: {e}")
         
         return comments
     
-    def check_caption_availability(self, video_id: str) -> Dict:
+    def _thread_replies(self, thread: Dict, limit: int) -> List[Dict]:
+        """Replies to one comment thread: inline ones when complete, otherwise paged via comments.list"""
+        parent_id = thread['snippet']['topLevelComment']['id']
+        inline = thread.get('replies', {}).get('comments', [])
+        if limit <= 0:
+            return []
+        if thread['snippet'].get('totalReplyCount', 0) <= len(inline):
+            return [self._comment_record(reply, 0, parent_id) for reply in inline[:limit]]
+        
+        replies = []
+        next_page_token = None
+        while len(replies) < limit and self._take_comment_budget():
+            params = {
+                'part': 'snippet',
+                'parentId': parent_id,
+                'maxResults': min(limit - len(replies), 100)
+            }
+            if next_page_token:
+                params['pageToken'] = next_page_token
+            response = self._execute('comments.list', **params)
+            
+            for item in response['items'][:limit - len(replies)]:
+                replies.append(self._comment_record(item, 0, parent_id))
+            
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                break
+        return replies
+    
+    def _comment_record(self, comment: Dict, reply_count: int, parent_id: Optional[str] = None) -> Dict:
+        """Flatten a commentThread top-level comment or a reply"""
+        snippet = comment['snippet']
+        comment_data = {
+            'comment_id': comment['id'],
+            'text': snippet['textDisplay'],
+            'author': snippet['authorDisplayName'],
+            'published_at': snippet['publishedAt'],
+            'like_count': snippet.get('likeCount', 0),
+            'reply_count': reply_count
+        }
+        if parent_id:
+            comment_data['parent_id'] = parent_id
+        return comment_data
+    
+    def _take_comment_budget(self) -> bool:
+        """Claim one unit of the per-run budget for comment pages (thread and reply pages alike)"""
+        if self.comment_quota_budget is None:
+            return True
+        with self._state_lock:
+            if self.comment_units_used >= self.comment_quota_budget:
+                return False
+            self.comment_units_used += 1
+            return True
+    
+    def check_caption_availability(self, video_id: str, refresh: Optional[bool] = None) -> Dict:
         """Check what captions are available (but don't download - requires ownership)"""
+        refresh = self.refresh_captions if refresh is None else refresh
+        if self.caption_cache and not refresh:
+            cached = self.caption_cache.get(video_id)
+            if cached is not None:
+                return cached
+        
         try:
             # List available captions
-            captions_response = self.youtube.captions().list(
+            captions_response = self._execute(
+                'captions.list',
                 part='snippet',
                 videoId=video_id
-            ).execute()
-            
-            self.quota_used += 50  # Caption list costs 50 units
+            )
             
             caption_info = {
                 'has_captions': len(captions_response['items']) > 0,
@@ -411,43 +771,62 @@ class CorrectedDataExtractor:
                 else:
                     caption_info['has_manual'] = True
             
+            if self.caption_cache:
+                self.caption_cache.set(video_id, caption_info)
             return caption_info
             
+        except QuotaDeferredError as e:
+            # Low budget: keep the remaining units for cheap list calls and revisit captions later
+            self.logger.info(f"⏸️ Deferring caption check for {video_id}: {e}")
+            return self._empty_caption_info(deferred=True)
+        except (QuotaExhaustedError, ApiCallFailed):
+            raise
         except Exception as e:
             self.logger.error(f"Error checking captions for {video_id}: {e}")
-            return {
-                'has_captions': False,
-                'caption_count': 0,
-                'languages': [],
-                'has_english': False,
-                'has_auto_generated': False,
-                'has_manual': False,
-                'error': self._sanitize_error_message(str(e))
-            }
+            return self._empty_caption_info(error=self._sanitize_error_message(str(e)))
+    
+    def _empty_caption_info(self, **flags) -> Dict:
+        """Caption info for a video whose check did not complete (deferred / error)"""
+        return {
+            'has_captions': False,
+            'caption_count': 0,
+            'languages': [],
+            'has_english': False,
+            'has_auto_generated': False,
+            'has_manual': False,
+            **flags
+        }
+    
+    def _thumbnail_dir(self, output_base_dir: str, channel_name: str) -> str:
+        """Channel thumbnail folder like: extracted_data/thumbnails/MrBeast/"""
+        safe_channel_name = channel_name.replace(" ", "_").replace("/", "_")
+        return os.path.join(output_base_dir, 'thumbnails', safe_channel_name)
     
     def download_thumbnail(self, video_id: str, thumbnail_url: str, output_base_dir: str, channel_name: str) -> str:
         """Download video thumbnail into channel-specific folder using video_id as filename"""
         try:
-            # Create folder structure like: extracted_data/thumbnails/MrBeast/
-            safe_channel_name = channel_name.replace(" ", "_").replace("/", "_")
-            output_dir = os.path.join(output_base_dir, 'thumbnails', safe_channel_name)
-            os.makedirs(output_dir, exist_ok=True)
-
-            response = requests.get(thumbnail_url)
-            if response.status_code == 200:
-                filename = f"{video_id}.jpg"
-                filepath = os.path.join(output_dir, filename)
-
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-
-                return filepath
+            output_dir = self._thumbnail_dir(output_base_dir, channel_name)
+            return self.thumbnail_downloader.download(video_id, thumbnail_url, output_dir)
 
         except Exception as e:
             self.logger.error(f"Error downloading thumbnail for {video_id}: {e}")
 
         return None
     
+    def download_thumbnails(self, items: List[Tuple[str, str]], output_base_dir: str,
+                            channel_name: str) -> Dict[str, Optional[str]]:
+        """Bulk-download (video_id, thumbnail_url) pairs in parallel over the pooled session"""
+        output_dir = self._thumbnail_dir(output_base_dir, channel_name)
+        return self.thumbnail_downloader.download_many(items, output_dir, max_workers=self.max_video_workers)
+    
+    def close(self):
+        """Release pooled connections and caches; the API cache runs a final eviction on the way out"""
+        self.thumbnail_downloader.close()
+        if self.api_cache:
+            self.api_cache.close()
+        if self.caption_cache:
+            self.caption_cache.close()
+    
     def execute_api_only_extraction(self, output_dir: str = "extracted_data") -> Dict:
         """Execute API-only extraction (no transcript download)"""
         
@@ -457,39 +836,38 @@ class CorrectedDataExtractor:
         os.makedirs(output_dir, exist_ok=True)
         channels_config = self.get_channel_configuration()
         
-        # Load existing results if available (for resumable extraction)
-        complete_data_file = f"{output_dir}/api_only_complete_data.json"
-        if os.path.exists(complete_data_file):
-            try:
-                with open(complete_data_file, 'r', encoding='utf-8') as f:
-                    results = json.load(f)
-                self.logger.info(f"📂 Loaded existing data: {results['channels_processed']} channels, {results['videos_selected']} videos")
-                # Initialize quota tracking from existing data
-                self.quota_used = results.get('quota_used', 0)
-                # Update extraction date to show this is a continuation
-                results['extraction_date'] = datetime.now().isoformat()
-            except Exception as e:
-                self.logger.warning(f"⚠️ Could not load existing data: {e}. Starting fresh.")
-                results = {
-                    'extraction_date': datetime.now().isoformat(),
-                    'extraction_type': 'api_only_public_videos',
-                    'transcript_note': 'Caption availability checked, but content requires yt-dlp or similar',
-                    'channels_processed': 0,
-                    'videos_selected': 0,
-                    'quota_used': 0,
-                    'data': {}
-                }
-        else:
-            results = {
-                'extraction_date': datetime.now().isoformat(),
-                'extraction_type': 'api_only_public_videos',
-                'transcript_note': 'Caption availability checked, but content requires yt-dlp or similar',
-                'channels_processed': 0,
-                'videos_selected': 0,
-                'quota_used': 0,
-                'data': {}
-            }
+        # Finished channels live in an append-only log; an older api_only_complete_data.json is imported once
+        store = ExtractionStore(output_dir)
+        if len(store):
+            summary = store.summary()
+            self.logger.info(f"📂 Loaded existing data: {summary['channels_processed']} channels, {summary['videos_selected']} videos")
+            # Initialize quota tracking from existing data
+            self.quota_used = summary['quota_used']
+        run_meta = {
+            'extraction_date': datetime.now().isoformat(),
+            'extraction_type': 'api_only_public_videos',
+            'transcript_note': 'Caption availability checked, but content requires yt-dlp or similar',
+            'quota_used': self.quota_used
+        }
+        store.append_meta(run_meta)
+        comment_store = CommentStore(os.path.join(output_dir, 'comments_raw', COMMENT_DB_FILENAME))
+        self.retry_queue = RetryQueue(os.path.join(output_dir, RETRY_QUEUE_FILENAME))
+        self.journal = EnrichmentJournal(os.path.join(output_dir, JOURNAL_FILENAME))
+        if self.journal.open_channels():
+            self.logger.info(f"📓 Resuming {len(self.journal.open_channels())} channel(s) from {JOURNAL_FILENAME}")
+        
+        # Caption checks already paid for in earlier runs seed the caption cache once
+        if self.caption_cache and len(store) and self.caption_cache.is_empty():
+            seeded = self.caption_cache.set_many(
+                (video['video_id'], video['caption_info'])
+                for _, channel_record in store.iter_channels()
+                for video in channel_record.get('videos', [])
+                if video.get('caption_info') and not video['caption_info'].get('deferred')
+            )
+            self.logger.info(f"📦 Seeded caption cache with {seeded} videos from earlier runs")
         
+        # Build the work queue up front so channels can be extracted concurrently
+        pending_channels = []
         for genre, channels in channels_config.items():
             self.logger.info(f"Processing genre: {genre}")
             channel_counter = 0
@@ -499,124 +877,295 @@ class CorrectedDataExtractor:
                     self.logger.info(f"🧪 Test mode: only processing first {self.max_channels} channels for genre '{genre}'")
                     break
                 channel_name = channel_info['name']
-                channel_handle = channel_info['handle']
                 
-                # Skip if already processed AND complete (has 40 videos)
-                skip_channel = False
-                if channel_name in self.processed_channels and channel_name in results['data']:
-                    # Check if channel has complete data (40 videos) - check both possible structures
-                    channel_data = results['data'][channel_name]
-                    video_count = 0
-                    
-                    # Check for videos in 'videos' key (direct storage)
-                    if 'videos' in channel_data:
-                        video_count = len(channel_data['videos'])
-                    # Check for videos in 'selection_result' structure  
-                    elif 'selection_result' in channel_data and 'selected_videos' in channel_data['selection_result']:
-                        video_count = len(channel_data['selection_result']['selected_videos'])
-                    
-                    if video_count >= 40:
-                        skip_channel = True
-                        self.logger.info(f"🔁 Skipping {channel_name} (complete with {video_count} videos)")
-                    else:
-                        self.logger.info(f"🔄 Reprocessing {channel_name} (incomplete: {video_count}/40 videos)")
-                else:
-                    self.logger.info(f"🆕 Processing {channel_name} (new channel)")
+                if self._is_channel_complete(channel_name, store):
+                    continue
                 
-                if skip_channel:
+                # Extracted again from scratch, so units queued by earlier runs are moot
+                self.retry_queue.discard_channel(channel_name)
+                pending_channels.append((genre, channel_info))
+                channel_counter += 1
+        
+        self._replay_retry_queue(store, comment_store, output_dir)
+        self.logger.info(f"📋 {len(pending_channels)} channels queued ({self.max_workers} worker(s))")
+        self._resolve_channels(pending_channels)
+        
+        # Workers only extract; the results log and the progress tracker are
+        # updated here on the calling thread, one finished channel at a time
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='channel') as executor:
+            futures = {
+                executor.submit(self._process_channel, genre, channel_info, output_dir): channel_info['name']
+                for genre, channel_info in pending_channels
+            }
+            
+            for future in as_completed(futures):
+                channel_name = futures[future]
+                channel_record = future.result()
+                self.retry_queue.save()
+                self.key_pool.save()
+                if not channel_record:
                     continue
-                self.logger.info(f"Extracting data for: {channel_name} ({channel_handle})")
                 
-                try:
-                    # Extract channel data - pass full channel_info to use pre-included data
-                    channel_data = self.extract_channel_data(channel_info)
-                    if not channel_data:
-                        self.logger.warning(f"❌ Could not extract data for {channel_name}")
-                        continue
-                    
-                    # Get all videos
-                    all_videos = self.get_all_channel_videos(
-                        channel_data['uploads_playlist_id']
-                    )
-                    
-                    if not all_videos:
-                        self.logger.warning(f"❌ No videos found for {channel_name}")
-                        continue
-                    
-                    # Intelligent selection
-                    selection_result = self.intelligent_video_selection(all_videos)
-                    selected_videos = selection_result['selected_videos']
-                    
-                    # Extract comments and check captions for selected videos
-                    for video in selected_videos:
-                        # Extract comments
-                        video['comments'] = self.extract_video_comments(video['video_id'])
-                        
-                        # Check caption availability (but don't download content)
-                        video['caption_info'] = self.check_caption_availability(video['video_id'])
-                        
-                        # Download thumbnail
-                        thumbnail_path = self.download_thumbnail(
-                            video_id=video['video_id'],
-                            thumbnail_url=video['thumbnail_url'],
-                            output_base_dir=output_dir,
-                            channel_name=channel_name
-                        )
-                        video['thumbnail_local_path'] = thumbnail_path
-                        
-                        time.sleep(0.1)  # Rate limiting
-                    
-                    # Store results
-                    results['data'][channel_name] = {
-                        'channel_info': channel_info,
-                        'channel_data': channel_data,
-                        'genre': genre,
-                        'selection_result': selection_result,
-                        'videos': selected_videos
-                    }
-                    
-                    results['channels_processed'] += 1
-                    results['videos_selected'] += len(selected_videos)
-                    
-                    self.logger.info(f"✅ {channel_name}: {len(selected_videos)} videos selected")
-                    self.processed_channels.add(channel_name)
-                    self._save_progress()
-                    self.logger.info(f"💾 Progress saved to {PROGRESS_FILE}")
-                    channel_counter += 1
-
-                except Exception as e:
-                    self.logger.error(f"❌ Failed to process {channel_name}: {e}")
+                selected_videos = channel_record['videos']
+                self.retry_queue.remove(channel_name, CHANNEL_UNIT)
+                store.append_channel(channel_name, channel_record)
+                store.append_meta({**run_meta, 'quota_used': self.quota_used})
+                self._store_channel_comments(comment_store, channel_name, channel_record, output_dir)
+                
+                self.logger.info(f"✅ {channel_name}: {len(selected_videos)} videos selected")
+                
+                # Channels with deferred caption checks stay unprocessed (and open in the journal),
+                # so the next run resumes them and only re-checks those captions
+                if any(video.get('caption_info', {}).get('deferred') for video in selected_videos):
+                    self.logger.info(f"⏸️ {channel_name}: caption checks deferred, will revisit next run")
                     continue
+                self.processed_channels.add(channel_name)
+                self._save_progress()
+                self.journal.finish(channel_name)
+                self.logger.info(f"💾 Progress saved to {PROGRESS_FILE}")
         
-        results['quota_used'] = self.quota_used
+        store.append_meta({**run_meta, 'quota_used': self.quota_used})
+        self.channel_resolver.save()
+        self.retry_queue.save()
+        self.key_pool.save()
+        self.journal.close()
         
         # Save results
-        self._save_api_only_data(results, output_dir)
+        self._save_api_only_data(store, comment_store, output_dir)
+        results = store.summary()
         
         self.logger.info(f"🎉 API-Only Extraction Complete!")
         self.logger.info(f"📊 {results['videos_selected']} videos from {results['channels_processed']} channels")
         self.logger.info(f"📈 Quota used: {results['quota_used']} units")
+        self.logger.info(f"🖼️ Thumbnails: {self.thumbnail_downloader.stats}")
+        if self.api_cache:
+            self.logger.info(f"🗄️ API cache: {self.api_cache.stats()}")
+        self.logger.info(f"💬 Comment store: {comment_store.stats()}")
+        if self.caption_cache:
+            self.logger.info(f"🔤 Caption cache: {self.caption_cache.stats()}")
+        if self.comment_quota_budget is not None:
+            self.logger.info(f"💬 Comment pages: {self.comment_units_used}/{self.comment_quota_budget} units")
+        comment_store.close()
+        quota_summary = self.scheduler.summary()
+        self.logger.info(f"📈 This run: {quota_summary['used']}/{quota_summary['daily_budget']} units "
+                         f"by endpoint {quota_summary['units_by_endpoint']}")
+        if quota_summary['deferred_by_endpoint']:
+            self.logger.info(f"⏸️ Deferred to protect the budget: {quota_summary['deferred_by_endpoint']}")
+        if len(self.key_pool.keys) > 1:
+            self.logger.info(f"🔑 Quota by key: {self.key_pool.summary()}")
+        if len(self.retry_queue):
+            self.logger.info(f"🔁 Queued for the next run ({RETRY_QUEUE_FILENAME}): {self.retry_queue.stats()}")
         
         return results
     
-    def _save_api_only_data(self, results: Dict, output_dir: str):
+    def _is_channel_complete(self, channel_name: str, store: ExtractionStore) -> bool:
+        """Check whether a channel was already processed with complete data (videos_per_channel, or every upload it has)"""
+        if channel_name in self.processed_channels and channel_name in store:
+            # Video count comes from the store index (either record layout), without loading the record
+            video_count = store.video_count(channel_name)
+            target = self.videos_per_channel
+            if video_count < target:
+                # Only short channels need their record: it may simply have fewer uploads than the target
+                target = min(target, self._available_uploads(store.get_channel(channel_name)) or target)
+            
+            if video_count >= target:
+                self.logger.info(f"🔁 Skipping {channel_name} (complete with {video_count} videos)")
+                return True
+            self.logger.info(f"🔄 Reprocessing {channel_name} (incomplete: {video_count}/{target} videos)")
+        else:
+            self.logger.info(f"🆕 Processing {channel_name} (new channel)")
+        return False
+    
+    @staticmethod
+    def _available_uploads(channel_record: Optional[Dict]) -> Optional[int]:
+        """Uploads a stored channel had to choose from, when known"""
+        if not channel_record:
+            return None
+        selection_result = channel_record.get('selection_result', {})
+        if selection_result.get('selection_method') == 'all_available':
+            # Every scanned upload was kept, so there was nothing more to select
+            return len(selection_result.get('selected_videos', []))
+        return channel_record.get('channel_data', {}).get('video_count') or None
+    
+    def _process_channel(self, genre: str, channel_info: Dict, output_dir: str) -> Optional[Dict]:
+        """Extract one channel end to end; runs on a worker thread and returns the channel record"""
+        channel_name = channel_info['name']
+        channel_handle = channel_info['handle']
+        if self.scheduler.exhausted or self.key_pool.exhausted:
+            self.logger.info(f"⛽ Skipping {channel_name}: daily quota budget exhausted")
+            return None
+        self.logger.info(f"Extracting data for: {channel_name} ({channel_handle})")
+        
+        try:
+            # A channel interrupted mid-enrichment picks up its journaled selection and finished steps
+            channel_record = self.journal.resume(channel_name) if self.journal else None
+            if channel_record:
+                self.logger.info(f"📓 {channel_name}: resuming with {self.journal.steps_done(channel_name)} "
+                                 f"video step(s) already done")
+            else:
+                channel_record = self._select_channel_videos(genre, channel_info)
+                if not channel_record:
+                    return None
+                if self.journal:
+                    self.journal.record_selection(channel_name, channel_record)
+            
+            # Extract comments, check captions and download thumbnails for selected videos
+            self._enrich_videos(channel_record['videos'], output_dir, channel_name)
+            return channel_record
+            
+        except QuotaExhaustedError as e:
+            self.logger.warning(f"⛽ Stopping {channel_name} before running out of quota: {e}")
+            return None
+        except ApiCallFailed as e:
+            self.logger.warning(f"🔁 {channel_name} queued for retry: {e}")
+            if self.retry_queue is not None:
+                self.retry_queue.add(channel_name, CHANNEL_UNIT, e.error_class, e.message, endpoint=e.endpoint)
+            return None
+        except Exception as e:
+            self.logger.error(f"❌ Failed to process {channel_name}: {e}")
+            return None
+    
+    def _select_channel_videos(self, genre: str, channel_info: Dict) -> Optional[Dict]:
+        """Channel metadata and video selection: the channel record before enrichment"""
+        channel_name = channel_info['name']
+        
+        # Extract channel data - pass full channel_info to use pre-included data
+        channel_data = self.extract_channel_data(channel_info)
+        if not channel_data:
+            self.logger.warning(f"❌ Could not extract data for {channel_name}")
+            return None
+        
+        # Stream uploads pages straight into the selector
+        pages = self.iter_channel_video_pages(
+            channel_data['uploads_playlist_id'],
+            max_uploads=self.max_uploads_scanned,
+            published_after=self.published_after
+        )
+        selection_result = self.select_videos_from_pages(pages)
+        selected_videos = selection_result['selected_videos']
+        
+        if selection_result['selection_method'] == 'all_available' and not selected_videos:
+            self.logger.warning(f"❌ No videos found for {channel_name}")
+            return None
+        
+        return {
+            'channel_info': channel_info,
+            'channel_data': channel_data,
+            'genre': genre,
+            'selection_result': selection_result,
+            'videos': selected_videos
+        }
+    
+    def _enrich_videos(self, videos: List[Dict], output_dir: str, channel_name: str):
+        """Fetch comments, caption availability and thumbnails for videos on a bounded worker pool"""
+        # Steps already done (journaled before a restart) are not repeated
+        self._run_video_steps(
+            [(video, field) for video in videos for field in ENRICHMENT_FIELDS if field not in video],
+            output_dir, channel_name
+        )
+        self.thumbnail_downloader.flush()
+    
+    def _run_video_step(self, video: Dict, field: str, output_dir: str, channel_name: str):
+        """Compute one enrichment field of a video record"""
+        if field == 'comments':
+            return self.extract_video_comments(video['video_id'])
+        if field == 'caption_info':
+            # Check caption availability (but don't download content)
+            return self.check_caption_availability(video['video_id'])
+        return self.download_thumbnail(
+            video_id=video['video_id'],
+            thumbnail_url=video['thumbnail_url'],
+            output_base_dir=output_dir,
+            channel_name=channel_name
+        )
+    
+    def _run_video_steps(self, steps: List[Tuple[Dict, str]], output_dir: str, channel_name: str) -> int:
+        """
+        Run (video, field) steps on the bounded pool; returns how many failed after every retry
+        Failed steps keep the video's previous value (or an empty one) and go to the retry queue
+        """
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_video_workers, thread_name_prefix='video') as executor:
+            futures = {
+                executor.submit(self._run_video_step, video, field, output_dir, channel_name): (video, field)
+                for video, field in steps
+            }
+            
+            # Results are attached here so video dicts are only mutated by the channel thread
+            for future in as_completed(futures):
+                video, field = futures[future]
+                try:
+                    video[field] = future.result()
+                except ApiCallFailed as e:
+                    failed += 1
+                    self.logger.warning(f"🔁 {field} for {video['video_id']} queued for retry: {e}")
+                    if field not in video:
+                        video[field] = [] if field == 'comments' else self._empty_caption_info(error=e.message)
+                    if self.retry_queue is not None:
+                        self.retry_queue.add(channel_name, field, e.error_class, e.message,
+                                             video_id=video['video_id'], endpoint=e.endpoint)
+                    continue
+                if self.retry_queue is not None:
+                    self.retry_queue.remove(channel_name, field, video['video_id'])
+                # Deferred caption checks and failed thumbnail downloads (no local path) are left out
+                # so a resumed channel tries them again
+                if self.journal is not None and self._step_finished(field, video[field]):
+                    self.journal.record_step(channel_name, video['video_id'], field, video[field])
+        return failed
+    
+    @staticmethod
+    def _step_finished(field: str, value) -> bool:
+        """Whether an enrichment result is final, i.e. worth journaling"""
+        if field == 'caption_info':
+            return not value.get('deferred')
+        if field == 'thumbnail_local_path':
+            return value is not None
+        return True
+    
+    def _replay_retry_queue(self, store: ExtractionStore, comment_store: CommentStore, output_dir: str):
+        """Re-run video steps that failed in earlier runs and patch the results into the stored channel records"""
+        for channel_name, entries in self.retry_queue.video_units().items():
+            channel_record = store.get_channel(channel_name)
+            videos = {video['video_id']: video for video in (channel_record or {}).get('videos', [])}
+            steps = [(videos[entry['video_id']], entry['unit']) for entry in entries if entry['video_id'] in videos]
+            if not steps:
+                self.retry_queue.discard_channel(channel_name)
+                continue
+            
+            try:
+                failed = self._run_video_steps(steps, output_dir, channel_name)
+            except QuotaExhaustedError as e:
+                self.logger.warning(f"⛽ Retry queue replay stopped: {e}")
+                break
+            store.append_channel(channel_name, channel_record)
+            self._store_channel_comments(comment_store, channel_name, channel_record, output_dir)
+            self.logger.info(f"🔁 {channel_name}: replayed {len(steps) - failed}/{len(steps)} queued step(s)")
+        self.retry_queue.save()
+    
+    def _save_api_only_data(self, store: ExtractionStore, comment_store: CommentStore, output_dir: str):
         """Save API-only data in multiple formats"""
         
-        # JSON format (complete data)
-        with open(f"{output_dir}/api_only_complete_data.json", 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # JSON format (complete data), streamed from the results log
+        store.compact()
         
         # CSV format (flattened for ML)
-        self._create_ml_csv(results, f"{output_dir}/api_only_ml_dataset.csv")
+        self._create_ml_csv(store, f"{output_dir}/api_only_ml_dataset.csv")
+        
+        # Typed columnar copy of the same table, when pyarrow is installed
+        if parquet_available():
+            rows = write_ml_parquet(self._iter_ml_rows(store), f"{output_dir}/api_only_ml_dataset.parquet")
+            self.logger.info(f"🧱 Parquet dataset written ({rows} rows)")
+        else:
+            self.logger.info("ℹ️ pyarrow not installed, skipping Parquet export")
         
         # Separate files for different data types
-        self._save_comments_data(results, output_dir)
-        self._save_metadata_only(results, output_dir)
-        self._save_caption_availability_report(results, output_dir)
+        self._save_comments_data(store, comment_store, output_dir)
+        self._save_metadata_only(store, output_dir)
+        self._save_caption_availability_report(store, output_dir)
         
         self.logger.info(f"API-only data saved to {output_dir}/")
     
-    def _create_ml_csv(self, results: Dict, filename: str):
+    def _create_ml_csv(self, store: ExtractionStore, filename: str):
         """Create ML-ready CSV dataset"""
         
         fieldnames = [
@@ -627,104 +1176,77 @@ class CorrectedDataExtractor:
             'has_captions', 'has_english_captions', 'has_auto_captions', 'has_manual_captions'
         ]
         
-        # Check if file exists to determine if we need header
-        file_exists = os.path.exists(filename)
-        mode = 'a' if file_exists else 'w'
+        # Upsert by video_id: only new or changed rows touch the file
+        counts = UpsertCsvWriter(filename, fieldnames).upsert(self._iter_ml_rows(store))
+        self.logger.info(f"📄 ML CSV: {counts['added']} added, {counts['updated']} updated, "
+                         f"{counts['unchanged']} unchanged")
+    
+    def _iter_ml_rows(self, store: ExtractionStore):
+        """Flattened ML rows, one per video, shared by the CSV and Parquet exports"""
+        for channel_name, channel_data in store.iter_channels():
+            for video in channel_data['videos']:
+                caption_info = video.get('caption_info', {})
+                
+                yield {
+                    'video_id': video['video_id'],
+                    'channel_name': channel_name,
+                    'genre': channel_data['genre'],
+                    'global_tier': channel_data['channel_info'].get('global_tier', 'Unknown'),
+                    'genre_tier': channel_data['channel_info'].get('genre_tier', 'Unknown'),
+                    'title': video['title'],
+                    'view_count': video.get('view_count', 0),
+                    'like_count': video.get('like_count', 0),
+                    'comment_count': video.get('comment_count', 0),
+                    'duration': video.get('duration', ''),
+                    'published_at': video.get('published_at', ''),
+                    'tags_count': len(video.get('tags', [])),
+                    'title_length': len(video.get('title', '')),
+                    'description_length': len(video.get('description', '')),
+                    'channel_subscriber_count': channel_data['channel_data'].get('subscriber_count', 0),
+                    'performance_category': video.get('performance_category', 'unknown'),
+                    'has_captions': caption_info.get('has_captions', False),
+                    'has_english_captions': caption_info.get('has_english', False),
+                    'has_auto_captions': caption_info.get('has_auto_generated', False),
+                    'has_manual_captions': caption_info.get('has_manual', False)
+                }
+    
+    def _store_channel_comments(self, comment_store: CommentStore, channel_name: str,
+                                channel_record: Dict, output_dir: str):
+        """Append a finished channel's comments to the store and refresh its per-channel file"""
+        comments_dir = os.path.join(output_dir, 'comments_raw')
+        inserted = comment_store.add_channel(channel_name, channel_record)
         
-        with open(filename, mode, newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            
-            for channel_name, channel_data in results['data'].items():
-                for video in channel_data['videos']:
-                    caption_info = video.get('caption_info', {})
-                    
-                    row = {
-                        'video_id': video['video_id'],
-                        'channel_name': channel_name,
-                        'genre': channel_data['genre'],
-                        'global_tier': channel_data['channel_info'].get('global_tier', 'Unknown'),
-                        'genre_tier': channel_data['channel_info'].get('genre_tier', 'Unknown'),
-                        'title': video['title'],
-                        'view_count': video.get('view_count', 0),
-                        'like_count': video.get('like_count', 0),
-                        'comment_count': video.get('comment_count', 0),
-                        'duration': video.get('duration', ''),
-                        'published_at': video.get('published_at', ''),
-                        'tags_count': len(video.get('tags', [])),
-                        'title_length': len(video.get('title', '')),
-                        'description_length': len(video.get('description', '')),
-                        'channel_subscriber_count': channel_data['channel_data'].get('subscriber_count', 0),
-                        'performance_category': video.get('performance_category', 'unknown'),
-                        'has_captions': caption_info.get('has_captions', False),
-                        'has_english_captions': caption_info.get('has_english', False),
-                        'has_auto_captions': caption_info.get('has_auto_generated', False),
-                        'has_manual_captions': caption_info.get('has_manual', False)
-                    }
-                    writer.writerow(row)
+        # Save by channel for easier processing
+        if any(video.get('comments') for video in channel_record['videos']):
+            comment_store.export_json(os.path.join(comments_dir, channel_file_name(channel_name)),
+                                      channel_name=channel_name)
+        self.logger.info(f"💬 {channel_name}: {inserted} new comments stored")
     
-    def _save_comments_data(self, results: Dict, output_dir: str):
+    def _save_comments_data(self, store: ExtractionStore, comment_store: CommentStore, output_dir: str):
         """Save raw comments data for sentiment analysis"""
         
         comments_dir = os.path.join(output_dir, 'comments_raw')
-        os.makedirs(comments_dir, exist_ok=True)
+        all_comments_file = os.path.join(comments_dir, ALL_COMMENTS_FILENAME)
         
-        all_comments = []
-        
-        # Load existing comments if file exists
-        comments_file = f"{comments_dir}/all_comments_raw.json"
-        if os.path.exists(comments_file):
+        # One-time import of the merged file written before the comment store existed
+        if comment_store.is_empty() and os.path.exists(all_comments_file):
             try:
-                with open(comments_file, 'r', encoding='utf-8') as f:
-                    all_comments = json.load(f)
+                imported = comment_store.import_json(all_comments_file)
+                self.logger.info(f"📦 Imported {imported} comments from {all_comments_file}")
             except Exception as e:
-                self.logger.warning(f"Could not load existing comments: {e}")
-                all_comments = []
-        else:
-            all_comments = []
-        
-        # Add new comments
-        for channel_name, channel_data in results['data'].items():
-            # Skip channels that already have comments in the file
-            existing_channels = set(comment.get('channel_name') for comment in all_comments)
-            if channel_name in existing_channels:
-                continue
-                
-            for video in channel_data['videos']:
-                for comment in video.get('comments', []):
-                    comment_record = {
-                        'video_id': video['video_id'],
-                        'channel_name': channel_name,
-                        'genre': channel_data['genre'],
-                        'global_tier': channel_data['channel_info'].get('global_tier', 'Unknown'),
-                        'genre_tier': channel_data['channel_info'].get('genre_tier', 'Unknown'),
-                        'performance_category': video.get('performance_category', 'unknown'),
-                        **comment
-                    }
-                    all_comments.append(comment_record)
+                self.logger.warning(f"Could not import existing comments: {e}")
         
-        # Save all comments in one file
-        with open(f"{comments_dir}/all_comments_raw.json", 'w', encoding='utf-8') as f:
-            json.dump(all_comments, f, indent=2, ensure_ascii=False)
+        # Channels extracted before the comment store existed (O(1) lookup per channel)
+        for channel_name in store.channel_names():
+            if not comment_store.has_channel(channel_name):
+                self._store_channel_comments(comment_store, channel_name, store.get_channel(channel_name), output_dir)
         
-        # Save by channel for easier processing
-        for channel_name, channel_data in results['data'].items():
-            channel_comments = []
-            for video in channel_data['videos']:
-                for comment in video.get('comments', []):
-                    channel_comments.append({
-                        'video_id': video['video_id'],
-                        'performance_category': video.get('performance_category', 'unknown'),
-                        **comment
-                    })
-            
-            if channel_comments:
-                safe_name = channel_name.replace(' ', '_').replace('/', '_')
-                with open(f"{comments_dir}/{safe_name}_comments.json", 'w', encoding='utf-8') as f:
-                    json.dump(channel_comments, f, indent=2, ensure_ascii=False)
+        # The merged file is rebuilt only on request; the store is the source of truth
+        if self.export_all_comments:
+            comment_store.export_json(all_comments_file)
+            self.logger.info(f"💬 Exported {all_comments_file}")
     
-    def _save_metadata_only(self, results: Dict, output_dir: str):
+    def _save_metadata_only(self, store: ExtractionStore, output_dir: str):
         """Save clean metadata without comments"""
         
         clean_data = {}
@@ -741,7 +1263,7 @@ class CorrectedDataExtractor:
             clean_data = {}
         
         # Add new channels only (skip existing ones)
-        for channel_name, channel_data in results['data'].items():
+        for channel_name, channel_data in store.iter_channels():
             if channel_name in clean_data:
                 continue  # Skip existing channels
                 
@@ -759,7 +1281,7 @@ class CorrectedDataExtractor:
         with open(f"{output_dir}/metadata_only.json", 'w', encoding='utf-8') as f:
             json.dump(clean_data, f, indent=2, ensure_ascii=False)
     
-    def _save_caption_availability_report(self, results: Dict, output_dir: str):
+    def _save_caption_availability_report(self, store: ExtractionStore, output_dir: str):
         """Save caption availability report for transcript planning"""
         
         caption_report = {
@@ -774,7 +1296,7 @@ class CorrectedDataExtractor:
             'transcript_extraction_candidates': []
         }
         
-        for channel_name, channel_data in results['data'].items():
+        for channel_name, channel_data in store.iter_channels():
             channel_stats = {
                 'total_videos': len(channel_data['videos']),
                 'videos_with_captions': 0,
@@ -825,16 +1347,35 @@ def main():
         os.remove(PROGRESS_FILE)
     print("🔄 Progress reset! Starting from scratch.\n")
 
-    # Check for API key
-    api_key = os.getenv('YOUTUBE_API_KEY')
+    # Check for API key(s): YOUTUBE_API_KEYS is a comma-separated pool, YOUTUBE_API_KEY a single key
+    api_keys = [key.strip() for key in os.getenv('YOUTUBE_API_KEYS', '').split(',') if key.strip()]
+    api_key = api_keys[0] if api_keys else os.getenv('YOUTUBE_API_KEY')
     if not api_key:
         print("❌ ERROR: YouTube API key not found!")
-        print("Please set YOUTUBE_API_KEY environment variable")
+        print("Please set YOUTUBE_API_KEY (or YOUTUBE_API_KEYS) environment variable")
         return
+    api_keys = api_keys or [api_key]
     
     # Enable test mode here
     TEST_MODE = False  # Set to False for full extraction
     MAX_CHANNELS = 5   # Process all channels per genre
+    MAX_WORKERS = int(os.getenv('EXTRACTOR_MAX_WORKERS', '4'))  # Channels extracted concurrently
+    MAX_VIDEO_WORKERS = int(os.getenv('EXTRACTOR_MAX_VIDEO_WORKERS', '8'))  # Per-channel enrichment pool
+    API_RATE_LIMIT = float(os.getenv('EXTRACTOR_API_RATE_LIMIT', '10'))  # API requests per second
+    QUOTA_PER_KEY = int(os.getenv('EXTRACTOR_QUOTA_PER_KEY', '10000'))  # Daily units per API key
+    DAILY_QUOTA = int(os.getenv('EXTRACTOR_DAILY_QUOTA', str(QUOTA_PER_KEY * len(api_keys))))  # Units this run may spend
+    MAX_RETRIES = int(os.getenv('EXTRACTOR_MAX_RETRIES', '5'))  # Attempts per call on rate-limit/5xx/network errors
+    API_ENDPOINT = os.getenv('YOUTUBE_API_ENDPOINT') or None  # e.g. http://127.0.0.1:8089 for mock_youtube_api.py serve
+    REVALIDATE_THUMBNAILS = os.getenv('EXTRACTOR_REVALIDATE_THUMBNAILS', '0') == '1'  # Re-check existing files
+    MAX_UPLOADS = int(os.getenv('EXTRACTOR_MAX_UPLOADS', '0')) or None  # Uploads scanned per channel (0 = all)
+    PUBLISHED_AFTER = os.getenv('EXTRACTOR_PUBLISHED_AFTER') or None  # e.g. 2020-01-01
+    VIDEOS_PER_CHANNEL = int(os.getenv('EXTRACTOR_VIDEOS_PER_CHANNEL', '40'))  # Split 1/4 top, 1/4 bottom, 1/2 random
+    EXPORT_ALL_COMMENTS = os.getenv('EXTRACTOR_EXPORT_ALL_COMMENTS', '0') == '1'  # Rebuild all_comments_raw.json
+    COMMENTS_PER_VIDEO = int(os.getenv('EXTRACTOR_COMMENTS_PER_VIDEO', '100'))  # Threads + replies per video
+    COMMENT_REPLIES = os.getenv('EXTRACTOR_COMMENT_REPLIES', '0') == '1'  # Expand reply threads
+    COMMENT_QUOTA = int(os.getenv('EXTRACTOR_COMMENT_QUOTA', '0')) or None  # Units for all comment pages this run (0 = no cap)
+    REFRESH_CAPTIONS = os.getenv('EXTRACTOR_REFRESH_CAPTIONS', '0') == '1'  # Re-check cached caption info
+    CHANNEL_LIST = os.getenv('EXTRACTOR_CHANNEL_LIST') or None  # e.g. config/channel_lists/youtube_channels_50M_plus_by_genre.json
 
     """Main execution function for corrected data extraction"""
     
@@ -843,7 +1384,17 @@ def main():
     print("=" * 60)
     
     # Initialize extractor
-    extractor = CorrectedDataExtractor(api_key, test_mode=TEST_MODE, max_channels=MAX_CHANNELS)
+    extractor = CorrectedDataExtractor(api_key, test_mode=TEST_MODE, max_channels=MAX_CHANNELS,
+                                       max_workers=MAX_WORKERS, max_video_workers=MAX_VIDEO_WORKERS,
+                                       api_rate_limit=API_RATE_LIMIT, daily_quota=DAILY_QUOTA,
+                                       revalidate_thumbnails=REVALIDATE_THUMBNAILS,
+                                       max_uploads_scanned=MAX_UPLOADS, published_after=PUBLISHED_AFTER,
+                                       videos_per_channel=VIDEOS_PER_CHANNEL,
+                                       export_all_comments=EXPORT_ALL_COMMENTS,
+                                       comments_per_video=COMMENTS_PER_VIDEO, include_comment_replies=COMMENT_REPLIES,
+                                       comment_quota_budget=COMMENT_QUOTA, refresh_captions=REFRESH_CAPTIONS,
+                                       channel_list_file=CHANNEL_LIST, api_keys=api_keys, quota_per_key=QUOTA_PER_KEY,
+                                       max_retries=MAX_RETRIES, api_endpoint=API_ENDPOINT)
     
     print("\\n📋 What This Extracts (API-Only):")
     print("✅ Complete video metadata (views, likes, comments, etc.)")
@@ -874,7 +1425,10 @@ def main():
     
     # Uncomment to run actual extraction
     print("⏳ Starting API-only extraction...")
-    results = extractor.execute_api_only_extraction()
+    try:
+        results = extractor.execute_api_only_extraction()
+    finally:
+        extractor.close()
     print(f"✅ Extraction complete: {results['videos_selected']} videos")
     print("🎯 ML dataset ready for your analysis!")
 
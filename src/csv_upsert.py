@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Keyed upsert writer for CSV datasets
+Keeps a sidecar index {key: row hash} so re-runs append only new rows and rewrite the file
+once when existing rows changed, instead of appending every row again
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+
+def _cell(value) -> str:
+    """Value as csv.writer would serialise it, so fresh rows hash like rows read back from disk"""
+    return '' if value is None else str(value)
+
+
+def _file_stamp(path: str) -> Optional[list]:
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class UpsertCsvWriter:
+    """
+    CSV file keyed by one column (video_id by default)
+    The index is rebuilt from the CSV whenever the file was changed outside this writer,
+    and duplicate keys left by earlier append-only runs are collapsed on that first pass
+    """
+
+    def __init__(self, path: str, fieldnames: List[str], key: str = 'video_id',
+                 index_path: Optional[str] = None):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.key = key
+        self.index_path = index_path or f"{path}.index.json"
+        self.logger = logging.getLogger(__name__)
+        self.header = list(fieldnames)
+        self.index = {}
+
+    def _row_hash(self, row: Dict) -> str:
+        values = '\x1f'.join(_cell(row.get(name)) for name in self.fieldnames)
+        return hashlib.sha1(values.encode('utf-8')).hexdigest()
+
+    def _load_index(self):
+        """Use the saved index if it matches the CSV on disk, otherwise rebuild it"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self.index = {}
+            return
+
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            self.header = next(csv.reader(f), None) or list(self.fieldnames)
+        missing = [name for name in self.fieldnames if name not in self.header]
+
+        if os.path.exists(self.index_path) and not missing:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('stamp') == _file_stamp(self.path) and saved.get('fieldnames') == self.fieldnames:
+                    self.index = saved['rows']
+                    return
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"Could not read CSV index {self.index_path}: {e}")
+
+        self._rebuild_index(missing)
+
+    def _rebuild_index(self, missing: List[str]):
+        """Hash every row on disk; rewrite once if keys repeat or our columns are missing from the header"""
+        last_line = {}
+        hashes = {}
+        rows_read = 0
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            for line_number, row in enumerate(csv.DictReader(f)):
+                key = row.get(self.key)
+                last_line[key] = line_number
+                hashes[key] = self._row_hash(row)
+                rows_read += 1
+
+        duplicates = rows_read - len(last_line)
+        if duplicates or missing:
+            # Keep the last occurrence of each key: append-only runs wrote newer data later
+            self.header = self.header + missing
+            self._rewrite(lambda line_number, row: last_line.get(row.get(self.key)) == line_number)
+            if duplicates:
+                self.logger.info(f"🧹 {self.path}: removed {duplicates} duplicate rows")
+
+        self.index = hashes
+        self._save_index()
+
+    def _rewrite(self, keep, replacements: Optional[Dict[str, Dict]] = None):
+        """Stream the CSV into a temp file, dropping rows `keep` rejects and substituting replacements"""
+        replacements = replacements or {}
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, 'r', newline='', encoding='utf-8') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+            writer = csv.DictWriter(dst, fieldnames=self.header, restval='', extrasaction='ignore')
+            writer.writeheader()
+            for line_number, row in enumerate(csv.DictReader(src)):
+                if not keep(line_number, row):
+                    continue
+                replacement = replacements.get(row.get(self.key))
+                writer.writerow({**row, **replacement} if replacement else row)
+        os.replace(tmp_path, self.path)
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stamp': _file_stamp(self.path), 'fieldnames': self.fieldnames, 'rows': self.index}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def upsert(self, rows: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Append rows with unseen keys as they stream in; collect changed rows and apply them in
+        one rewrite at the end. Returns counts of added, updated and unchanged rows
+        """
+        self._load_index()
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+        changed = {}
+
+        file_exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        with open(self.path, 'a' if file_exists else 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.header, restval='', extrasaction='ignore')
+            if not file_exists:
+                writer.writeheader()
+
+            for row in rows:
+                key = _cell(row.get(self.key))
+                row_hash = self._row_hash(row)
+                previous = self.index.get(key)
+                if previous is None:
+                    writer.writerow(row)
+                    counts['added'] += 1
+                elif previous != row_hash:
+                    changed[key] = {name: _cell(row.get(name)) for name in self.fieldnames}
+                    counts['updated'] += 1
+                else:
+                    counts['unchanged'] += 1
+                self.index[key] = row_hash
+
+        if changed:
+            self._rewrite(lambda line_number, row: True, changed)
+        self._save_index()
+        return counts
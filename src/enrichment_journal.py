@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Write-ahead journal for channels in flight
+A channel's video selection and each finished per-video step (comments, caption check, thumbnail)
+are appended as they happen, so a restart resumes the channel without paying for them again.
+Entries for a channel are dropped once its record reaches the results log.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+
+JOURNAL_FILENAME = "enrichment_journal.jsonl"
+
+# Parts of a channel record written before enrichment starts; 'videos' is selection_result's list
+SELECTION_KEYS = ('channel_info', 'channel_data', 'genre', 'selection_result')
+
+# Per-video fields filled in by enrichment steps
+ENRICHMENT_FIELDS = ('comments', 'caption_info', 'thumbnail_local_path')
+
+
+class EnrichmentJournal:
+    """
+    JSONL log of {"type": "selection" | "step" | "done", "channel": ...} entries
+    Only channels still open (selected but not yet stored) are kept in memory and on compaction
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._selections = {}  # channel name -> selection entry
+        self._steps = {}       # channel name -> {(video_id, field): value}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._replay()
+        self._compact()
+        self._file = open(self.path, 'ab')
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a torn last line; everything before it is intact
+                    self.logger.warning(f"Discarding incomplete trailing entry in {self.path}")
+                    break
+                offset += len(line)
+                self._apply(entry)
+        with open(self.path, 'r+b') as f:
+            f.truncate(offset)
+
+    def _apply(self, entry: Dict):
+        channel_name = entry['channel']
+        if entry['type'] == 'selection':
+            self._selections[channel_name] = entry
+            self._steps[channel_name] = {}
+        elif entry['type'] == 'step' and channel_name in self._steps:
+            self._steps[channel_name][(entry['video_id'], entry['field'])] = entry['value']
+        elif entry['type'] == 'done':
+            self._selections.pop(channel_name, None)
+            self._steps.pop(channel_name, None)
+
+    def _entries(self):
+        for channel_name, selection in self._selections.items():
+            yield selection
+            for (video_id, field), value in self._steps[channel_name].items():
+                yield {'type': 'step', 'channel': channel_name, 'video_id': video_id, 'field': field, 'value': value}
+
+    def _compact(self):
+        """Rewrite the journal with only the open channels (empty when every channel was stored)"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self._entries():
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def _append(self, entry: Dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line.encode('utf-8'))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(entry)
+
+    def open_channels(self) -> List[str]:
+        with self._lock:
+            return list(self._selections)
+
+    def resume(self, channel_name: str) -> Optional[Dict]:
+        """Channel record rebuilt from the journal, with every finished step applied to its videos"""
+        with self._lock:
+            selection = self._selections.get(channel_name)
+            if selection is None:
+                return None
+            record = json.loads(json.dumps(selection['record']))
+            steps = dict(self._steps[channel_name])
+
+        record['videos'] = record['selection_result']['selected_videos']
+        for video in record['videos']:
+            for field in ENRICHMENT_FIELDS:
+                if (video['video_id'], field) in steps:
+                    video[field] = steps[(video['video_id'], field)]
+        return record
+
+    def steps_done(self, channel_name: str) -> int:
+        with self._lock:
+            return len(self._steps.get(channel_name, {}))
+
+    def record_selection(self, channel_name: str, record: Dict):
+        """Journal the selected videos (before any enrichment) and start the channel afresh"""
+        self._append({'type': 'selection', 'channel': channel_name,
+                      'record': {key: record[key] for key in SELECTION_KEYS}})
+
+    def record_step(self, channel_name: str, video_id: str, field: str, value: Any):
+        """Journal a finished step; ignored for channels that are not open (e.g. retry queue replays)"""
+        with self._lock:
+            if channel_name not in self._selections:
+                return
+        self._append({'type': 'step', 'channel': channel_name, 'video_id': video_id, 'field': field, 'value': value})
+
+    def finish(self, channel_name: str):
+        """The channel's record is in the results log; its journal entries are no longer needed"""
+        with self._lock:
+            if channel_name not in self._selections:
+                return
+        self._append({'type': 'done', 'channel': channel_name})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
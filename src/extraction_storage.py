@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Append-only storage for extraction results
+Each finished channel is appended to a JSONL log as soon as it completes, so a crash loses
+at most the channel in flight. The api_only_complete_data.json document other tools read
+is produced from the log on demand, streamed one channel at a time.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+RESULTS_LOG_FILENAME = "api_only_results.jsonl"
+COMPLETE_DATA_FILENAME = "api_only_complete_data.json"
+
+# Top-level keys of the exported document, in their historical order
+META_KEYS = ('extraction_date', 'extraction_type', 'transcript_note',
+             'channels_processed', 'videos_selected', 'quota_used')
+
+
+def _video_count(record: Dict) -> int:
+    """Videos stored for a channel record (either layout the extractor has used)"""
+    if 'videos' in record:
+        return len(record['videos'])
+    return len(record.get('selection_result', {}).get('selected_videos', []))
+
+
+def _encode(entry: Dict) -> str:
+    """One log line"""
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _channel_entry(channel_name: str, record: Dict) -> Dict:
+    return {'type': 'channel', 'key': channel_name, 'videos': _video_count(record), 'record': record}
+
+
+def _file_stamp(path: str) -> Optional[list]:
+    """(mtime_ns, size) of a file, used to detect edits made outside the store"""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ExtractionStore:
+    """
+    JSONL log of {"type": "channel" | "run" | "export", ...} records; readers take the last record per key
+    Only byte offsets and video counts are held in memory, never the channel records themselves
+    """
+
+    def __init__(self, output_dir: str, log_filename: str = RESULTS_LOG_FILENAME,
+                 json_filename: str = COMPLETE_DATA_FILENAME):
+        self.path = os.path.join(output_dir, log_filename)
+        self.json_path = os.path.join(output_dir, json_filename)
+        self.logger = logging.getLogger(__name__)
+
+        self.meta = {}
+        self._offsets = {}       # channel name -> byte offset of its latest record
+        self._video_counts = {}  # channel name -> videos in its latest record
+        self._export_stamp = None
+        self._export_offset = None  # byte offset of the latest export record
+        self._meta_offset = None    # byte offset of the latest run record
+        self._lock = threading.Lock()
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._load_index()
+        self._import_json_if_changed()
+
+    # ------------------------------------------------------------------ reading
+
+    def _load_index(self):
+        """Scan the log once, remembering where each channel's latest record starts"""
+        self.meta = {}
+        self._offsets = {}
+        self._video_counts = {}
+        self._export_stamp = None
+        self._export_offset = None
+        self._meta_offset = None
+        if not os.path.exists(self.path):
+            return
+
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partial write from an interrupted run
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"Skipping unreadable record at byte {offset} of {self.path}")
+                else:
+                    self._index(entry, offset)
+                offset += len(line)
+
+        if offset < os.path.getsize(self.path):
+            self.logger.warning(f"Discarding incomplete trailing record in {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _index(self, entry: Dict, offset: int):
+        if entry.get('type') == 'channel':
+            self._offsets[entry['key']] = offset
+            self._video_counts[entry['key']] = entry.get('videos', 0)
+        elif entry.get('type') == 'run':
+            self.meta = entry['meta']
+            self._meta_offset = offset
+        elif entry.get('type') == 'export':
+            self._export_stamp = entry.get('stamp')
+            self._export_offset = offset
+
+    def __contains__(self, channel_name: str) -> bool:
+        return channel_name in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def channel_names(self) -> List[str]:
+        return list(self._offsets)
+
+    def video_count(self, channel_name: str) -> Optional[int]:
+        return self._video_counts.get(channel_name)
+
+    def get_channel(self, channel_name: str) -> Optional[Dict]:
+        offset = self._offsets.get(channel_name)
+        if offset is None:
+            return None
+        with self._lock, open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())['record']
+
+    def iter_channels(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (channel name, latest record) in first-seen order, one record in memory at a time"""
+        with self._lock:
+            offsets = list(self._offsets.items())
+        with open(self.path, 'rb') as f:
+            for channel_name, offset in offsets:
+                f.seek(offset)
+                yield channel_name, json.loads(f.readline())['record']
+
+    def summary(self) -> Dict:
+        """Run metadata with channel/video totals computed from the log"""
+        summary = {key: self.meta.get(key) for key in META_KEYS if key in self.meta}
+        summary['channels_processed'] = len(self._offsets)
+        summary['videos_selected'] = sum(self._video_counts.values())
+        summary.setdefault('quota_used', 0)
+        return {key: summary[key] for key in META_KEYS if key in summary}
+
+    # ------------------------------------------------------------------ writing
+
+    def _append(self, entry: Dict):
+        line = _encode(entry)
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(line.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            self._index(entry, offset)
+
+    def append_channel(self, channel_name: str, record: Dict):
+        """Durably record a finished channel; replaces any earlier record for it"""
+        self._append(_channel_entry(channel_name, record))
+
+    def append_meta(self, meta: Dict):
+        """Record run-level metadata (extraction date, quota used, ...)"""
+        self._append({'type': 'run', 'meta': meta})
+
+    def export_json(self, path: Optional[str] = None):
+        """
+        Write the complete-data document (same layout as json.dump(..., indent=2)) from the log
+        Channels are serialised one at a time, so memory does not grow with the roster
+        """
+        path = path or self.json_path
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            for key, value in self.summary().items():
+                f.write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n')
+            f.write('  "data": {')
+            first = True
+            for channel_name, record in self.iter_channels():
+                body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+                f.write(f'{"" if first else ","}\n    {json.dumps(channel_name, ensure_ascii=False)}: {body}')
+                first = False
+            f.write('}\n}' if first else '\n  }\n}')
+        os.replace(tmp_path, path)
+
+    def compact(self):
+        """Export the JSON document, then rewrite the log keeping only the latest record per key"""
+        self.export_json()
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if self.meta:
+                f.write(_encode({'type': 'run', 'meta': self.meta}))
+            for channel_name, record in self.iter_channels():
+                f.write(_encode(_channel_entry(channel_name, record)))
+            f.write(_encode({'type': 'export', 'stamp': _file_stamp(self.json_path)}))
+        with self._lock:
+            os.replace(tmp_path, self.path)
+            self._load_index()
+
+    # ------------------------------------------------------------------ migration
+
+    def _import_json_if_changed(self):
+        """
+        Adopt api_only_complete_data.json when it is newer than the log's last export:
+        a legacy document from before the log existed, or one edited by the cleanup scripts
+        Records appended to the log after that export are newer than anything in the document and are kept
+        """
+        stamp = _file_stamp(self.json_path)
+        if stamp is None or stamp == self._export_stamp:
+            return
+
+        try:
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ Could not import {self.json_path}: {e}")
+            return
+
+        exported_up_to = -1 if self._export_offset is None else self._export_offset
+        newer = {name: offset for name, offset in self._offsets.items() if offset > exported_up_to}
+        if self._offsets:
+            self.logger.warning(f"⚠️ {self.json_path} changed since it was last exported; rebuilding the log from it"
+                                f" and keeping {len(newer)} channel(s) appended since")
+        else:
+            self.logger.info(f"📦 Importing {self.json_path} into {self.path}")
+
+        meta = {key: value for key, value in document.items() if key != 'data'}
+        if self._meta_offset is not None and self._meta_offset > exported_up_to:
+            meta.update(self.meta)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_encode({'type': 'run', 'meta': meta}).encode('utf-8'))
+            for channel_name, record in document.get('data', {}).items():
+                if channel_name not in newer:
+                    f.write(_encode(_channel_entry(channel_name, record)).encode('utf-8'))
+            del document
+            if newer:
+                with open(self.path, 'rb') as log:
+                    for offset in newer.values():
+                        log.seek(offset)
+                        f.write(log.readline())
+            f.write(_encode({'type': 'export', 'stamp': stamp}).encode('utf-8'))
+        with self._lock:
+            os.replace(tmp_path, self.path)
+            self._load_index()
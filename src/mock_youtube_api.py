@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the YouTube Data API v3 and the thumbnail CDN
+Serves deterministic synthetic channels, uploads, videos, comments and captions with configurable
+latency, error rates and per-key quota, either in-process (an httplib2-compatible transport for
+googleapiclient plus a requests adapter for thumbnails) or as a local HTTP server.
+
+    python mock_youtube_api.py serve --port 8089 --latency 0.05 --error-rate 0.01
+    python mock_youtube_api.py bench --channels 2 --workers 1,4 --video-workers 8 --runs 2
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httplib2
+import requests
+from requests.adapters import BaseAdapter
+
+from rate_limiter import ENDPOINT_COSTS
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # Optional: without OpenCV thumbnails are placeholder bytes, not decodable JPEGs
+    cv2 = None
+    np = None
+
+
+THUMBNAIL_BASE_URL = "https://i.ytimg.com"
+API_PREFIX = "/youtube/v3/"
+
+# Errors injected at `error_rate`, picked uniformly: (HTTP status, reason)
+INJECTED_ERRORS = ((500, 'backendError'), (503, 'backendError'), (429, 'rateLimitExceeded'))
+
+# Uploads are dated backwards from here, one every few days
+CATALOG_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _digest(*parts) -> bytes:
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).digest()
+
+
+def _unit(*parts) -> float:
+    """Deterministic float in [0, 1) for the given key"""
+    return int.from_bytes(_digest(*parts)[:8], 'big') / 2 ** 64
+
+
+def _token(*parts, length: int) -> str:
+    return base64.urlsafe_b64encode(_digest(*parts)).decode('ascii')[:length]
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class SyntheticCatalog:
+    """
+    Deterministic fake YouTube: every attribute is derived from a hash of the ID and the seed,
+    so any channel ID or handle resolves and repeated runs see identical data
+    Video IDs are <5-char channel prefix><6-digit upload index>, which keeps them reversible
+    """
+
+    def __init__(self, seed: int = 0, uploads_range: Tuple[int, int] = (60, 400),
+                 shorts_fraction: float = 0.2, comments_disabled_fraction: float = 0.03,
+                 max_comment_threads: int = 500, thumbnail_base_url: str = THUMBNAIL_BASE_URL):
+        self.seed = seed
+        self.uploads_range = uploads_range
+        self.shorts_fraction = shorts_fraction
+        self.comments_disabled_fraction = comments_disabled_fraction
+        self.max_comment_threads = max_comment_threads
+        self.thumbnail_base_url = thumbnail_base_url.rstrip('/')
+
+    # ------------------------------------------------------------------ channels
+
+    def channel_id_for_handle(self, handle: str) -> str:
+        return 'UC' + _token(self.seed, 'handle', handle.lstrip('@').lower(), length=22)
+
+    def _prefix(self, channel_id: str) -> str:
+        return _token(self.seed, 'prefix', channel_id, length=5)
+
+    def upload_count(self, channel_id: str) -> int:
+        low, high = self.uploads_range
+        return low + int(_unit(self.seed, 'uploads', channel_id) * (high - low + 1))
+
+    def channel(self, channel_id: str, title: Optional[str] = None, statistics: bool = False) -> Dict:
+        channel = {
+            'kind': 'youtube#channel',
+            'id': channel_id,
+            'snippet': {
+                'title': title or f"Channel {channel_id[2:8]}",
+                'description': f"Synthetic channel {channel_id}",
+                'thumbnails': {'high': {'url': f"{self.thumbnail_base_url}/ch/{channel_id}/hqdefault.jpg"}}
+            },
+            'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}}
+        }
+        if statistics:
+            channel['statistics'] = {
+                'subscriberCount': str(int(10 ** (3 + 5 * _unit(self.seed, 'subscribers', channel_id)))),
+                'videoCount': str(self.upload_count(channel_id)),
+                'viewCount': str(int(10 ** (5 + 5 * _unit(self.seed, 'channel_views', channel_id))))
+            }
+        return channel
+
+    # ------------------------------------------------------------------ videos
+
+    def upload_ids(self, playlist_id: str, offset: int, limit: int) -> Tuple[List[str], int]:
+        """Video IDs of an uploads playlist page (newest first) and the playlist length"""
+        channel_id = 'UC' + playlist_id[2:]
+        total = self.upload_count(channel_id)
+        prefix = self._prefix(channel_id)
+        return [f"{prefix}{index:06d}" for index in range(offset, min(total, offset + limit))], total
+
+    def _scale(self, video_id: str) -> float:
+        """Channel popularity shared by all of its videos"""
+        return 10 ** (3 + 4 * _unit(self.seed, 'scale', video_id[:5]))
+
+    def published_at(self, video_id: str) -> str:
+        index = int(video_id[5:]) if video_id[5:].isdigit() else 0
+        return _timestamp(CATALOG_EPOCH - timedelta(days=index * 3.5))
+
+    def thumbnail_url(self, video_id: str) -> str:
+        return f"{self.thumbnail_base_url}/vi/{video_id}/hqdefault.jpg"
+
+    def video(self, video_id: str) -> Dict:
+        views = int(self._scale(video_id) * random.Random(_digest(self.seed, 'views', video_id)).lognormvariate(0, 1))
+        short = _unit(self.seed, 'short', video_id) < self.shorts_fraction
+        seconds = 15 + int(_unit(self.seed, 'length', video_id) * (160 if short else 2400))
+        return {
+            'kind': 'youtube#video',
+            'id': video_id,
+            'snippet': {
+                'title': f"Video {video_id} title",
+                'description': f"Synthetic description for {video_id}. " * 4,
+                'publishedAt': self.published_at(video_id),
+                'tags': [f"tag{i}" for i in range(int(_unit(self.seed, 'tags', video_id) * 12))],
+                'thumbnails': {'high': {'url': self.thumbnail_url(video_id)}}
+            },
+            'contentDetails': {'duration': f"PT{seconds // 60}M{seconds % 60}S"},
+            'statistics': {
+                'viewCount': str(views),
+                'likeCount': str(int(views * 0.04 * _unit(self.seed, 'likes', video_id))),
+                'commentCount': str(self.comment_thread_count(video_id, views))
+            }
+        }
+
+    def playlist_item(self, playlist_id: str, video_id: str) -> Dict:
+        return {
+            'kind': 'youtube#playlistItem',
+            'snippet': {
+                'playlistId': playlist_id,
+                'title': f"Video {video_id} title",
+                'publishedAt': self.published_at(video_id),
+                'resourceId': {'kind': 'youtube#video', 'videoId': video_id},
+                'thumbnails': {'high': {'url': self.thumbnail_url(video_id)}}
+            },
+            'contentDetails': {'videoId': video_id, 'videoPublishedAt': self.published_at(video_id)}
+        }
+
+    # ------------------------------------------------------------------ comments and captions
+
+    def comments_disabled(self, video_id: str) -> bool:
+        return _unit(self.seed, 'disabled', video_id) < self.comments_disabled_fraction
+
+    def comment_thread_count(self, video_id: str, views: Optional[int] = None) -> int:
+        if views is None:
+            views = int(self.video(video_id)['statistics']['viewCount'])
+        return min(self.max_comment_threads, views // 500)
+
+    def reply_count(self, comment_id: str) -> int:
+        return int(_unit(self.seed, 'replies', comment_id) ** 3 * 30)
+
+    def comment(self, comment_id: str, video_id: str) -> Dict:
+        return {
+            'kind': 'youtube#comment',
+            'id': comment_id,
+            'snippet': {
+                'videoId': video_id,
+                'textDisplay': f"Synthetic comment {comment_id}",
+                'authorDisplayName': f"user_{_token(self.seed, 'author', comment_id, length=6)}",
+                'publishedAt': self.published_at(video_id),
+                'likeCount': int(_unit(self.seed, 'comment_likes', comment_id) * 200)
+            }
+        }
+
+    def comment_threads(self, video_id: str, offset: int, limit: int, replies: bool) -> Tuple[List[Dict], int]:
+        total = self.comment_thread_count(video_id)
+        threads = []
+        for index in range(offset, min(total, offset + limit)):
+            comment_id = f"Ug{video_id}{index:05d}"
+            reply_count = self.reply_count(comment_id)
+            thread = {
+                'kind': 'youtube#commentThread',
+                'id': comment_id,
+                'snippet': {
+                    'videoId': video_id,
+                    'topLevelComment': self.comment(comment_id, video_id),
+                    'totalReplyCount': reply_count
+                }
+            }
+            if replies and reply_count:
+                # Like the real API, at most 5 replies come inline with the thread
+                thread['replies'] = {'comments': [self.comment(f"{comment_id}.r{i}", video_id)
+                                                  for i in range(min(reply_count, 5))]}
+            threads.append(thread)
+        return threads, total
+
+    def replies(self, parent_id: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        total = self.reply_count(parent_id)
+        video_id = parent_id[2:13]
+        return [self.comment(f"{parent_id}.r{i}", video_id) for i in range(offset, min(total, offset + limit))], total
+
+    def captions(self, video_id: str) -> List[Dict]:
+        tracks = []
+        for i, language in enumerate(('en', 'es', 'de', 'fr', 'pt')[:int(_unit(self.seed, 'captions', video_id) * 4)]):
+            tracks.append({
+                'kind': 'youtube#caption',
+                'id': f"cap{video_id}{i}",
+                'snippet': {
+                    'videoId': video_id,
+                    'language': language,
+                    'name': '' if i == 0 else language.upper(),
+                    'trackKind': 'asr' if i == 0 else 'standard'
+                }
+            })
+        return tracks
+
+    def thumbnail(self, video_id: str) -> bytes:
+        """JPEG bytes for a video thumbnail (a flat colour derived from the ID)"""
+        color = _digest(self.seed, 'thumbnail', video_id)[:3]
+        if cv2 is None:
+            return b'\xff\xd8\xff\xe0' + color * 4096 + b'\xff\xd9'
+        image = np.zeros((360, 480, 3), dtype=np.uint8)
+        image[:] = tuple(color)
+        return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+class MockYouTubeBackend:
+    """
+    Request handling shared by every transport: routing, quota per API key, latency and errors
+    `handle_api` returns (status, JSON payload); `handle_thumbnail` returns (status, headers, body)
+    """
+
+    def __init__(self, catalog: Optional[SyntheticCatalog] = None, latency: float = 0.0,
+                 latency_jitter: float = 0.0, error_rate: float = 0.0,
+                 quota_per_key: Optional[int] = None, thumbnail_latency: float = 0.0,
+                 thumbnail_error_rate: float = 0.0, seed: int = 0):
+        self.catalog = catalog or SyntheticCatalog(seed=seed)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.quota_per_key = quota_per_key
+        self.thumbnail_latency = thumbnail_latency
+        self.thumbnail_error_rate = thumbnail_error_rate
+
+        self.requests_by_endpoint = Counter()
+        self.errors_by_reason = Counter()
+        self.units_by_key = Counter()
+        self.thumbnails_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ helpers
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _sleep(self, latency: float):
+        if latency <= 0 and self.latency_jitter <= 0:
+            return
+        with self._lock:
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter) if self.latency_jitter else 0.0
+        time.sleep(max(0.0, latency + jitter))
+
+    def _error(self, status: int, reason: str, message: Optional[str] = None) -> Tuple[int, Dict]:
+        with self._lock:
+            self.errors_by_reason[reason] += 1
+        message = message or reason
+        return status, {'error': {'code': status, 'message': message,
+                                  'errors': [{'message': message, 'domain': 'youtube.mock', 'reason': reason}]}}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': sum(self.requests_by_endpoint.values()),
+                'requests_by_endpoint': dict(self.requests_by_endpoint),
+                'errors_by_reason': dict(self.errors_by_reason),
+                'units_by_key': {f"…{key[-4:]}": units for key, units in self.units_by_key.items()},
+                'thumbnails_served': self.thumbnails_served
+            }
+
+    # ------------------------------------------------------------------ API
+
+    def handle_api(self, resource: str, query: Dict[str, str]) -> Tuple[int, Dict]:
+        endpoint = f"{resource}.list"
+        handler = getattr(self, f"_list_{resource}", None)
+        if handler is None:
+            return self._error(404, 'notFound', f"Unknown resource {resource}")
+
+        api_key = query.get('key', '')
+        cost = ENDPOINT_COSTS.get(endpoint, 1)
+        with self._lock:
+            self.requests_by_endpoint[endpoint] += 1
+            over_quota = self.quota_per_key is not None and self.units_by_key[api_key] + cost > self.quota_per_key
+            if not over_quota:
+                # Failed requests are billed too, as on the real API
+                self.units_by_key[api_key] += cost
+
+        self._sleep(self.latency)
+        if over_quota:
+            return self._error(403, 'quotaExceeded', "The request cannot be completed because you have exceeded your quota.")
+        if self._roll(self.error_rate):
+            with self._lock:
+                status, reason = self._rng.choice(INJECTED_ERRORS)
+            return self._error(status, reason)
+        return handler(query)
+
+    @staticmethod
+    def _page(query: Dict[str, str], default: int = 5, maximum: int = 50) -> Tuple[int, int]:
+        offset = int(query.get('pageToken') or 0)
+        limit = max(1, min(maximum, int(query.get('maxResults') or default)))
+        return offset, limit
+
+    @staticmethod
+    def _list(kind: str, items: List[Dict], next_offset: Optional[int] = None, total: Optional[int] = None) -> Tuple[int, Dict]:
+        payload = {'kind': f"youtube#{kind}ListResponse", 'items': items,
+                   'pageInfo': {'totalResults': len(items) if total is None else total, 'resultsPerPage': len(items)}}
+        if next_offset is not None:
+            payload['nextPageToken'] = str(next_offset)
+        return 200, payload
+
+    def _list_channels(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        statistics = 'statistics' in query.get('part', '')
+        if query.get('forHandle'):
+            handle = query['forHandle'].lstrip('@')
+            if not handle:
+                return self._list('channel', [])
+            channel_id = self.catalog.channel_id_for_handle(handle)
+            return self._list('channel', [self.catalog.channel(channel_id, title=handle, statistics=statistics)])
+        ids = [channel_id for channel_id in query.get('id', '').split(',') if channel_id]
+        return self._list('channel', [self.catalog.channel(channel_id, statistics=statistics) for channel_id in ids[:50]])
+
+    def _list_search(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        channel_id = self.catalog.channel_id_for_handle(query.get('q', ''))
+        return self._list('search', [{'kind': 'youtube#searchResult',
+                                      'id': {'kind': 'youtube#channel', 'channelId': channel_id},
+                                      'snippet': {'channelId': channel_id, 'title': query.get('q', '')}}])
+
+    def _list_playlistItems(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        playlist_id = query.get('playlistId', '')
+        if not playlist_id.startswith('UU'):
+            return self._error(404, 'playlistNotFound')
+        offset, limit = self._page(query)
+        video_ids, total = self.catalog.upload_ids(playlist_id, offset, limit)
+        next_offset = offset + limit if offset + limit < total else None
+        return self._list('playlistItem', [self.catalog.playlist_item(playlist_id, video_id) for video_id in video_ids],
+                          next_offset, total)
+
+    def _list_videos(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        ids = [video_id for video_id in query.get('id', '').split(',') if video_id]
+        return self._list('video', [self.catalog.video(video_id) for video_id in ids[:50]])
+
+    def _list_commentThreads(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        video_id = query.get('videoId', '')
+        if self.catalog.comments_disabled(video_id):
+            return self._error(403, 'commentsDisabled')
+        offset, limit = self._page(query, default=20, maximum=100)
+        threads, total = self.catalog.comment_threads(video_id, offset, limit, 'replies' in query.get('part', ''))
+        return self._list('commentThread', threads, offset + limit if offset + limit < total else None)
+
+    def _list_comments(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        offset, limit = self._page(query, default=20, maximum=100)
+        replies, total = self.catalog.replies(query.get('parentId', ''), offset, limit)
+        return self._list('comment', replies, offset + limit if offset + limit < total else None)
+
+    def _list_captions(self, query: Dict[str, str]) -> Tuple[int, Dict]:
+        return self._list('caption', self.catalog.captions(query.get('videoId', '')))
+
+    # ------------------------------------------------------------------ thumbnail CDN
+
+    def handle_thumbnail(self, path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """/vi/<video_id>/hqdefault.jpg (or /ch/<channel_id>/...) with ETag revalidation"""
+        parts = path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] not in ('vi', 'ch'):
+            return 404, {}, b''
+        self._sleep(self.thumbnail_latency)
+        if self._roll(self.thumbnail_error_rate):
+            return 503, {}, b''
+
+        body = self.catalog.thumbnail(parts[1])
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        response_headers = {'ETag': etag, 'Content-Type': 'image/jpeg',
+                            'Last-Modified': formatdate(CATALOG_EPOCH.timestamp(), usegmt=True)}
+        with self._lock:
+            self.thumbnails_served += 1
+        if headers.get('If-None-Match') == etag:
+            return 304, response_headers, b''
+        return 200, response_headers, body
+
+
+class MockHttp:
+    """httplib2.Http stand-in for googleapiclient: build('youtube', 'v3', developerKey=..., http=MockHttp(backend))"""
+
+    def __init__(self, backend: MockYouTubeBackend):
+        self.backend = backend
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        parts = urlsplit(uri)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        if not parts.path.startswith(API_PREFIX):
+            status, payload = 404, {'error': {'code': 404, 'message': f"Not found: {parts.path}", 'errors': []}}
+        else:
+            status, payload = self.backend.handle_api(parts.path[len(API_PREFIX):], query)
+        response = httplib2.Response({'status': status, 'content-type': 'application/json; charset=UTF-8'})
+        response.reason = 'OK' if status == 200 else 'Error'
+        return response, json.dumps(payload).encode('utf-8')
+
+    def close(self):
+        pass
+
+
+class ThumbnailCdnAdapter(BaseAdapter):
+    """requests transport adapter answering thumbnail URLs from the backend; see install_thumbnail_cdn"""
+
+    def __init__(self, backend: MockYouTubeBackend):
+        super().__init__()
+        self.backend = backend
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        status, headers, body = self.backend.handle_thumbnail(urlsplit(request.url).path, dict(request.headers))
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK' if status == 200 else 'Not Modified' if status == 304 else 'Error'
+        return response
+
+    def close(self):
+        pass
+
+
+def mock_client_factory(backend: MockYouTubeBackend) -> Callable[[str], Any]:
+    """client_factory for CorrectedDataExtractor: real googleapiclient clients over MockHttp"""
+    from googleapiclient.discovery import build
+
+    def factory(api_key: str):
+        return build('youtube', 'v3', developerKey=api_key, http=MockHttp(backend), static_discovery=True)
+    return factory
+
+
+def install_thumbnail_cdn(session: requests.Session, backend: MockYouTubeBackend,
+                          base_url: str = THUMBNAIL_BASE_URL):
+    """Route a session's requests for `base_url` (e.g. ThumbnailDownloader.session) to the backend"""
+    session.mount(base_url.rstrip('/') + '/', ThumbnailCdnAdapter(backend))
+
+
+class MockYouTubeServer:
+    """
+    Threaded local HTTP server for the same backend: API under /youtube/v3/, thumbnails under /vi/
+    Point the extractor at it with api_endpoint=server.url (YOUTUBE_API_ENDPOINT in main())
+    """
+
+    def __init__(self, backend: MockYouTubeBackend, host: str = '127.0.0.1', port: int = 0):
+        self.backend = backend
+        backend_ref = backend
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path.startswith(API_PREFIX):
+                    query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                    status, payload = backend_ref.handle_api(parts.path[len(API_PREFIX):], query)
+                    headers, body = {'Content-Type': 'application/json; charset=UTF-8'}, json.dumps(payload).encode('utf-8')
+                else:
+                    status, headers, body = backend_ref.handle_thumbnail(parts.path, dict(self.headers))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        # Thumbnail URLs in API responses point back at this server
+        backend.catalog.thumbnail_base_url = self.url
+        self._thread = None
+
+    def start(self) -> 'MockYouTubeServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-youtube', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------------------------------------------------------------------- benchmark
+
+def run_benchmark(channels: int = 2, workers: List[int] = (1, 4), video_workers: int = 8, runs: int = 2,
+                  latency: float = 0.02, error_rate: float = 0.0, quota_per_key: Optional[int] = None,
+                  api_keys: int = 1, use_cache: bool = True, server: bool = False, seed: int = 0,
+                  extractor_options: Optional[Dict] = None) -> List[Dict]:
+    """
+    Run CorrectedDataExtractor against the mock, once per worker count and `runs` times each.
+    Every run extracts the same channels into a new output folder, while the response, caption
+    and channel ID caches carry over, so later runs show what the caches save.
+    Each configuration gets a fresh temporary working directory; returns one row per run
+    """
+    from corrected_data_extractor import PROGRESS_FILE, CorrectedDataExtractor
+
+    rows = []
+    start_dir = os.getcwd()
+    for worker_count in workers:
+        backend = MockYouTubeBackend(latency=latency, latency_jitter=latency / 2, error_rate=error_rate,
+                                     quota_per_key=quota_per_key, thumbnail_latency=latency / 2, seed=seed)
+        mock_server = MockYouTubeServer(backend).start() if server else None
+        work_dir = tempfile.mkdtemp(prefix='mock_youtube_bench_')
+        keys = [f"MOCK-KEY-{i:04d}" for i in range(api_keys)]
+        try:
+            os.chdir(work_dir)
+            for run in range(1, runs + 1):
+                if os.path.exists(PROGRESS_FILE):
+                    os.remove(PROGRESS_FILE)
+                before = backend.stats()
+                options = {
+                    'test_mode': True, 'max_channels': channels, 'max_workers': worker_count,
+                    'max_video_workers': video_workers, 'api_rate_limit': 10000.0,
+                    'daily_quota': 10 ** 9, 'quota_per_key': quota_per_key or 10 ** 9,
+                    'api_keys': keys, 'retry_base_delay': 0.05,
+                    **({} if use_cache else {'api_cache_file': None, 'caption_cache_file': None}),
+                    **(extractor_options or {})
+                }
+                if server:
+                    options['api_endpoint'] = mock_server.url
+                else:
+                    options['client_factory'] = mock_client_factory(backend)
+                extractor = CorrectedDataExtractor(keys[0], **options)
+                if not server:
+                    install_thumbnail_cdn(extractor.thumbnail_downloader.session, backend)
+
+                started = time.perf_counter()
+                try:
+                    results = extractor.execute_api_only_extraction(os.path.join('extracted_data', f"run{run}"))
+                    elapsed = time.perf_counter() - started
+                finally:
+                    extractor.close()
+
+                after = backend.stats()
+                rows.append({
+                    'workers': worker_count,
+                    'run': run,
+                    'seconds': round(elapsed, 2),
+                    'channels': results.get('channels_processed', 0),
+                    'videos': results.get('videos_selected', 0),
+                    'api_requests': after['requests'] - before['requests'],
+                    'api_errors': sum(after['errors_by_reason'].values()) - sum(before['errors_by_reason'].values()),
+                    'units_billed': sum(after['units_by_key'].values()) - sum(before['units_by_key'].values()),
+                    'thumbnails_served': after['thumbnails_served'] - before['thumbnails_served']
+                })
+        finally:
+            os.chdir(start_dir)
+            if mock_server:
+                mock_server.stop()
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return rows
+
+
+def _print_table(rows: List[Dict]):
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    print('  '.join(column.rjust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(str(row[column]).rjust(widths[column]) for column in columns))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Offline mock of the YouTube Data API v3 for tests and benchmarks")
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds added to every API response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of API calls answered with 5xx/429")
+    parser.add_argument('--quota-per-key', type=int, default=None, help="units per API key before 403 quotaExceeded")
+    parser.add_argument('--seed', type=int, default=0, help="catalog and error-injection seed")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="run the mock as a local HTTP server")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8089)
+
+    bench = commands.add_parser('bench', help="benchmark CorrectedDataExtractor against the mock")
+    bench.add_argument('--channels', type=int, default=2, help="channels per genre (test mode)")
+    bench.add_argument('--workers', default='1,4', help="comma-separated channel worker counts to compare")
+    bench.add_argument('--video-workers', type=int, default=8)
+    bench.add_argument('--runs', type=int, default=2, help="runs per configuration (later runs are warm)")
+    bench.add_argument('--api-keys', type=int, default=1, help="keys in the extractor's key pool")
+    bench.add_argument('--no-cache', action='store_true', help="disable the API response and caption caches")
+    bench.add_argument('--server', action='store_true', help="go through the HTTP server instead of in-process transports")
+    bench.add_argument('--verbose', action='store_true', help="show the extractor's log")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        backend = MockYouTubeBackend(latency=args.latency, error_rate=args.error_rate,
+                                     quota_per_key=args.quota_per_key, seed=args.seed)
+        server = MockYouTubeServer(backend, host=args.host, port=args.port)
+        print(f"🧪 Mock YouTube API on {server.url} (YOUTUBE_API_ENDPOINT={server.url})")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            print(json.dumps(backend.stats(), indent=2))
+        return
+
+    # Claim the root logger first so the extractor's basicConfig does not flood the table
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+    rows = run_benchmark(
+        channels=args.channels,
+        workers=[int(count) for count in args.workers.split(',') if count],
+        video_workers=args.video_workers,
+        runs=args.runs,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        quota_per_key=args.quota_per_key,
+        api_keys=args.api_keys,
+        use_cache=not args.no_cache,
+        server=args.server,
+        seed=args.seed
+    )
+    _print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,18 @@ Addresses performance issues and improves prediction accuracy
 
 import os
 import sys
+import copy
 import json
+import hashlib
+import logging
+import threading
 import warnings
 import joblib
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Tuple
+from collections import OrderedDict
 from datetime import datetime
 import ast
 from io import BytesIO
@@ -28,11 +33,76 @@ import uvicorn
 warnings.filterwarnings('ignore')
 
 
+# Embedding size per text field, matching the <text type>_embed_<i> columns the models were trained on
+EMBEDDING_DIMENSIONS = {'title': 30, 'description': 30, 'tags': 20, 'thumb_text': 15}
+
+
+class ThumbnailFeatureCache:
+    """
+    Thread-safe LRU map of image content hash -> extracted thumbnail features
+    Bounded by entry count and by the approximate size of the cached features
+    """
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # hash -> (features, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(image_bytes: bytes) -> bytes:
+        return hashlib.blake2b(image_bytes, digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[Dict]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: bytes, features: Dict):
+        size = sys.getsizeof(key) + len(json.dumps(features))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (features, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
 class ThumbnailProcessor:
     """Optimized thumbnail processor with pre-loaded models"""
     
-    def __init__(self):
+    def __init__(self, cache_entries: int = 1024, cache_bytes: int = 16 * 1024 * 1024):
         """Initialize with pre-loaded face cascade"""
+        # Re-uploads of the same image (common while iterating on titles) skip extraction entirely
+        self.feature_cache = ThumbnailFeatureCache(cache_entries, cache_bytes)
         try:
             self.face_cascade = cv2.CascadeClassifier(
                 cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
@@ -45,7 +115,20 @@ class ThumbnailProcessor:
             self.face_cascade = None
     
     def extract_features(self, image_bytes: bytes) -> Dict:
-        """Extract features using optimized methods"""
+        """Extract features using optimized methods, served from the content-hash cache for repeat images"""
+        key = self.feature_cache.key(image_bytes)
+        features = self.feature_cache.get(key)
+        if features is None:
+            features = self._extract_features_uncached(image_bytes)
+            if features is not None:
+                self.feature_cache.put(key, features)
+            else:
+                return self._get_default_features()
+        # Callers get a deep copy: the palette and colour lists are nested, and edits to them must never reach the cache
+        return copy.deepcopy(features)
+    
+    def _extract_features_uncached(self, image_bytes: bytes) -> Optional[Dict]:
+        """Full extraction; None when the image cannot be processed (not cached, so a retry runs again)"""
         try:
             # Convert bytes to PIL Image
             image = Image.open(BytesIO(image_bytes))
@@ -78,7 +161,7 @@ class ThumbnailProcessor:
             
         except Exception as e:
             print(f"Thumbnail processing error: {e}")
-            return self._get_default_features()
+            return None
     
     def _extract_color_features_fast(self, img_pil: Image.Image, img_bgr) -> Dict:
         """Fast color extraction using PIL quantization instead of KMeans"""
@@ -237,13 +320,124 @@ class ThumbnailProcessor:
         return features
 
 
+class FeaturePlan:
+    """
+    A model's feature list compiled once into column index arrays per value source
+    (embedding block slices, thumbnail fields, genre one-hots, duration, title stats, raw video fields),
+    so filling a row at request time needs no column-name parsing
+    """
+    
+    # Fallbacks for visual columns whose name is not itself a thumbnail feature: (name substrings, feature, default)
+    VISUAL_FALLBACKS = [
+        (('avg_r', 'average_r'), 'avg_r', 128.0),
+        (('avg_g', 'average_g'), 'avg_g', 128.0),
+        (('avg_b', 'average_b'), 'avg_b', 128.0),
+        (('brightness',), 'brightness', 128.0),
+        (('contrast',), 'contrast', 50.0),
+        (('saturation',), 'saturation', 128.0),
+        (('warm_cool',), 'warm_cool', 0.0),
+        (('face',), 'face_area_percentage', 0.0),
+        (('edge_density',), 'edge_density', 0.1),
+    ]
+    
+    def __init__(self, feature_list: List[str], thumbnail_defaults: Dict):
+        self.feature_list = list(feature_list)
+        self.size = len(self.feature_list)
+        
+        embedding_columns = {text_type: ([], []) for text_type in EMBEDDING_DIMENSIONS}
+        thumbnail_columns, self.thumbnail_fields = [], []
+        genre_columns = {}
+        duration_columns, title_length_columns, title_word_columns = [], [], []
+        self.video_fields = []
+        
+        for pos, col in enumerate(self.feature_list):
+            text_type = next((t for t in EMBEDDING_DIMENSIONS if f'{t}_embed_' in col), None)
+            if text_type is not None:
+                embedding_columns[text_type][0].append(pos)
+                embedding_columns[text_type][1].append(int(col.split('_')[-1]))
+            elif col in thumbnail_defaults:
+                thumbnail_columns.append(pos)
+                self.thumbnail_fields.append((col, thumbnail_defaults[col]))
+            elif self._visual_fallback(col) is not None:
+                thumbnail_columns.append(pos)
+                self.thumbnail_fields.append(self._visual_fallback(col))
+            elif col.startswith('genre_'):
+                genre_columns.setdefault(col[len('genre_'):], []).append(pos)
+            elif 'duration' in col:
+                duration_columns.append(pos)
+            elif 'title_length' in col:
+                title_length_columns.append(pos)
+            elif 'title_word_count' in col:
+                title_word_columns.append(pos)
+            else:
+                self.video_fields.append((pos, col))
+        
+        # (text type, row positions, block indices, block length needed to fill every position)
+        self.embedding_slices = [
+            (text_type, np.array(cols, dtype=np.intp), np.array(idx, dtype=np.intp), max(idx) + 1)
+            for text_type, (cols, idx) in embedding_columns.items() if cols
+        ]
+        self.thumbnail_columns = np.array(thumbnail_columns, dtype=np.intp)
+        self.genre_columns = {genre: np.array(cols, dtype=np.intp) for genre, cols in genre_columns.items()}
+        self.duration_columns = np.array(duration_columns, dtype=np.intp)
+        self.title_length_columns = np.array(title_length_columns, dtype=np.intp)
+        self.title_word_columns = np.array(title_word_columns, dtype=np.intp)
+    
+    @classmethod
+    def _visual_fallback(cls, col: str) -> Optional[Tuple[str, float]]:
+        for substrings, feature, default in cls.VISUAL_FALLBACKS:
+            if any(s in col for s in substrings):
+                return feature, default
+        return None
+    
+    def fill(self, row: np.ndarray, video_data: Dict, thumbnail_features: Dict,
+             embeddings: Dict[str, np.ndarray]):
+        """Write one example into a zeroed row of length `size`"""
+        for text_type, cols, idx, needed in self.embedding_slices:
+            block = embeddings[text_type]
+            if len(block) >= needed:
+                row[cols] = block[idx]
+            else:
+                # Fewer SVD components than columns: the missing ones stay 0.0
+                keep = idx < len(block)
+                row[cols[keep]] = block[idx[keep]]
+        
+        if len(self.thumbnail_columns):
+            row[self.thumbnail_columns] = [thumbnail_features.get(key, default)
+                                           for key, default in self.thumbnail_fields]
+        
+        genre_cols = self.genre_columns.get(video_data.get('genre', 'unknown'))
+        if genre_cols is not None:
+            row[genre_cols] = 1.0
+        
+        title = video_data.get('title', '')
+        row[self.duration_columns] = video_data.get('duration_seconds', 300.0)
+        row[self.title_length_columns] = len(title)
+        row[self.title_word_columns] = len(title.split())
+        
+        for pos, key in self.video_fields:
+            if key in video_data:
+                row[pos] = float(video_data[key])
+    
+    def build(self, video_data: Dict, thumbnail_features: Dict,
+              embeddings: Dict[str, np.ndarray]) -> np.ndarray:
+        """Single-row feature matrix (1 x size)"""
+        X = np.zeros((1, self.size))
+        self.fill(X[0], video_data, thumbnail_features, embeddings)
+        return X
+
+
 class YouTubePredictionSystem:
     """ML prediction system with optimized embeddings and model loading"""
     
     def __init__(self):
+        self.logger = logging.getLogger(__name__)
         self.models = {}
         self.scalers = {}
         self.feature_lists = {}
+        self.feature_plans = {}
+        # Column names, per estimator fitted on a DataFrame, wrapped around its feature matrix at predict time
+        self.feature_columns = {}
         self.baseline_models = {}
         self.guardrails = {}
         self.thumbnail_processor = ThumbnailProcessor()
@@ -293,6 +487,24 @@ class YouTubePredictionSystem:
                 self.feature_lists['views_baseline'] = joblib.load(models_dir / "views_baseline_features.joblib")
                 print(f"Views model loaded ({len(self.feature_lists['views'])} features)")
             
+            # Compile the thumbnail-aware feature lists into fill plans
+            thumbnail_defaults = self.thumbnail_processor._get_default_features()
+            for model_type in ('ctr', 'rqs'):
+                if model_type in self.feature_lists:
+                    self.feature_plans[model_type] = FeaturePlan(self.feature_lists[model_type], thumbnail_defaults)
+            
+            # Every matrix is built in feature-list order, so that order must be the one each estimator was fitted on
+            for key, estimator, feature_list_key in (
+                ('ctr', self.models.get('ctr'), 'ctr'),
+                ('ctr_baseline', self.baseline_models.get('ctr'), 'ctr_baseline'),
+                ('rqs', self.models.get('rqs'), 'rqs'),
+                ('views_baseline', self.baseline_models.get('views'), 'views_baseline'),
+                ('views_scaler', self.scalers.get('views'), 'views'),
+                ('views', self.models.get('views'), 'views'),
+            ):
+                if estimator is not None:
+                    self._register_feature_columns(key, estimator, self.feature_lists[feature_list_key])
+            
             # Load guardrails
             if (models_dir / "views_guardrails.json").exists():
                 with open(models_dir / "views_guardrails.json", 'r') as f:
@@ -303,6 +515,24 @@ class YouTubePredictionSystem:
             print(f"Error loading models: {e}")
             raise
     
+    def _register_feature_columns(self, key: str, estimator, feature_list: List[str]):
+        """Check a feature list against the columns its estimator was fitted on and cache them for _as_frame"""
+        fitted = getattr(estimator, 'feature_names_in_', None)
+        if fitted is None:
+            # Fitted on a bare array: keep passing it one
+            return
+        if list(fitted) != list(feature_list):
+            raise ValueError(f"{key} feature list does not match the {len(fitted)} columns "
+                             f"the estimator was fitted on (names or order differ)")
+        self.feature_columns[key] = pd.Index(fitted)
+    
+    def _as_frame(self, key: str, X: np.ndarray):
+        """Name the columns of a feature matrix for an estimator fitted on a DataFrame (the array is not copied)"""
+        columns = self.feature_columns.get(key)
+        if columns is None:
+            return X
+        return pd.DataFrame(X, columns=columns, copy=False)
+    
     def load_embedding_models(self):
         """Load TF-IDF and SVD models for proper embeddings"""
         models_dir = Path(__file__).parent.parent / "models"
@@ -366,90 +596,38 @@ class YouTubePredictionSystem:
         
         return np.array(features[:n_components])
     
-    def prepare_features_with_thumbnail(self, video_data: Dict, thumbnail_features: Dict, 
-                                       feature_list: List[str]) -> pd.DataFrame:
-        """Prepare features with proper embeddings and thumbnail data"""
-        features = {}
-        
-        for col in feature_list:
-            # Handle embedding features properly
-            if 'title_embed_' in col:
-                idx = int(col.split('_')[-1])
-                title_embedding = self.generate_embeddings(
-                    video_data.get('title', ''), 'title', 30
-                )
-                features[col] = title_embedding[idx] if idx < len(title_embedding) else 0.0
-                
-            elif 'description_embed_' in col:
-                idx = int(col.split('_')[-1])
-                desc_embedding = self.generate_embeddings(
-                    video_data.get('description', ''), 'description', 30
-                )
-                features[col] = desc_embedding[idx] if idx < len(desc_embedding) else 0.0
-                
-            elif 'tags_embed_' in col:
-                idx = int(col.split('_')[-1])
-                tags_text = ' '.join(video_data.get('tags', [])) if isinstance(video_data.get('tags'), list) else ''
-                tags_embedding = self.generate_embeddings(tags_text, 'tags', 20)
-                features[col] = tags_embedding[idx] if idx < len(tags_embedding) else 0.0
-                
-            elif 'thumb_text_embed_' in col:
-                idx = int(col.split('_')[-1])
-                thumb_embedding = self.generate_embeddings(
-                    video_data.get('thumbnail_text', ''), 'thumb_text', 15
-                )
-                features[col] = thumb_embedding[idx] if idx < len(thumb_embedding) else 0.0
-            
-            # Thumbnail visual features
-            elif col in thumbnail_features:
-                features[col] = float(thumbnail_features[col])
-            
-            # RGB features
-            elif 'avg_r' in col or 'average_r' in col:
-                features[col] = thumbnail_features.get('avg_r', 128.0)
-            elif 'avg_g' in col or 'average_g' in col:
-                features[col] = thumbnail_features.get('avg_g', 128.0)
-            elif 'avg_b' in col or 'average_b' in col:
-                features[col] = thumbnail_features.get('avg_b', 128.0)
-            
-            # Other visual features
-            elif 'brightness' in col:
-                features[col] = thumbnail_features.get('brightness', 128.0)
-            elif 'contrast' in col:
-                features[col] = thumbnail_features.get('contrast', 50.0)
-            elif 'saturation' in col:
-                features[col] = thumbnail_features.get('saturation', 128.0)
-            elif 'warm_cool' in col:
-                features[col] = thumbnail_features.get('warm_cool', 0.0)
-            elif 'face' in col:
-                features[col] = thumbnail_features.get('face_area_percentage', 0.0)
-            elif 'edge_density' in col:
-                features[col] = thumbnail_features.get('edge_density', 0.1)
-            
-            # Genre encoding
-            elif col.startswith('genre_'):
-                genre = video_data.get('genre', 'unknown')
-                features[col] = 1.0 if col == f'genre_{genre}' else 0.0
-            
-            # Duration features
-            elif 'duration' in col:
-                features[col] = video_data.get('duration_seconds', 300.0)
-            
-            # Title features
-            elif 'title_length' in col:
-                features[col] = len(video_data.get('title', ''))
-            elif 'title_word_count' in col:
-                features[col] = len(video_data.get('title', '').split())
-            
-            # Other features
-            elif col in video_data:
-                features[col] = float(video_data[col])
-            else:
-                features[col] = 0.0
-        
-        return pd.DataFrame([features])[feature_list]
+    def compute_text_embeddings(self, video_data: Dict,
+                                cache: Optional[Dict[Tuple[str, str], np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        TF-IDF/SVD embedding of every text field, computed once and shared by the CTR and RQS models
+        Pass the same `cache` for several videos to embed each distinct text only once
+        """
+        tags = video_data.get('tags')
+        texts = {
+            'title': video_data.get('title', ''),
+            'description': video_data.get('description', ''),
+            'tags': ' '.join(tags) if isinstance(tags, list) else '',
+            'thumb_text': video_data.get('thumbnail_text', '')
+        }
+        if cache is None:
+            cache = {}
+        embeddings = {}
+        for text_type, n_components in EMBEDDING_DIMENSIONS.items():
+            key = (text_type, texts[text_type])
+            if key not in cache:
+                cache[key] = self.generate_embeddings(texts[text_type], text_type, n_components)
+            embeddings[text_type] = cache[key]
+        return embeddings
+    
+    def prepare_features_with_thumbnail(self, video_data: Dict, thumbnail_features: Dict,
+                                       model_type: str,
+                                       embeddings: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Feature row for the CTR or RQS model, filled from its compiled plan"""
+        if embeddings is None:
+            embeddings = self.compute_text_embeddings(video_data)
+        return self.feature_plans[model_type].build(video_data, thumbnail_features, embeddings)
     
-    def prepare_baseline_features(self, video_data: Dict, model_type: str = 'ctr') -> pd.DataFrame:
+    def prepare_baseline_features(self, video_data: Dict, model_type: str = 'ctr') -> np.ndarray:
         """Prepare baseline features for CTR or Views model"""
         features = {
             'log_subs': np.log1p(video_data.get('channel_subscriber_count', 1000)),
@@ -473,25 +651,40 @@ class YouTubePredictionSystem:
         else:
             feature_cols = list(features.keys())
         
-        return pd.DataFrame([features])[feature_cols]
+        return np.array([[features[col] for col in feature_cols]])
+    
+    def build_feature_matrix(self, model_type: str, videos: List[Dict], thumbnails: List[Dict],
+                             embeddings: List[Dict[str, np.ndarray]]) -> np.ndarray:
+        """One feature row per video for the CTR or RQS model"""
+        plan = self.feature_plans[model_type]
+        X = np.zeros((len(videos), plan.size))
+        for row, video_data, thumbnail_features, video_embeddings in zip(X, videos, thumbnails, embeddings):
+            plan.fill(row, video_data, thumbnail_features, video_embeddings)
+        return X
     
-    def predict_ctr(self, video_data: Dict, thumbnail_features: Dict) -> float:
+    def predict_ctr(self, video_data: Dict, thumbnail_features: Dict,
+                    embeddings: Optional[Dict[str, np.ndarray]] = None) -> float:
         """Predict CTR (views/subscribers ratio)"""
+        if embeddings is None:
+            embeddings = self.compute_text_embeddings(video_data)
+        return self.predict_ctr_batch([video_data], [thumbnail_features], [embeddings])[0]
+    
+    def predict_ctr_batch(self, videos: List[Dict], thumbnails: List[Dict],
+                          embeddings: List[Dict[str, np.ndarray]]) -> np.ndarray:
+        """Predict CTR for many videos with one predict call per model"""
         if 'ctr' not in self.models:
-            return 0.05  # 5% default
+            return np.full(len(videos), 0.05)  # 5% default
         
         try:
-            X_residual = self.prepare_features_with_thumbnail(
-                video_data, thumbnail_features, self.feature_lists['ctr']
-            )
+            X_residual = self.build_feature_matrix('ctr', videos, thumbnails, embeddings)
             
             if hasattr(self.models['ctr'], 'predict'):
-                residual_pred = self.models['ctr'].predict(X_residual)[0]
+                residual_pred = self.models['ctr'].predict(self._as_frame('ctr', X_residual))
             else:
-                residual_pred = 0.0
+                residual_pred = np.zeros(len(videos))
             
-            X_baseline = self.prepare_baseline_features(video_data, 'ctr')
-            baseline_pred = self.baseline_models['ctr'].predict(X_baseline)[0]
+            X_baseline = np.vstack([self.prepare_baseline_features(video_data, 'ctr') for video_data in videos])
+            baseline_pred = self.baseline_models['ctr'].predict(self._as_frame('ctr_baseline', X_baseline))
             
             ctr_log = baseline_pred + residual_pred
             # Convert log-space prediction back to original scale using np.expm1,
@@ -502,92 +695,117 @@ class YouTubePredictionSystem:
             
         except Exception as e:
             print(f"CTR prediction error: {e}")
-            return 0.05
+            return np.full(len(videos), 0.05)
     
-    def predict_rqs(self, video_data: Dict, thumbnail_features: Dict) -> float:
+    def predict_rqs(self, video_data: Dict, thumbnail_features: Dict,
+                    embeddings: Optional[Dict[str, np.ndarray]] = None) -> float:
         """Predict RQS (0-100 score)"""
+        if embeddings is None:
+            embeddings = self.compute_text_embeddings(video_data)
+        return self.predict_rqs_batch([video_data], [thumbnail_features], [embeddings])[0]
+    
+    def predict_rqs_batch(self, videos: List[Dict], thumbnails: List[Dict],
+                          embeddings: List[Dict[str, np.ndarray]]) -> np.ndarray:
+        """Predict RQS for many videos with one predict call"""
         if 'rqs' not in self.models:
-            return 50.0
+            return np.full(len(videos), 50.0)
         
         try:
-            X_rqs = self.prepare_features_with_thumbnail(
-                video_data, thumbnail_features, self.feature_lists['rqs']
-            )
+            X_rqs = self.build_feature_matrix('rqs', videos, thumbnails, embeddings)
             
             if hasattr(self.models['rqs'], 'predict'):
-                rqs_pred = self.models['rqs'].predict(X_rqs)[0]
+                rqs_pred = self.models['rqs'].predict(self._as_frame('rqs', X_rqs))
             else:
-                rqs_pred = 50.0
+                rqs_pred = np.full(len(videos), 50.0)
             
             return np.clip(rqs_pred, 10, 90)
             
         except Exception as e:
             print(f"RQS prediction error: {e}")
-            return 50.0
+            return np.full(len(videos), 50.0)
     
     def predict_views(self, ctr_pred: float, rqs_pred: float, video_data: Dict) -> int:
         """Predict views with guardrails"""
-        subs = video_data.get('channel_subscriber_count', 1000)
-        genre = video_data.get('genre', 'unknown')
+        return self.predict_views_batch([ctr_pred], [rqs_pred], [video_data])[0]
+    
+    def predict_views_batch(self, ctr_preds, rqs_preds, videos: List[Dict]) -> List[int]:
+        """Predict views for many videos with one predict call per model, then apply guardrails"""
+        subs = [video_data.get('channel_subscriber_count', 1000) for video_data in videos]
+        fallback = [max(int(s * ctr_pred), 10) for s, ctr_pred in zip(subs, ctr_preds)]
         
         if 'views' not in self.models:
-            return max(int(subs * ctr_pred), 10)
+            return fallback
         
         try:
-            X_baseline = self.prepare_baseline_features(video_data, 'views')
-            baseline_pred = self.baseline_models['views'].predict(X_baseline)[0]
-            
-            # Prepare residual features
-            features = {
-                'ctr_pred': ctr_pred,
-                'ctr_pred_sq': ctr_pred ** 2,
-                'ctr_pred_log': np.log1p(max(0, ctr_pred)),
-                'rqs_pred': rqs_pred,
-                'rqs_pred_sq': (rqs_pred / 100) ** 2,
-                'rqs_pred_sigmoid': 1 / (1 + np.exp(-(rqs_pred - 50) / 10)),
-                'ctr_rqs_interaction': ctr_pred * (rqs_pred / 100),
-                'ctr_rqs_product': np.sqrt(max(0, ctr_pred * rqs_pred / 100)),
-                'log_age': np.log1p(video_data.get('age_days', 0)),
-                'log_age_sq': np.log1p(video_data.get('age_days', 0)) ** 2,
-                'log_subs': np.log1p(subs),
-                'ctr_subs_interaction': ctr_pred * np.log1p(subs)
-            }
-            
-            for col in self.feature_lists.get('views', []):
-                if col.startswith('genre_'):
-                    features[col] = 1.0 if col == f'genre_{genre}' else 0.0
+            X_baseline = np.vstack([self.prepare_baseline_features(video_data, 'views') for video_data in videos])
+            baseline_pred = self.baseline_models['views'].predict(self._as_frame('views_baseline', X_baseline))
             
-            X_residual = pd.DataFrame([features])[self.feature_lists['views']]
-            X_scaled = self.scalers['views'].transform(X_residual)
-            residual_pred = self.models['views'].predict(X_scaled)[0]
+            X_residual = np.array([
+                self._views_residual_row(ctr_pred, rqs_pred, video_data)
+                for ctr_pred, rqs_pred, video_data in zip(ctr_preds, rqs_preds, videos)
+            ])
+            X_scaled = self.scalers['views'].transform(self._as_frame('views_scaler', X_residual))
+            residual_pred = self.models['views'].predict(self._as_frame('views', X_scaled))
             
             views_log = baseline_pred + residual_pred
             views = np.expm1(views_log)
             
-            # Apply guardrails
-            if self.guardrails:
-                log_subs = np.log1p(subs)
-                if log_subs < 6.9:
-                    subs_bucket = 0
-                elif log_subs < 9.2:
-                    subs_bucket = 1
-                elif log_subs < 11.5:
-                    subs_bucket = 2
-                elif log_subs < 13.8:
-                    subs_bucket = 3
-                else:
-                    subs_bucket = 4
-                
-                guardrail_key = f"{genre}|{subs_bucket}"
-                if guardrail_key in self.guardrails:
-                    max_views = self.guardrails[guardrail_key]
-                    views = min(views, max_views)
-            
-            return max(int(views), 10)
+            return [
+                max(int(self._apply_guardrails(v, s, video_data.get('genre', 'unknown'))), 10)
+                for v, s, video_data in zip(views, subs, videos)
+            ]
             
         except Exception as e:
             print(f"Views prediction error: {e}")
-            return max(int(subs * ctr_pred), 10)
+            return fallback
+    
+    def _views_residual_row(self, ctr_pred: float, rqs_pred: float, video_data: Dict) -> List[float]:
+        """Residual feature row for the views model"""
+        subs = video_data.get('channel_subscriber_count', 1000)
+        genre = video_data.get('genre', 'unknown')
+        features = {
+            'ctr_pred': ctr_pred,
+            'ctr_pred_sq': ctr_pred ** 2,
+            'ctr_pred_log': np.log1p(max(0, ctr_pred)),
+            'rqs_pred': rqs_pred,
+            'rqs_pred_sq': (rqs_pred / 100) ** 2,
+            'rqs_pred_sigmoid': 1 / (1 + np.exp(-(rqs_pred - 50) / 10)),
+            'ctr_rqs_interaction': ctr_pred * (rqs_pred / 100),
+            'ctr_rqs_product': np.sqrt(max(0, ctr_pred * rqs_pred / 100)),
+            'log_age': np.log1p(video_data.get('age_days', 0)),
+            'log_age_sq': np.log1p(video_data.get('age_days', 0)) ** 2,
+            'log_subs': np.log1p(subs),
+            'ctr_subs_interaction': ctr_pred * np.log1p(subs)
+        }
+        
+        for col in self.feature_lists.get('views', []):
+            if col.startswith('genre_'):
+                features[col] = 1.0 if col == f'genre_{genre}' else 0.0
+        
+        return [features[col] for col in self.feature_lists['views']]
+    
+    def _apply_guardrails(self, views: float, subs: int, genre: str) -> float:
+        """Cap views at the guardrail for the genre and subscriber bucket"""
+        if not self.guardrails:
+            return views
+        
+        log_subs = np.log1p(subs)
+        if log_subs < 6.9:
+            subs_bucket = 0
+        elif log_subs < 9.2:
+            subs_bucket = 1
+        elif log_subs < 11.5:
+            subs_bucket = 2
+        elif log_subs < 13.8:
+            subs_bucket = 3
+        else:
+            subs_bucket = 4
+        
+        guardrail_key = f"{genre}|{subs_bucket}"
+        if guardrail_key in self.guardrails:
+            max_views = self.guardrails[guardrail_key]
+            views = min(views, max_views)
+        return views
     
     def generate_recommended_tags(self, title: str, genre: str) -> List[str]:
         """Generate recommended tags based on title and genre"""
@@ -633,6 +851,109 @@ class YouTubePredictionSystem:
                           thumbnail_data: Optional[bytes] = None,
                           video_data: Optional[Dict] = None) -> Dict:
         """Main prediction with validation feedback"""
+        return self.predict_performance_batch(
+            [{'title': title, 'genre': genre, 'subscriber_count': subscriber_count,
+              'video_data': video_data, 'thumbnail_index': 0 if thumbnail_data else None}],
+            [thumbnail_data] if thumbnail_data else []
+        )[0]
+    
+    def predict_performance_batch(self, candidates: List[Dict],
+                                  thumbnails: Optional[List[bytes]] = None) -> List[Dict]:
+        """
+        Score many candidates with one predict call per model
+        Each candidate has title, genre, subscriber_count and optionally video_data and a
+        thumbnail_index into `thumbnails`; each thumbnail is analyzed once however many candidates use it
+        """
+        thumbnails = thumbnails or []
+        thumbnail_features = {}
+        for candidate in candidates:
+            index = candidate.get('thumbnail_index')
+            if index is not None and index not in thumbnail_features:
+                thumbnail_features[index] = self.analyze_thumbnail(thumbnails[index])
+        
+        prepared = [
+            self._prepare_candidate(candidate, thumbnail_features.get(candidate.get('thumbnail_index')))
+            for candidate in candidates
+        ]
+        videos = [p['video_data'] for p in prepared]
+        thumbs = [p['thumbnail_features'] for p in prepared]
+        # Candidates sharing a title, description or tags share its embedding
+        embedding_cache = {}
+        embeddings = [self.compute_text_embeddings(video_data, embedding_cache) for video_data in videos]
+        
+        # Sequential predictions, each model over the whole batch
+        ctr_preds = self.predict_ctr_batch(videos, thumbs, embeddings)
+        rqs_preds = self.predict_rqs_batch(videos, thumbs, embeddings)
+        views_preds = self.predict_views_batch(ctr_preds, rqs_preds, videos)
+        
+        return [
+            self._format_prediction(p, ctr_pred, rqs_pred, views_pred)
+            for p, ctr_pred, rqs_pred, views_pred in zip(prepared, ctr_preds, rqs_preds, views_preds)
+        ]
+    
+    def predict_variant_sweep(self, titles: List[str], genre: str, subscriber_count: int,
+                              thumbnails: Optional[List[bytes]] = None,
+                              video_data: Optional[Dict] = None) -> Dict:
+        """
+        Score every title x thumbnail combination of one video and rank them by performance score
+        Everything else in video_data is held fixed; each title is embedded and each thumbnail analyzed once
+        """
+        thumbnails = thumbnails or []
+        thumbnail_indexes = list(range(len(thumbnails))) or [None]
+        combinations = [(title_index, index) for title_index in range(len(titles)) for index in thumbnail_indexes]
+        candidates = [
+            {'title': titles[title_index], 'genre': genre, 'subscriber_count': subscriber_count,
+             'thumbnail_index': index, 'video_data': dict(video_data or {})}
+            for title_index, index in combinations
+        ]
+        predictions = self.predict_performance_batch(candidates, thumbnails)
+        
+        ranking = []
+        for (title_index, _), candidate, prediction in zip(combinations, candidates, predictions):
+            ranking.append({
+                'title_index': title_index,
+                'title': candidate['title'],
+                'thumbnail_index': candidate['thumbnail_index'],
+                'performance_score': prediction['performance_score'],
+                'predicted_views': prediction['predicted_views'],
+                'predicted_ctr': prediction['predicted_ctr'],
+                'predicted_ctr_percentage': prediction['predicted_ctr_percentage'],
+                'predicted_rqs': prediction['predicted_rqs']
+            })
+        ranking.sort(key=lambda row: row['performance_score'], reverse=True)
+        for rank, row in enumerate(ranking, 1):
+            row['rank'] = rank
+        
+        # Thumbnail analysis does not depend on the title: report it once per thumbnail
+        thumbnail_analysis = [
+            dict(prediction['thumbnail_analysis'], thumbnail_index=candidate['thumbnail_index'])
+            for (title_index, _), candidate, prediction in zip(combinations, candidates, predictions)
+            if title_index == 0 and candidate['thumbnail_index'] is not None
+        ]
+        
+        result = {
+            'titles': titles,
+            'thumbnail_count': len(thumbnails),
+            'combinations': len(ranking),
+            'best': ranking[0],
+            'ranking': ranking,
+            'thumbnail_analysis': thumbnail_analysis,
+            'model_version': '3.1'
+        }
+        if predictions[0].get('warnings'):
+            result['warnings'] = predictions[0]['warnings']
+        return result
+    
+    def analyze_thumbnail(self, thumbnail_data: bytes) -> Dict:
+        thumbnail_features = self.thumbnail_processor.extract_features(thumbnail_data)
+        print(f"Thumbnail analyzed: brightness={thumbnail_features['brightness']:.1f}, "
+              f"faces={thumbnail_features['face_area_percentage']:.1f}%")
+        return thumbnail_features
+    
+    def _prepare_candidate(self, candidate: Dict, thumbnail_features: Optional[Dict]) -> Dict:
+        """Validate the genre and complete video_data for one candidate"""
+        title = candidate['title']
+        genre = candidate['genre']
         
         # Genre validation with transparency
         valid_genres = ['gaming', 'education_science', 'challenge_stunts', 
@@ -644,33 +965,35 @@ class YouTubePredictionSystem:
             print(f"Warning: Invalid genre '{genre}' provided, using 'unknown'")
             genre = 'unknown'
         
-        # Process thumbnail
-        if thumbnail_data:
-            thumbnail_features = self.thumbnail_processor.extract_features(thumbnail_data)
-            print(f"Thumbnail analyzed: brightness={thumbnail_features['brightness']:.1f}, "
-                  f"faces={thumbnail_features['face_area_percentage']:.1f}%")
-        else:
-            thumbnail_features = self.thumbnail_processor._get_default_features()
-        
         # Prepare video data
+        video_data = candidate.get('video_data')
         if video_data is None:
             video_data = {}
         
         video_data.update({
             'title': title,
             'genre': genre,
-            'channel_subscriber_count': subscriber_count,
+            'channel_subscriber_count': candidate['subscriber_count'],
             'age_days': 0,
             'duration_seconds': video_data.get('duration_seconds', 300)
         })
         
-        # Sequential predictions
-        ctr_pred = self.predict_ctr(video_data, thumbnail_features)
-        rqs_pred = self.predict_rqs(video_data, thumbnail_features)
-        views_pred = self.predict_views(ctr_pred, rqs_pred, video_data)
+        return {
+            'video_data': video_data,
+            'subscriber_count': candidate['subscriber_count'],
+            'has_thumbnail': thumbnail_features is not None,
+            'thumbnail_features': thumbnail_features or self.thumbnail_processor._get_default_features(),
+            'warnings': warnings
+        }
+    
+    def _format_prediction(self, prepared: Dict, ctr_pred: float, rqs_pred: float, views_pred: int) -> Dict:
+        video_data = prepared['video_data']
+        thumbnail_features = prepared['thumbnail_features']
+        subscriber_count = prepared['subscriber_count']
+        confident = prepared['has_thumbnail'] and bool(self.tfidf)
         
-        # Debug logging for CTR investigation
-        print(f"Debug - CTR: {ctr_pred:.6f}, Duration: {video_data.get('duration_seconds', 'N/A')}s, Title: '{video_data.get('title', 'N/A')[:30]}...', Embeddings: {bool(self.tfidf)}")
+        # Debug logging for CTR investigation (one line per candidate, so not printed by default)
+        self.logger.debug(f"CTR: {ctr_pred:.6f}, Duration: {video_data.get('duration_seconds', 'N/A')}s, Title: '{video_data.get('title', 'N/A')[:30]}...', Embeddings: {bool(self.tfidf)}")
         
         # Calculate performance score
         ctr_percentage = ctr_pred * 100
@@ -692,23 +1015,116 @@ class YouTubePredictionSystem:
                 'color_variance': thumbnail_features.get('color_variance', 0),
                 'sharpness': thumbnail_features.get('sharpness', 0)
             },
-            'confidence_score': 0.85 if thumbnail_data and self.tfidf else 0.65,
+            'confidence_score': 0.85 if confident else 0.65,
             'confidence': {
-                'views': 'High' if thumbnail_data and self.tfidf else 'Medium',
-                'rqs': 'High' if thumbnail_data and self.tfidf else 'Medium', 
-                'ctr': 'High' if thumbnail_data and self.tfidf else 'Medium'
+                'views': 'High' if confident else 'Medium',
+                'rqs': 'High' if confident else 'Medium', 
+                'ctr': 'High' if confident else 'Medium'
             },
             'model_version': '3.1',
             'guardrails_applied': bool(self.guardrails),
             'embeddings_available': bool(self.tfidf)
         }
         
-        if warnings:
-            result['warnings'] = warnings
+        if prepared['warnings']:
+            result['warnings'] = prepared['warnings']
         
         return result
 
 
+# Largest number of candidates accepted by /api/predict/batch
+MAX_BATCH_SIZE = 100
+
+
+def parse_batch_candidates(candidates_json: str, n_thumbnails: int) -> List[Dict]:
+    """
+    Validate the JSON candidate list of a batch request
+    Each candidate needs title, genre and subscriber_count; thumbnail_index (optional) points into the uploaded files
+    """
+    try:
+        candidates = json.loads(candidates_json)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"candidates is not valid JSON: {e}")
+    
+    if not isinstance(candidates, list) or not candidates:
+        raise HTTPException(status_code=400, detail="candidates must be a non-empty JSON list")
+    if len(candidates) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} candidates per batch")
+    
+    for i, candidate in enumerate(candidates):
+        if not isinstance(candidate, dict):
+            raise HTTPException(status_code=400, detail=f"Candidate {i} must be a JSON object")
+        missing = [field for field in ('title', 'genre', 'subscriber_count') if field not in candidate]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Candidate {i} is missing {', '.join(missing)}")
+        problem = _candidate_problem(candidate, n_thumbnails)
+        if problem:
+            raise HTTPException(status_code=400, detail=f"Candidate {i}: {problem}")
+    return candidates
+
+
+def _is_int(value) -> bool:
+    # bool is an int subclass but true/false is never a count or an index
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _candidate_problem(candidate: Dict, n_thumbnails: int) -> Optional[str]:
+    """Why a batch candidate cannot be scored, or None when its fields have usable types and ranges"""
+    title = candidate['title']
+    if not isinstance(title, str) or not title.strip():
+        return "title must be a non-empty string"
+    if not isinstance(candidate['genre'], str):
+        return "genre must be a string"
+    subscriber_count = candidate['subscriber_count']
+    if not _is_int(subscriber_count) or subscriber_count <= 0:
+        return f"subscriber_count must be a positive integer, got {subscriber_count!r}"
+    
+    index = candidate.get('thumbnail_index')
+    if index is not None and (not _is_int(index) or not 0 <= index < n_thumbnails):
+        return f"thumbnail_index {index!r} does not match the {n_thumbnails} uploaded thumbnail(s)"
+    
+    for field in ('duration_seconds', 'like_count', 'comment_count'):
+        value = candidate.get(field)
+        if value is not None and (not _is_int(value) or value < 0):
+            return f"{field} must be a non-negative integer, got {value!r}"
+    description = candidate.get('description')
+    if description is not None and not isinstance(description, str):
+        return "description must be a string"
+    tags = candidate.get('tags')
+    if tags is not None and not isinstance(tags, str) and not (
+            isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+        return "tags must be a string or a list of strings"
+    has_captions = candidate.get('has_captions')
+    if has_captions is not None and not isinstance(has_captions, bool):
+        return "has_captions must be true or false"
+    return None
+
+
+# Largest title x thumbnail cross product accepted by /api/predict/sweep
+MAX_SWEEP_COMBINATIONS = 500
+
+
+def parse_sweep_titles(title: str, title_variants_json: Optional[str], n_thumbnails: int) -> List[str]:
+    """Base title followed by the distinct variants from a JSON list, checked against the combination limit"""
+    if not title.strip():
+        raise HTTPException(status_code=400, detail="title must not be blank")
+    variants = []
+    if title_variants_json:
+        try:
+            variants = json.loads(title_variants_json)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"title_variants is not valid JSON: {e}")
+        if not isinstance(variants, list) or not all(isinstance(v, str) for v in variants):
+            raise HTTPException(status_code=400, detail="title_variants must be a JSON list of strings")
+    
+    titles = list(dict.fromkeys([title] + [v for v in variants if v.strip()]))
+    combinations = len(titles) * max(n_thumbnails, 1)
+    if combinations > MAX_SWEEP_COMBINATIONS:
+        raise HTTPException(status_code=400, detail=f"{len(titles)} titles x {n_thumbnails} thumbnails is "
+                                                    f"{combinations} combinations; the limit is {MAX_SWEEP_COMBINATIONS}")
+    return titles
+
+
 # Global predictor instance (will be initialized on startup)
 predictor = None
 
@@ -799,6 +1215,112 @@ async def predict_video_performance(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/predict/batch")
+async def predict_batch(
+    candidates: str = Form(...),
+    thumbnails: Optional[List[UploadFile]] = File(None)
+):
+    """Score many title/thumbnail candidates in one request (one predict call per model)"""
+    
+    try:
+        if predictor is None:
+            raise HTTPException(status_code=503, detail="Prediction system not initialized")
+        
+        thumbnail_data = [await thumbnail.read() for thumbnail in thumbnails or []]
+        candidates = parse_batch_candidates(candidates, len(thumbnail_data))
+        
+        batch = []
+        for candidate in candidates:
+            title, genre = candidate['title'], candidate['genre']
+            duration_seconds = candidate.get('duration_seconds') or 480  # 8 minutes - more typical for YouTube
+            tags = candidate.get('tags')
+            if isinstance(tags, str):
+                tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+            batch.append({
+                'title': title,
+                'genre': genre,
+                'subscriber_count': candidate['subscriber_count'],
+                'thumbnail_index': candidate.get('thumbnail_index'),
+                'video_data': {
+                    'title': title,
+                    'genre': genre,
+                    'subscriber_count': candidate['subscriber_count'],
+                    'duration_seconds': duration_seconds,
+                    'description': candidate.get('description') or (f"Learn about {title.lower()}" if title else ""),
+                    'tags': tags or predictor.generate_recommended_tags(title, genre),
+                    'age_days': 0,
+                }
+            })
+        
+        predictions = predictor.predict_performance_batch(batch, thumbnail_data)
+        
+        for candidate, prediction in zip(batch, predictions):
+            prediction['input_data'] = {
+                'title': candidate['title'],
+                'genre': candidate['genre'],
+                'subscriber_count': candidate['subscriber_count'],
+                'duration_minutes': candidate['video_data']['duration_seconds'] / 60,
+                'recommended_tags': candidate['video_data']['tags'],
+                'thumbnail_index': candidate['thumbnail_index'],
+                'prediction_date': datetime.now().isoformat()
+            }
+        
+        return JSONResponse(content={'count': len(predictions), 'predictions': predictions})
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"API error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/sweep")
+async def predict_sweep(
+    title: str = Form(...),
+    genre: str = Form(...),
+    subscriber_count: int = Form(...),
+    title_variants: Optional[str] = Form(None),
+    thumbnails: Optional[List[UploadFile]] = File(None),
+    duration_seconds: Optional[int] = Form(None)
+):
+    """Rank every title x thumbnail combination of one video (title_variants is a JSON list of strings)"""
+    
+    try:
+        if predictor is None:
+            raise HTTPException(status_code=503, detail="Prediction system not initialized")
+        
+        thumbnail_data = [await thumbnail.read() for thumbnail in thumbnails or []]
+        titles = parse_sweep_titles(title, title_variants, len(thumbnail_data))
+        
+        # Description and tags come from the base title and stay fixed across variants
+        video_data = {
+            'subscriber_count': subscriber_count,
+            'duration_seconds': duration_seconds or 480,  # 8 minutes - more typical for YouTube
+            'description': f"Learn about {title.lower()}" if title else "",
+            'tags': predictor.generate_recommended_tags(title, genre),
+            'age_days': 0,
+        }
+        
+        sweep = predictor.predict_variant_sweep(titles, genre, subscriber_count, thumbnail_data, video_data)
+        sweep['input_data'] = {
+            'genre': genre,
+            'subscriber_count': subscriber_count,
+            'duration_minutes': video_data['duration_seconds'] / 60,
+            'recommended_tags': video_data['tags'],
+            'prediction_date': datetime.now().isoformat()
+        }
+        
+        return JSONResponse(content=sweep)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"API error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/")
 async def root():
     return {
@@ -830,6 +1352,7 @@ async def health_check():
         "models_loaded": len(predictor.models),
         "embeddings_available": predictor.tfidf is not None,
         "guardrails_loaded": bool(predictor.guardrails),
+        "thumbnail_cache": predictor.thumbnail_processor.feature_cache.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
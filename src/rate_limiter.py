@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Rate limiting helpers for the YouTube extractor
+Shared between worker threads so concurrent stages respect one request rate
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+    Refills at `rate` tokens per second up to `capacity`; callers block until a token is free
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add the tokens earned since the last refill (caller holds the lock)"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now, without blocking"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` tokens are available, then take them"""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+# YouTube Data API v3 unit costs per endpoint
+ENDPOINT_COSTS = {
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'videos.list': 1,
+    'commentThreads.list': 1,
+    'comments.list': 1,
+    'captions.list': 50,
+    'search.list': 100,
+}
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when the daily quota budget cannot cover another call"""
+
+    def __init__(self, endpoint: str, cost: int, remaining: int):
+        self.endpoint = endpoint
+        self.cost = cost
+        self.remaining = remaining
+        super().__init__(f"Quota budget exhausted: {endpoint} costs {cost} units, {remaining} remaining")
+
+
+class QuotaDeferredError(QuotaExhaustedError):
+    """Raised when an expensive call is refused to keep the reserve for cheap calls"""
+
+
+class QuotaScheduler:
+    """
+    Central admission control for YouTube API calls
+    Paces calls through a token bucket and spends the daily unit budget cheapest-first:
+    once the remaining budget falls to `reserve_units`, calls costing more than one unit
+    (captions, search) are deferred so the rest goes to 1-unit list calls
+    """
+
+    def __init__(self, daily_budget: int = 10000, rate: float = 10.0,
+                 reserve_units: int = 500, costs: Optional[Dict[str, int]] = None):
+        self.daily_budget = daily_budget
+        self.reserve_units = min(reserve_units, daily_budget)
+        self.costs = {**ENDPOINT_COSTS, **(costs or {})}
+        self.bucket = TokenBucket(rate=rate)
+
+        self.used = 0
+        self.exhausted = False
+        self.units_by_endpoint = Counter()
+        self.calls_by_endpoint = Counter()
+        self.deferred_by_endpoint = Counter()
+        self._lock = threading.Lock()
+
+    def cost(self, endpoint: str) -> int:
+        """Unit cost of one call to `endpoint`"""
+        return self.costs.get(endpoint, 1)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.daily_budget - self.used)
+
+    def admit(self, endpoint: str) -> int:
+        """
+        Block until a call to `endpoint` may be sent and charge its cost
+        Raises QuotaDeferredError / QuotaExhaustedError instead of overspending
+        """
+        cost = self.cost(endpoint)
+
+        # Units are reserved before waiting on the bucket so concurrent workers cannot overspend
+        with self._lock:
+            remaining = self.daily_budget - self.used
+            if cost > 1 and remaining - cost < self.reserve_units:
+                self.deferred_by_endpoint[endpoint] += 1
+                raise QuotaDeferredError(endpoint, cost, remaining)
+            if cost > remaining:
+                self.exhausted = True
+                raise QuotaExhaustedError(endpoint, cost, remaining)
+            self.used += cost
+            self.units_by_endpoint[endpoint] += cost
+            self.calls_by_endpoint[endpoint] += 1
+
+        self.bucket.acquire()
+        return cost
+
+    def summary(self) -> Dict:
+        """Quota usage breakdown for logs and reports"""
+        with self._lock:
+            return {
+                'daily_budget': self.daily_budget,
+                'used': self.used,
+                'remaining': self.remaining,
+                'exhausted': self.exhausted,
+                'units_by_endpoint': dict(self.units_by_endpoint),
+                'calls_by_endpoint': dict(self.calls_by_endpoint),
+                'deferred_by_endpoint': dict(self.deferred_by_endpoint)
+            }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Queue of work units whose API calls failed after every retry
+Whole channels are retried by reprocessing them; single video steps (comments, caption check)
+are replayed on the next run and patched into the stored channel record
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+RETRY_QUEUE_FILENAME = "retry_queue.json"
+
+# Unit names: a whole channel, or the video record field a step fills in
+CHANNEL_UNIT = 'channel'
+VIDEO_UNITS = ('comments', 'caption_info')
+
+
+def _unit_key(channel_name: str, unit: str, video_id: Optional[str]) -> str:
+    return f"{channel_name}|{unit}|{video_id or ''}"
+
+
+class RetryQueue:
+    """Thread-safe {unit key: entry} map persisted as JSON; re-adding a unit bumps its failure count"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = {_unit_key(e['channel'], e['unit'], e.get('video_id')): e
+                                    for e in json.load(f)}
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"Could not read retry queue {path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    def add(self, channel_name: str, unit: str, error_class: str, error: str,
+            video_id: Optional[str] = None, endpoint: Optional[str] = None):
+        now = datetime.now().isoformat()
+        key = _unit_key(channel_name, unit, video_id)
+        with self._lock:
+            entry = self.entries.get(key) or {
+                'channel': channel_name, 'unit': unit, 'video_id': video_id,
+                'failures': 0, 'first_failed': now
+            }
+            entry.update({'endpoint': endpoint, 'error_class': error_class, 'error': error,
+                          'failures': entry['failures'] + 1, 'last_failed': now})
+            self.entries[key] = entry
+            self._dirty = True
+
+    def remove(self, channel_name: str, unit: str, video_id: Optional[str] = None):
+        with self._lock:
+            if self.entries.pop(_unit_key(channel_name, unit, video_id), None) is not None:
+                self._dirty = True
+
+    def discard_channel(self, channel_name: str):
+        """Drop every unit of a channel (it was just extracted again from scratch)"""
+        with self._lock:
+            keys = [key for key, entry in self.entries.items() if entry['channel'] == channel_name]
+            for key in keys:
+                del self.entries[key]
+            self._dirty = self._dirty or bool(keys)
+
+    def has_channel(self, channel_name: str) -> bool:
+        with self._lock:
+            return any(entry['channel'] == channel_name for entry in self.entries.values())
+
+    def video_units(self) -> Dict[str, List[Dict]]:
+        """Queued video steps grouped by channel"""
+        grouped = {}
+        with self._lock:
+            for entry in self.entries.values():
+                if entry['unit'] in VIDEO_UNITS:
+                    grouped.setdefault(entry['channel'], []).append(dict(entry))
+        return grouped
+
+    def stats(self) -> Dict[str, int]:
+        counts = {}
+        with self._lock:
+            for entry in self.entries.values():
+                counts[entry['unit']] = counts.get(entry['unit'], 0) + 1
+        return counts
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entries.values()), f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Thumbnail downloads for the YouTube extractor
+One pooled HTTP session (keep-alive, timeouts, retry/backoff) shared by every worker,
+plus a per-folder manifest (size, sha256, ETag/Last-Modified) so re-runs skip existing files
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class ThumbnailManifest:
+    """
+    Manifest for one thumbnail folder: {video_id: {url, size, sha256, etag, last_modified, fetched_at}}
+    Lets re-runs trust a file on disk after a stat() instead of downloading it again
+    """
+
+    def __init__(self, folder: str):
+        self.path = os.path.join(folder, MANIFEST_FILENAME)
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.getLogger(__name__).warning(f"Could not read thumbnail manifest {self.path}: {e}")
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self.entries.get(video_id)
+
+    def record(self, video_id: str, entry: Dict):
+        with self._lock:
+            self.entries[video_id] = entry
+            self.dirty = True
+
+    def save(self):
+        """Write the manifest atomically if anything changed"""
+        with self._lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+class ThumbnailDownloader:
+    """Download thumbnails over a shared, connection-pooled session, skipping files already on disk"""
+
+    def __init__(self, pool_size: int = 16, timeout: Tuple[float, float] = (5.0, 15.0),
+                 max_retries: int = 3, backoff_factor: float = 0.5, revalidate: bool = False):
+        self.timeout = timeout
+        # When True, existing files are re-checked with If-None-Match / If-Modified-Since
+        self.revalidate = revalidate
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'downloaded': 0, 'skipped': 0, 'not_modified': 0, 'adopted': 0}
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+        # Retry connection errors and throttling/5xx responses with exponential backoff
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _manifest(self, output_dir: str) -> ThumbnailManifest:
+        """Manifest for a thumbnail folder (loaded once per run)"""
+        with self._lock:
+            manifest = self._manifests.get(output_dir)
+            if manifest is None:
+                manifest = ThumbnailManifest(output_dir)
+                self._manifests[output_dir] = manifest
+            return manifest
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def download(self, video_id: str, thumbnail_url: str, output_dir: str) -> Optional[str]:
+        """
+        Ensure <output_dir>/<video_id>.jpg exists; returns the path or None
+        Files recorded in the manifest with a matching size are trusted without any network I/O
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        filepath = os.path.join(output_dir, f"{video_id}.jpg")
+        manifest = self._manifest(output_dir)
+        entry = manifest.get(video_id)
+
+        headers = {}
+        if os.path.exists(filepath):
+            size = os.path.getsize(filepath)
+            if entry and entry.get('size') == size:
+                if not self.revalidate:
+                    self._count('skipped')
+                    return filepath
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+            elif entry is None and not self.revalidate:
+                # File from an earlier run without a manifest entry: hash it once and keep it
+                with open(filepath, 'rb') as f:
+                    content = f.read()
+                manifest.record(video_id, self._manifest_entry(thumbnail_url, content, {}))
+                self._count('adopted')
+                return filepath
+
+        response = self.session.get(thumbnail_url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and entry:
+            manifest.record(video_id, {**entry, 'checked_at': datetime.now().isoformat()})
+            self._count('not_modified')
+            return filepath
+        if response.status_code != 200:
+            self.logger.warning(f"Thumbnail for {video_id} returned HTTP {response.status_code}")
+            return None
+
+        new_entry = self._manifest_entry(thumbnail_url, response.content, response.headers)
+        if not (entry and entry.get('sha256') == new_entry['sha256'] and os.path.exists(filepath)):
+            # Write to a temp file first so an interrupted run never leaves a truncated image
+            tmp_path = f"{filepath}.part"
+            with open(tmp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_path, filepath)
+        manifest.record(video_id, new_entry)
+        self._count('downloaded')
+
+        return filepath
+
+    def _manifest_entry(self, thumbnail_url: str, content: bytes, headers) -> Dict:
+        """Manifest record for downloaded bytes; validators come from response headers when present"""
+        return {
+            'url': thumbnail_url,
+            'size': len(content),
+            'sha256': hashlib.sha256(content).hexdigest(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': datetime.now().isoformat()
+        }
+
+    def flush(self):
+        """Persist every manifest touched during this run"""
+        with self._lock:
+            manifests = list(self._manifests.values())
+        for manifest in manifests:
+            manifest.save()
+
+    def download_many(self, items: Iterable[Tuple[str, str]], output_dir: str,
+                      max_workers: int = 8) -> Dict[str, Optional[str]]:
+        """Download (video_id, url) pairs in parallel; returns {video_id: path or None}"""
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='thumbnail') as executor:
+            futures = {
+                executor.submit(self.download, video_id, url, output_dir): video_id
+                for video_id, url in items
+            }
+            for future in as_completed(futures):
+                video_id = futures[future]
+                try:
+                    results[video_id] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error downloading thumbnail for {video_id}: {e}")
+                    results[video_id] = None
+        self._manifest(output_dir).save()
+        return results
+
+    def close(self):
+        """Persist manifests and close pooled connections"""
+        self.flush()
+        self.session.close()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Streaming video selection for the YouTube extractor
+One pass over a channel's videos with bounded memory: heaps keep the top and bottom K
+by a score, and reservoir sampling (Algorithm R) keeps a uniform sample of everything in between
+"""
+
+import heapq
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def split_target(target_count: int, top_fraction: float = 0.25,
+                 bottom_fraction: float = 0.25) -> Tuple[int, int, int]:
+    """Split a per-channel target into (top, bottom, random) strata; 40 -> 10 / 10 / 20"""
+    top_k = int(target_count * top_fraction)
+    bottom_k = int(target_count * bottom_fraction)
+    return top_k, bottom_k, max(0, target_count - top_k - bottom_k)
+
+
+class StreamingSelector:
+    """
+    Top-K + bottom-K + uniform middle sample over a stream of items
+    Ranks match a stable sort by score, descending: on ties the earlier item ranks higher.
+    Memory is O(top_k + bottom_k + sample_k) regardless of how many items are added
+    """
+
+    def __init__(self, top_k: int, bottom_k: int, sample_k: int,
+                 key: Callable[[Dict], float] = lambda item: item.get('view_count', 0),
+                 rng: Optional[random.Random] = None):
+        self.top_k = top_k
+        self.bottom_k = bottom_k
+        self.sample_k = sample_k
+        self.key = key
+        self.rng = rng or random
+        self.seen = 0
+
+        # Heaps hold small (score, seq) tuples; items live in a dict keyed by seq
+        self._items = {}
+        self._top = []       # min-heap of (score, -seq): root is the weakest top item
+        self._bottom = []    # min-heap of (-score, seq): root is the strongest bottom item
+        self._reservoir = []
+        self._middle_seen = 0
+
+    def add(self, item: Dict):
+        seq = self.seen
+        self.seen += 1
+        self._items[seq] = item
+        self._offer_top(self.key(item), seq)
+
+    def extend(self, items: Iterable[Dict]):
+        for item in items:
+            self.add(item)
+
+    def _offer_top(self, score, seq: int):
+        entry = (score, -seq)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+            return
+        if self._top and entry > self._top[0]:
+            entry = heapq.heapreplace(self._top, entry)
+        # Rejected or evicted from the top can never re-enter it
+        self._offer_bottom(entry[0], -entry[1])
+
+    def _offer_bottom(self, score, seq: int):
+        entry = (-score, seq)
+        if len(self._bottom) < self.bottom_k:
+            heapq.heappush(self._bottom, entry)
+            return
+        if self._bottom and entry > self._bottom[0]:
+            entry = heapq.heapreplace(self._bottom, entry)
+        # Neither top nor bottom: the item belongs to the middle stratum
+        self._offer_middle(entry[1])
+
+    def _offer_middle(self, seq: int):
+        self._middle_seen += 1
+        if len(self._reservoir) < self.sample_k:
+            self._reservoir.append(seq)
+        else:
+            slot = self.rng.randrange(self._middle_seen)
+            if slot < self.sample_k:
+                del self._items[self._reservoir[slot]]
+                self._reservoir[slot] = seq
+            else:
+                del self._items[seq]
+
+    def result(self) -> Dict[str, List[Dict]]:
+        """Selected items per stratum; top and bottom in descending score order"""
+        top = [self._items[-neg_seq] for _, neg_seq in sorted(self._top, reverse=True)]
+        bottom = [self._items[seq] for _, seq in sorted(self._bottom)]
+        sample = [self._items[seq] for seq in self._reservoir]
+        return {'top': top, 'bottom': bottom, 'sample': sample}
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+API key pool and retry policy for the YouTube extractor
+Tracks quota per key (persisted per Pacific-time quota day, so restarts keep counting),
+routes each call to the key with the most budget left and fails over when YouTube
+reports a key's daily quota as exceeded. Failed calls are
+classified so only rate limiting and transient server/network errors are retried.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import httplib2
+
+from rate_limiter import QuotaExhaustedError
+
+
+# HttpError reasons meaning "this key is out of quota for today"
+QUOTA_REASONS = frozenset(['quotaExceeded', 'dailyLimitExceeded'])
+RATE_LIMIT_REASONS = frozenset(['rateLimitExceeded', 'userRateLimitExceeded'])
+TRANSIENT_REASONS = frozenset(['backendError', 'internalError'])
+TRANSIENT_STATUSES = frozenset([500, 502, 503, 504])
+
+# Error classes from classify_error(); only these are worth another attempt
+QUOTA, RATE_LIMIT, NOT_FOUND, TRANSIENT, PERMANENT = 'quota', 'rate_limit', 'not_found', 'transient', 'permanent'
+RETRYABLE = frozenset([RATE_LIMIT, TRANSIENT])
+
+
+def http_error_reason(error) -> Optional[str]:
+    """First `reason` from a googleapiclient HttpError body, if any"""
+    details = getattr(error, 'error_details', None)
+    if isinstance(details, list):
+        for detail in details:
+            if isinstance(detail, dict) and detail.get('reason'):
+                return detail['reason']
+    try:
+        content = error.content
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', 'replace')
+        errors = json.loads(content).get('error', {}).get('errors', [])
+        if errors:
+            return errors[0].get('reason')
+    except (AttributeError, ValueError, TypeError):
+        pass
+    return None
+
+
+def is_quota_exceeded(error) -> bool:
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    return status == 403 and http_error_reason(error) in QUOTA_REASONS
+
+
+def classify_error(error) -> str:
+    """
+    quota / rate_limit / not_found / transient / permanent for an exception raised by a request
+    Network failures (timeouts, resets, DNS) count as transient; other non-HTTP errors are permanent
+    """
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status is None:
+        if isinstance(error, (OSError, httplib2.HttpLib2Error)):
+            return TRANSIENT
+        return PERMANENT
+
+    status = int(status)
+    reason = http_error_reason(error)
+    if reason in QUOTA_REASONS:
+        return QUOTA
+    if status == 429 or reason in RATE_LIMIT_REASONS:
+        return RATE_LIMIT
+    if status == 404:
+        return NOT_FOUND
+    if status in TRANSIENT_STATUSES or reason in TRANSIENT_REASONS:
+        return TRANSIENT
+    return PERMANENT
+
+
+class ApiCallFailed(Exception):
+    """A retryable API error that outlasted every attempt; the work unit belongs in the retry queue"""
+
+    def __init__(self, endpoint: str, error_class: str, attempts: int, message: str):
+        self.endpoint = endpoint
+        self.error_class = error_class
+        self.attempts = attempts
+        self.message = message
+        super().__init__(f"{endpoint} failed after {attempts} attempt(s) ({error_class}): {message}")
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits uniform(0, min(max_delay, base_delay * 2**(n-1)))"""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def should_retry(self, error_class: str, attempt: int) -> bool:
+        return error_class in RETRYABLE and attempt < self.max_attempts
+
+    def delay(self, attempt: int) -> float:
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def mask_key(api_key: str) -> str:
+    """Loggable form of an API key"""
+    return f"…{api_key[-4:]}" if len(api_key) > 4 else "…"
+
+
+def key_id(api_key: str) -> str:
+    """Stable identifier for an API key that is safe to write to disk"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+try:
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except ZoneInfoNotFoundError:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))  # No tz database: Pacific standard time
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """The quota day a moment falls in; YouTube resets daily quotas at midnight Pacific time"""
+    return (now or datetime.now(timezone.utc)).astimezone(QUOTA_TIMEZONE).date().isoformat()
+
+
+class KeyPool:
+    """
+    Thread-safe pool of API keys, each with its own daily unit budget
+    Clients are built lazily per thread and per key (googleapiclient clients are not thread-safe)
+    With a usage_file, units used and keys YouTube refused are kept per quota day (keys stored hashed)
+    """
+
+    def __init__(self, api_keys: List[str], client_factory: Callable[[str], Any],
+                 quota_per_key: int = 10000, usage_file: Optional[str] = None):
+        keys = list(dict.fromkeys(key for key in api_keys if key))
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.keys = keys
+        self.client_factory = client_factory
+        self.quota_per_key = quota_per_key
+        self.usage_file = usage_file
+        self.logger = logging.getLogger(__name__)
+        self.day = quota_day()
+        self.used = {key: 0 for key in keys}
+        self.spent = set()
+        self._dirty = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._load_usage()
+
+    def _load_usage(self):
+        if not self.usage_file or not os.path.exists(self.usage_file):
+            return
+        try:
+            with open(self.usage_file, 'r', encoding='utf-8') as f:
+                usage = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read key usage {self.usage_file}: {e}")
+            return
+        if usage.get('day') != self.day:
+            return  # Recorded on an earlier quota day: every key starts afresh
+        for key in self.keys:
+            entry = usage.get('keys', {}).get(key_id(key), {})
+            self.used[key] = entry.get('used', 0)
+            if entry.get('quota_exceeded'):
+                self.spent.add(key)
+
+    def _roll_day(self):
+        """Reset every key's budget once the quota day changes (caller holds the lock)"""
+        today = quota_day()
+        if today != self.day:
+            self.day = today
+            self.used = {key: 0 for key in self.keys}
+            self.spent = set()
+            self._dirty = True
+
+    def remaining(self, api_key: str) -> int:
+        return 0 if api_key in self.spent else max(0, self.quota_per_key - self.used[api_key])
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return all(self.remaining(key) == 0 for key in self.keys)
+
+    def acquire(self, cost: int) -> str:
+        """Charge `cost` units to the key with the most budget left and return it"""
+        with self._lock:
+            self._roll_day()
+            key = max(self.keys, key=self.remaining)
+            remaining = self.remaining(key)
+            if remaining < cost:
+                raise QuotaExhaustedError('key pool', cost, remaining)
+            self.used[key] += cost
+            self._dirty = True
+            return key
+
+    def mark_exhausted(self, api_key: str):
+        """YouTube rejected the key for quota: stop routing to it for the rest of the run"""
+        with self._lock:
+            self.spent.add(api_key)
+            self._dirty = True
+
+    def client(self, api_key: str):
+        """Client for `api_key` bound to the current thread"""
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(api_key)
+        if client is None:
+            client = clients[api_key] = self.client_factory(api_key)
+        return client
+
+    def save(self):
+        """Persist today's per-key usage (no-op without a usage_file or when nothing changed)"""
+        with self._lock:
+            if not self.usage_file or not self._dirty:
+                return
+            usage = {
+                'day': self.day,
+                'quota_per_key': self.quota_per_key,
+                'keys': {key_id(key): {'used': self.used[key], 'quota_exceeded': key in self.spent}
+                         for key in self.keys}
+            }
+            if os.path.dirname(self.usage_file):
+                os.makedirs(os.path.dirname(self.usage_file), exist_ok=True)
+            tmp_path = f"{self.usage_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(usage, f, indent=2)
+            os.replace(tmp_path, self.usage_file)
+            self._dirty = False
+
+    def summary(self) -> Dict:
+        """Per-key usage with keys masked"""
+        with self._lock:
+            return {
+                mask_key(key): {'used': self.used[key], 'remaining': self.remaining(key),
+                                'quota_exceeded': key in self.spent}
+                for key in self.keys
+            }
@@ -0,0 +1,53 @@
+"""
+Shared fixtures: modules under src/ are imported flat, the way the scripts there import each other,
+extractor tests run against the in-process mock YouTube API and prediction tests share one loaded model set
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+@pytest.fixture(scope='session')
+def predictor():
+    """YouTubePredictionSystem over the trained models in models/, loaded once per session"""
+    if not os.path.exists(os.path.join(ROOT_DIR, 'models', 'ctr_model.joblib')):
+        pytest.skip("trained models are not available")
+    from prediction_api import YouTubePredictionSystem
+    return YouTubePredictionSystem()
+
+
+@pytest.fixture
+def make_extractor(tmp_path, monkeypatch):
+    """
+    Factory for a CorrectedDataExtractor wired to a MockYouTubeBackend
+    Runs inside tmp_path so progress, cache and output files never touch the real extracted_data/
+    """
+    from corrected_data_extractor import CorrectedDataExtractor
+    from mock_youtube_api import install_thumbnail_cdn, mock_client_factory
+
+    monkeypatch.chdir(tmp_path)
+    extractors = []
+
+    def make(backend, **options):
+        options = {
+            'test_mode': True, 'max_channels': 1, 'api_rate_limit': 10000.0,
+            'daily_quota': 10 ** 9, 'quota_per_key': 10 ** 9, 'retry_base_delay': 0.01,
+            'videos_per_channel': 8, 'max_uploads_scanned': 100,
+            'client_factory': mock_client_factory(backend),
+            **options
+        }
+        extractor = CorrectedDataExtractor(options.pop('api_key', 'MOCK-KEY-0000'), **options)
+        install_thumbnail_cdn(extractor.thumbnail_downloader.session, backend)
+        extractors.append(extractor)
+        return extractor
+
+    yield make
+    for extractor in extractors:
+        extractor.close()
@@ -0,0 +1,101 @@
+import time
+
+from api_cache import ApiResponseCache, CaptionInfoCache
+from mock_youtube_api import MockYouTubeBackend
+
+PARAMS = {'part': 'statistics', 'id': 'vid00000001'}
+RESPONSE = {'items': [{'id': 'vid00000001', 'statistics': {'viewCount': '42'}}]}
+
+
+def test_responses_survive_a_reopen(tmp_path):
+    path = str(tmp_path / 'api_cache.sqlite')
+    cache = ApiResponseCache(path)
+    assert cache.get('videos.list', PARAMS) is None
+    cache.set('videos.list', PARAMS, RESPONSE)
+    cache.close()
+
+    cache = ApiResponseCache(path)
+    assert cache.get('videos.list', dict(reversed(list(PARAMS.items())))) == RESPONSE
+    assert cache.get('videos.list', {**PARAMS, 'id': 'vid00000002'}) is None
+    assert cache.stats()['hits'] == 1
+    cache.close()
+
+
+def test_endpoints_without_ttl_are_not_cached(tmp_path):
+    cache = ApiResponseCache(str(tmp_path / 'api_cache.sqlite'), ttls={'videos.list': 0})
+    cache.set('videos.list', PARAMS, RESPONSE)
+    cache.set('captions.list', PARAMS, RESPONSE)
+    assert cache.get('videos.list', PARAMS) is None
+    assert cache.stats()['entries'] == 0
+    cache.close()
+
+
+def test_expired_responses_are_misses(tmp_path, monkeypatch):
+    cache = ApiResponseCache(str(tmp_path / 'api_cache.sqlite'), ttls={'videos.list': 60})
+    cache.set('videos.list', PARAMS, RESPONSE)
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('videos.list', PARAMS) is None
+    cache.close()
+
+
+def test_close_evicts_least_recently_used_beyond_the_limit(tmp_path, monkeypatch):
+    path = str(tmp_path / 'api_cache.sqlite')
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    cache = ApiResponseCache(path, max_entries=3)
+    for i in range(5):
+        clock[0] += 1
+        cache.set('videos.list', {'id': i}, {'items': [i]})
+    clock[0] += 1
+    cache.get('videos.list', {'id': 0})
+    # Fewer than 100 writes: nothing is evicted until the cache is closed
+    assert cache.stats()['entries'] == 5
+    cache.close()
+
+    cache = ApiResponseCache(path, max_entries=3)
+    assert [i for i in range(5) if cache.get('videos.list', {'id': i})] == [0, 3, 4]
+    cache.close()
+
+
+def test_rerun_is_served_from_the_cache(make_extractor):
+    backend = MockYouTubeBackend()
+    results = make_extractor(backend).execute_api_only_extraction('first')
+    first = backend.stats()['requests_by_endpoint']
+    make_extractor(backend).execute_api_only_extraction('second')
+    second = backend.stats()['requests_by_endpoint']
+
+    # Uploads pages and their statistics come from the cache; only the snippet lookup
+    # for a differently sampled selection can still miss, once per channel
+    assert second['channels.list'] == first['channels.list']
+    assert second['playlistItems.list'] == first['playlistItems.list']
+    assert second['videos.list'] - first['videos.list'] <= results['channels_processed']
+
+
+def test_caption_info_is_cached_per_video(tmp_path, monkeypatch):
+    path = str(tmp_path / 'caption_cache.sqlite')
+    cache = CaptionInfoCache(path, ttl=3600)
+    assert cache.is_empty()
+    assert cache.set_many([('v1', {'has_captions': True}), ('v2', {'has_captions': False})]) == 2
+    cache.close()
+
+    cache = CaptionInfoCache(path, ttl=3600)
+    assert cache.get('v1') == {'has_captions': True}
+    assert cache.get('v3') is None
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 3601)
+    assert cache.get('v2') is None
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 2}
+    cache.close()
+
+
+def test_caption_checks_are_paid_once(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend)
+
+    first = extractor.check_caption_availability('vid00000001')
+    assert extractor.check_caption_availability('vid00000001') == first
+    assert backend.stats()['requests_by_endpoint']['captions.list'] == 1
+
+    extractor.check_caption_availability('vid00000001', refresh=True)
+    assert backend.stats()['requests_by_endpoint']['captions.list'] == 2
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from channel_resolver import ChannelResolver, load_channel_list
+from youtube_client import TRANSIENT, ApiCallFailed
+
+
+class FakeExecute:
+    """Records calls; channels.list knows handles starting with "known", search finds the rest"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, endpoint, **params):
+        self.calls.append((endpoint, params))
+        if endpoint == 'search.list':
+            return {'items': [{'snippet': {'channelId': f"UC-search-{params['q']}"}}]}
+        if 'forHandle' in params:
+            handle = params['forHandle'].lstrip('@')
+            return {'items': [{'id': f"UC-{handle}"}] if handle.startswith('known') else []}
+        return {'items': [{'id': channel_id} for channel_id in params['id'].split(',')]}
+
+
+def test_prefetch_batches_fifty_ids_per_call():
+    execute = FakeExecute()
+    resolver = ChannelResolver(execute)
+    channel_ids = [f"UC{i:03d}" for i in range(120)]
+
+    assert resolver.prefetch(channel_ids + channel_ids[:10]) == 3
+    assert resolver.prefetch(channel_ids) == 0
+    assert [len(params['id'].split(',')) for _, params in execute.calls] == [50, 50, 20]
+    assert 'statistics' in execute.calls[0][1]['part']
+    assert resolver.get('UC119') == {'id': 'UC119'}
+
+
+def test_handles_resolve_once_and_persist(tmp_path):
+    cache_file = str(tmp_path / 'channel_ids.json')
+    execute = FakeExecute()
+    resolver = ChannelResolver(execute, cache_file=cache_file)
+
+    assert resolver.resolve_handle('@KnownOne') == 'UC-knownone'
+    assert resolver.resolve_handle('knownone') == 'UC-knownone'
+    # Custom names that are not handles fall back to search.list
+    assert resolver.resolve_handle('@legacy') == 'UC-search-legacy'
+    assert [endpoint for endpoint, _ in execute.calls] == ['channels.list', 'channels.list', 'search.list']
+    # The forHandle response already carried the channel's metadata
+    assert resolver.get('UC-knownone') == {'id': 'UC-knownone'}
+    resolver.save()
+
+    execute = FakeExecute()
+    reloaded = ChannelResolver(execute, cache_file=cache_file)
+    assert reloaded.resolve_handle('@legacy') == 'UC-search-legacy'
+    assert execute.calls == []
+
+
+def test_failed_lookups_are_raised_not_marked_unresolved():
+    execute = FakeExecute()
+    resolver = ChannelResolver(execute)
+
+    def failing(endpoint, **params):
+        raise ApiCallFailed(endpoint, TRANSIENT, 5, 'backendError')
+
+    resolver.execute = failing
+    with pytest.raises(ApiCallFailed):
+        resolver.resolve_handle('@knownone')
+
+    resolver.execute = execute
+    assert resolver.resolve_handle('@knownone') == 'UC-knownone'
+
+
+def test_channel_lists_get_tiers_and_placeholder_ids_cleared(tmp_path):
+    path = tmp_path / 'channels.json'
+    path.write_text(json.dumps({'gaming': [{'name': 'A', 'handle': '@a', 'tier': 'Mid', 'channel_id': 'TBD'}]}),
+                    encoding='utf-8')
+
+    channel = load_channel_list(str(path))['gaming'][0]
+    assert channel['global_tier'] == 'Mid'
+    assert channel['channel_id'] is None
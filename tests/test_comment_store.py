@@ -0,0 +1,68 @@
+import json
+
+from comment_store import CommentStore
+
+
+def _channel_record(*videos):
+    return {
+        'genre': 'gaming',
+        'channel_info': {'global_tier': 'Mid', 'genre_tier': 'Small'},
+        'videos': [
+            {'video_id': video_id, 'performance_category': 'top_performer',
+             'comments': [{'comment_id': comment_id, 'text': f"text {comment_id}"} for comment_id in comment_ids]}
+            for video_id, comment_ids in videos
+        ]
+    }
+
+
+def test_comments_are_stored_once(tmp_path):
+    store = CommentStore(str(tmp_path / 'comments.sqlite'))
+    assert store.is_empty()
+    assert store.add_channel('Alpha', _channel_record(('v1', ['c1', 'c2']), ('v2', []))) == 2
+    # A reprocessed channel only adds the comments it did not have
+    assert store.add_channel('Alpha', _channel_record(('v1', ['c1', 'c2', 'c3']))) == 1
+
+    assert store.has_channel('Alpha') and not store.has_channel('Beta')
+    assert store.has_video('v2')
+    assert store.has_comment('c3')
+    assert store.stats() == {'comments': 3, 'videos': 2, 'channels': 1}
+    assert next(store.iter_comments()) == {
+        'video_id': 'v1', 'channel_name': 'Alpha', 'genre': 'gaming', 'global_tier': 'Mid',
+        'genre_tier': 'Small', 'performance_category': 'top_performer', 'comment_id': 'c1', 'text': 'text c1'
+    }
+    store.close()
+
+
+def test_exports_match_the_json_layouts(tmp_path):
+    store = CommentStore(str(tmp_path / 'comments.sqlite'))
+    store.add_channel('Alpha', _channel_record(('v1', ['c1'])))
+    store.add_channel('Beta', _channel_record(('v2', ['c2', 'c3'])))
+
+    store.export_json(str(tmp_path / 'all.json'))
+    store.export_json(str(tmp_path / 'beta.json'), channel_name='Beta')
+    store.export_json(str(tmp_path / 'empty.json'), channel_name='Gamma')
+
+    all_comments = json.loads((tmp_path / 'all.json').read_text(encoding='utf-8'))
+    assert [comment['comment_id'] for comment in all_comments] == ['c1', 'c2', 'c3']
+    with open(tmp_path / 'check.json', 'w', encoding='utf-8') as f:
+        json.dump(all_comments, f, indent=2, ensure_ascii=False)
+    assert (tmp_path / 'all.json').read_text(encoding='utf-8') == (tmp_path / 'check.json').read_text(encoding='utf-8')
+
+    beta = json.loads((tmp_path / 'beta.json').read_text(encoding='utf-8'))
+    assert [comment['comment_id'] for comment in beta] == ['c2', 'c3']
+    assert 'channel_name' not in beta[0] and 'genre' not in beta[0]
+    assert json.loads((tmp_path / 'empty.json').read_text(encoding='utf-8')) == []
+    store.close()
+
+
+def test_legacy_all_comments_file_is_imported(tmp_path):
+    legacy = [{'comment_id': 'c1', 'video_id': 'v1', 'channel_name': 'Alpha', 'text': 'hi'},
+              {'comment_id': 'c2', 'video_id': 'v1', 'channel_name': 'Alpha', 'text': 'yo'}]
+    (tmp_path / 'all_comments_raw.json').write_text(json.dumps(legacy), encoding='utf-8')
+    store = CommentStore(str(tmp_path / 'comments.sqlite'))
+
+    assert store.import_json(str(tmp_path / 'all_comments_raw.json')) == 2
+    assert store.import_json(str(tmp_path / 'all_comments_raw.json')) == 0
+    assert store.has_channel('Alpha') and store.has_video('v1')
+    assert list(store.iter_comments('Alpha')) == legacy
+    store.close()
@@ -0,0 +1,473 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+from isodate import parse_duration
+
+import corrected_data_extractor
+from corrected_data_extractor import PROGRESS_FILE, CorrectedDataExtractor
+from extraction_storage import ExtractionStore
+from mock_youtube_api import MockYouTubeBackend
+
+
+class FakeYouTube:
+    """Stands in for a googleapiclient client: resource().method(**params).execute() returns `responses[endpoint]`,
+    or `responses[endpoint](params)` when that is callable"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def __getattr__(self, resource):
+        client = self
+
+        class Resource:
+            def list(self, **params):
+                endpoint = f"{resource}.list"
+                client.calls.append((endpoint, params))
+                response = client.responses[endpoint]
+                if callable(response):
+                    response = response(params)
+                return type('Request', (), {'execute': lambda request: response})()
+        return Resource
+
+
+@pytest.fixture
+def offline_extractor(tmp_path, monkeypatch):
+    """Extractor whose API client is a FakeYouTube (or a bare object), running inside tmp_path"""
+    monkeypatch.chdir(tmp_path)
+
+    def make(channels, client=None, **options):
+        monkeypatch.setattr(corrected_data_extractor, 'build', lambda *args, **kwargs: client or object())
+        extractor = CorrectedDataExtractor('TEST-KEY', **options)
+        extractor.get_channel_configuration = lambda: channels
+        return extractor
+    return make
+
+
+def _channels(genre, count):
+    return {genre: [{'name': f"{genre} {i}", 'handle': f"@{genre}{i}", 'subs': 1000, 'global_tier': 'Small',
+                     'genre_tier': 'Small', 'channel_id': f"UC{genre}{i}"} for i in range(count)]}
+
+
+def _channel_record(genre, channel_info):
+    video = {'video_id': f"{channel_info['handle']}-v1", 'title': 'A title', 'comments': [],
+             'caption_info': {'has_captions': False}, 'thumbnail_local_path': None}
+    return {'channel_info': channel_info, 'channel_data': {'subscriber_count': channel_info['subs']},
+            'genre': genre, 'selection_result': {'selected_videos': [video]}, 'videos': [video]}
+
+
+def test_channels_are_extracted_on_worker_threads(offline_extractor):
+    channels = _channels('gaming', 8)
+    client = FakeYouTube({'channels.list': lambda params: {'items': [{'id': channel_id}
+                                                                     for channel_id in params['id'].split(',')]}})
+    extractor = offline_extractor(channels, client=client, max_workers=4)
+    threads = set()
+
+    def process_channel(genre, channel_info, output_dir):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.02)
+        extractor._add_quota(3)
+        return _channel_record(genre, channel_info)
+
+    extractor._process_channel = process_channel
+    results = extractor.execute_api_only_extraction('out')
+
+    assert results['channels_processed'] == 8
+    # One batched channels.list prefetch, then 3 units per channel
+    assert results['quota_used'] == 1 + 8 * 3
+    assert len(threads) > 1 and all(name.startswith('channel') for name in threads)
+    with open(PROGRESS_FILE, encoding='utf-8') as f:
+        assert json.load(f)['processed_channels'] == sorted(channel['name'] for channel in channels['gaming'])
+
+
+def test_video_steps_run_on_the_enrichment_pool(offline_extractor):
+    extractor = offline_extractor({}, max_video_workers=4)
+    threads = set()
+
+    def step(name):
+        def run(video_id, **kwargs):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.01)
+            return f"{name}:{video_id}"
+        return run
+
+    extractor.extract_video_comments = step('comments')
+    extractor.check_caption_availability = step('captions')
+    extractor.download_thumbnail = lambda video_id, **kwargs: step('thumbnail')(video_id)
+    videos = [{'video_id': f"v{i}", 'thumbnail_url': f"https://i.ytimg.com/vi/v{i}/hqdefault.jpg"}
+              for i in range(6)]
+
+    extractor._enrich_videos(videos, 'out', 'Alpha')
+
+    assert videos[3] == {'video_id': 'v3', 'thumbnail_url': 'https://i.ytimg.com/vi/v3/hqdefault.jpg',
+                         'comments': 'comments:v3', 'caption_info': 'captions:v3',
+                         'thumbnail_local_path': 'thumbnail:v3'}
+    assert len(threads) > 1 and all(name.startswith('video') for name in threads)
+
+
+def test_cached_responses_spend_no_quota(offline_extractor):
+    client = FakeYouTube({'videos.list': {'items': [{'id': 'v1'}]}})
+    extractor = offline_extractor({}, client=client, api_cache_file='api_cache.sqlite')
+
+    assert extractor._execute('videos.list', part='statistics', id='v1') == {'items': [{'id': 'v1'}]}
+    assert extractor._execute('videos.list', id='v1', part='statistics') == {'items': [{'id': 'v1'}]}
+    extractor._execute('videos.list', part='statistics', id='v2')
+
+    assert len(client.calls) == 2
+    assert extractor.quota_used == 2
+    extractor.close()
+
+
+def test_selection_fetches_snippets_for_selected_videos_only(offline_extractor):
+    def videos_list(params):
+        ids = params['id'].split(',')
+        if params['part'] == 'snippet':
+            return {'items': [{'id': video_id, 'snippet': {'title': f"Title {video_id}", 'tags': ['tag']}}
+                              for video_id in ids]}
+        return {'items': [{'id': video_id, 'contentDetails': {'duration': 'PT5M'},
+                           'statistics': {'viewCount': str(100 * int(video_id[1:]))}} for video_id in ids]}
+
+    client = FakeYouTube({'videos.list': videos_list})
+    extractor = offline_extractor({}, client=client)
+    uploads = [{'video_id': f"v{i}", 'title': f"Upload {i}", 'published_at': '2024-01-01T00:00:00Z'}
+               for i in range(45)]
+
+    selection = extractor.intelligent_video_selection(uploads)
+
+    stats_calls = [params for _, params in client.calls if params['part'] != 'snippet']
+    snippet_calls = [params for _, params in client.calls if params['part'] == 'snippet']
+    assert [params['id'].count(',') + 1 for params in stats_calls] == [45]
+    assert 'snippet' not in stats_calls[0]['fields']
+    selected = [video['video_id'] for video in selection['selected_videos']]
+    assert len(selected) == 40
+    assert [params['id'] for params in snippet_calls] == [','.join(selected)]
+    assert selected[:10] == [f"v{i}" for i in range(44, 34, -1)]
+    assert selection['selected_videos'][0]['title'] == 'Title v44'
+    assert selection['selected_videos'][0]['performance_category'] == 'top_performer'
+
+
+def _uploads_pages(total, page_size=50):
+    """playlistItems.list responder for `total` uploads, one day apart and newest first"""
+    def playlist_items(params):
+        start = int(params.get('pageToken') or 0)
+        end = min(start + page_size, total)
+        items = [{'snippet': {'resourceId': {'videoId': f"v{i}"}, 'title': f"Upload {i}",
+                              'publishedAt': f"2024-{12 - i // 28:02d}-{28 - i % 28:02d}T00:00:00Z",
+                              'thumbnails': {'high': {'url': f"https://i.ytimg.com/vi/v{i}/hqdefault.jpg"}}}}
+                 for i in range(start, end)]
+        return {'items': items, 'nextPageToken': str(end) if end < total else None}
+    return playlist_items
+
+
+def test_uploads_paging_stops_early(offline_extractor):
+    client = FakeYouTube({'playlistItems.list': _uploads_pages(150)})
+    extractor = offline_extractor({}, client=client, api_cache_file=None)
+
+    assert len(extractor.get_all_channel_videos('UUalpha')) == 150
+    assert len(client.calls) == 3
+
+    client.calls.clear()
+    videos = extractor.get_all_channel_videos('UUalpha', max_uploads=60)
+    assert [video['video_id'] for video in videos] == [f"v{i}" for i in range(60)]
+    assert len(client.calls) == 2
+
+    # A limit on a page boundary does not fetch the next page
+    client.calls.clear()
+    assert len(extractor.get_all_channel_videos('UUalpha', max_uploads=50)) == 50
+    assert len(client.calls) == 1
+
+    client.calls.clear()
+    videos = extractor.get_all_channel_videos('UUalpha', published_after=videos[39]['published_at'])
+    assert [video['video_id'] for video in videos] == [f"v{i}" for i in range(40)]
+    assert len(client.calls) == 1
+
+
+def _comment(comment_id):
+    return {'id': comment_id, 'snippet': {'textDisplay': f"text {comment_id}", 'authorDisplayName': 'viewer',
+                                          'publishedAt': '2024-01-01T00:00:00Z'}}
+
+
+def _comment_threads(total):
+    """commentThreads.list responder for `total` threads; thread t0 has 3 replies, one of them inline"""
+    def comment_threads(params):
+        start = int(params.get('pageToken') or 0)
+        end = min(start + params['maxResults'], total)
+        items = [{'snippet': {'topLevelComment': _comment(f"t{i}"), 'totalReplyCount': 3 if i == 0 else 0},
+                  'replies': {'comments': [_comment('t0.r0')] if i == 0 else []}} for i in range(start, end)]
+        return {'items': items, 'nextPageToken': str(end) if end < total else None}
+    return comment_threads
+
+
+def test_comments_are_paged_with_replies_within_the_budget(offline_extractor):
+    client = FakeYouTube({'commentThreads.list': _comment_threads(250),
+                          'comments.list': {'items': [_comment(f"t0.r{i}") for i in range(3)]}})
+    extractor = offline_extractor({}, client=client, api_cache_file=None)
+
+    comments = extractor.extract_video_comments('v1', max_comments=230)
+    assert [comment['comment_id'] for comment in comments] == [f"t{i}" for i in range(230)]
+    assert [params['maxResults'] for endpoint, params in client.calls] == [100, 100, 30]
+
+    client.calls.clear()
+    comments = extractor.extract_video_comments('v1', max_comments=10, include_replies=True)
+    assert [comment['comment_id'] for comment in comments[:4]] == ['t0', 't0.r0', 't0.r1', 't0.r2']
+    assert all(comment['parent_id'] == 't0' for comment in comments[1:4])
+    assert len(comments) == 10
+    assert [endpoint for endpoint, _ in client.calls] == ['commentThreads.list', 'comments.list']
+
+    # Every page draws on the per-run budget, each video's first included
+    client.calls.clear()
+    budgeted = offline_extractor({}, client=client, api_cache_file=None, comment_quota_budget=2)
+    assert len(budgeted.extract_video_comments('v1', max_comments=250)) == 200
+    assert budgeted.extract_video_comments('v2') == []
+    assert len(client.calls) == 2
+
+
+def test_caption_checks_are_paid_once(offline_extractor):
+    client = FakeYouTube({'captions.list': {'items': [{'snippet': {'language': 'en', 'name': 'English', 'trackKind': 'standard'}}]}})
+    extractor = offline_extractor({}, client=client, caption_cache_file='caption_cache.sqlite')
+
+    first = extractor.check_caption_availability('v1')
+    assert first['has_captions']
+    assert extractor.check_caption_availability('v1') == first
+    assert len(client.calls) == 1
+
+    extractor.check_caption_availability('v1', refresh=True)
+    assert len(client.calls) == 2
+    extractor.close()
+
+
+def _channel_list(path, handles, genre='gaming'):
+    """Channel list file for `handles`; IDs are left "TBD" so they resolve through the mock"""
+    channels = [{'name': handle.lstrip('@').title(), 'handle': handle, 'tier': 'Mid', 'channel_id': 'TBD'}
+                for handle in handles]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({genre: channels}, f)
+    return str(path)
+
+
+def _uploads_playlist(catalog, min_uploads):
+    """Uploads playlist ID of the first synthetic channel with at least `min_uploads` videos"""
+    for i in range(100):
+        channel_id = catalog.channel_id_for_handle(f"@channel{i}")
+        if catalog.upload_count(channel_id) >= min_uploads:
+            return catalog.channel(channel_id)['contentDetails']['relatedPlaylists']['uploads']
+    raise AssertionError(f"no synthetic channel has {min_uploads} uploads")
+
+
+def _selected_ids(output_dir):
+    return {
+        channel_name: sorted(video['video_id'] for video in record['videos'])
+        for channel_name, record in ExtractionStore(output_dir).iter_channels()
+    }
+
+
+def test_concurrent_channels_match_sequential_run(make_extractor):
+    backend = MockYouTubeBackend()
+    uncached = {'api_cache_file': None, 'caption_cache_file': None, 'channel_id_cache_file': None}
+    sequential = make_extractor(backend, max_workers=1, **uncached).execute_api_only_extraction('sequential')
+    requests = backend.stats()['requests']
+    concurrent = make_extractor(backend, max_workers=4, **uncached).execute_api_only_extraction('concurrent')
+
+    assert backend.stats()['requests'] >= 2 * requests
+    assert concurrent['channels_processed'] == sequential['channels_processed'] > 1
+    assert concurrent['videos_selected'] == sequential['videos_selected']
+    selected = _selected_ids('concurrent')
+    assert selected.keys() == _selected_ids('sequential').keys()
+    for video_ids in selected.values():
+        assert len(video_ids) == len(set(video_ids)) == 8
+
+
+def test_every_selected_video_is_enriched(make_extractor):
+    make_extractor(MockYouTubeBackend(), max_video_workers=8).execute_api_only_extraction('out')
+
+    for _, record in ExtractionStore('out').iter_channels():
+        for video in record['videos']:
+            assert isinstance(video['comments'], list)
+            assert 'has_captions' in video['caption_info']
+            assert os.path.isfile(video['thumbnail_local_path'])
+
+
+def test_mock_selection_ranks_by_views(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend)
+    uploads = _uploads_playlist(backend.catalog, 150)
+
+    selection = extractor.select_videos_from_pages(extractor.iter_channel_video_pages(uploads, max_uploads=150))
+
+    # Three statistics pages, then one snippet lookup for the 8 winners
+    assert backend.stats()['requests_by_endpoint']['videos.list'] == 4
+    assert selection['selection_method'] == 'intelligent_sampling'
+    assert selection['breakdown'] == {'top_performers': 2, 'bottom_performers': 2, 'random_sample': 4}
+    for video in selection['selected_videos']:
+        assert video['description'].startswith(f"Synthetic description for {video['video_id']}")
+
+    video_ids, _ = backend.catalog.upload_ids(uploads, 0, 150)
+    long_videos = [backend.catalog.video(video_id) for video_id in video_ids]
+    long_videos = [video for video in long_videos
+                   if parse_duration(video['contentDetails']['duration']).total_seconds() >= 180]
+    by_views = sorted(long_videos, key=lambda video: int(video['statistics']['viewCount']), reverse=True)
+    selected = [video['video_id'] for video in selection['selected_videos']]
+    assert selected[:2] == [video['id'] for video in by_views[:2]]
+    assert selected[2:4] == [video['id'] for video in by_views[-2:]]
+
+
+def test_uploads_paging_stops_at_max_uploads(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend)
+    uploads = _uploads_playlist(backend.catalog, 150)
+
+    pages = list(extractor.iter_channel_video_pages(uploads, max_uploads=100))
+
+    assert [len(page) for page in pages] == [50, 50]
+    assert backend.stats()['requests_by_endpoint']['playlistItems.list'] == 2
+
+
+def test_uploads_paging_stops_at_published_after(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend)
+    uploads = _uploads_playlist(backend.catalog, 150)
+    video_ids, _ = backend.catalog.upload_ids(uploads, 0, 150)
+    # Uploads are newest first; keep the first 60
+    cutoff = backend.catalog.published_at(video_ids[59])
+
+    videos = extractor.get_all_channel_videos(uploads, published_after=cutoff)
+
+    assert [video['video_id'] for video in videos] == video_ids[:60]
+    assert backend.stats()['requests_by_endpoint']['playlistItems.list'] == 2
+
+
+def test_complete_channels_are_judged_against_videos_per_channel(make_extractor):
+    backend = MockYouTubeBackend()
+    channel_list = _channel_list('channels.json', ['@alpha', '@beta'])
+    make_extractor(backend, channel_list_file=channel_list, max_channels=2).execute_api_only_extraction('out')
+    pages = backend.stats()['requests_by_endpoint']['playlistItems.list']
+
+    make_extractor(backend, channel_list_file=channel_list, max_channels=2).execute_api_only_extraction('out')
+    assert backend.stats()['requests_by_endpoint']['playlistItems.list'] == pages
+
+    # A larger target makes the stored channels incomplete again
+    make_extractor(backend, channel_list_file=channel_list, max_channels=2, videos_per_channel=12,
+                   api_cache_file=None).execute_api_only_extraction('out')
+    assert backend.stats()['requests_by_endpoint']['playlistItems.list'] == 2 * pages
+    assert ExtractionStore('out').summary()['videos_selected'] == 2 * 12
+
+
+def _busy_video(catalog, min_threads):
+    """First synthetic video with comments enabled and at least `min_threads` comment threads"""
+    for i in range(100):
+        video_ids, _ = catalog.upload_ids(_uploads_playlist(catalog, 60), i * 10, 10)
+        for video_id in video_ids:
+            if not catalog.comments_disabled(video_id) and catalog.comment_thread_count(video_id) >= min_threads:
+                return video_id
+    raise AssertionError(f"no synthetic video has {min_threads} comment threads")
+
+
+def test_comments_are_paged_up_to_the_per_video_depth(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend)
+    video_id = _busy_video(backend.catalog, 250)
+
+    comments = extractor.extract_video_comments(video_id, max_comments=250)
+
+    assert len({comment['comment_id'] for comment in comments}) == 250
+    assert backend.stats()['requests_by_endpoint']['commentThreads.list'] == 3
+
+
+def test_replies_come_inline_or_from_comments_list(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend)
+    video_id = _busy_video(backend.catalog, 100)
+
+    comments = extractor.extract_video_comments(video_id, max_comments=10 ** 6, include_replies=True)
+
+    threads = [comment for comment in comments if 'parent_id' not in comment]
+    replies = [comment for comment in comments if 'parent_id' in comment]
+    assert len(threads) == backend.catalog.comment_thread_count(video_id)
+    assert len(replies) == sum(thread['reply_count'] for thread in threads)
+    # Only threads with more than the 5 inline replies cost a comments.list call
+    long_threads = sum(1 for thread in threads if thread['reply_count'] > 5)
+    assert long_threads > 0
+    assert backend.stats()['requests_by_endpoint'].get('comments.list', 0) == long_threads
+
+
+def test_comment_budget_covers_every_page(make_extractor):
+    backend = MockYouTubeBackend()
+    extractor = make_extractor(backend, comment_quota_budget=3)
+    video_id = _busy_video(backend.catalog, 250)
+
+    assert len(extractor.extract_video_comments(video_id, max_comments=250)) == 250
+    assert extractor.extract_video_comments(video_id, max_comments=250) == []
+    assert backend.stats()['requests_by_endpoint']['commentThreads.list'] == 3
+    assert extractor.comment_units_used == 3
+
+
+def test_channel_lists_without_counts_use_channel_statistics(make_extractor):
+    backend = MockYouTubeBackend()
+    handles = ['@alpha', '@beta', '@gamma']
+    extractor = make_extractor(backend, channel_list_file=_channel_list('channels.json', handles), max_channels=3)
+
+    extractor.execute_api_only_extraction('out')
+
+    for handle in handles:
+        channel_id = backend.catalog.channel_id_for_handle(handle)
+        statistics = backend.catalog.channel(channel_id, statistics=True)['statistics']
+        channel_data = ExtractionStore('out').get_channel(handle.lstrip('@').title())['channel_data']
+        assert channel_data['subscriber_count'] == int(statistics['subscriberCount']) > 0
+        assert channel_data['video_count'] == int(statistics['videoCount'])
+    # One forHandle lookup per channel, and no separate metadata calls after that
+    assert backend.stats()['requests_by_endpoint']['channels.list'] == len(handles)
+
+
+def test_transient_errors_are_retried(make_extractor):
+    backend = MockYouTubeBackend(error_rate=0.1)
+    extractor = make_extractor(backend, channel_list_file=_channel_list('channels.json', ['@alpha', '@beta']),
+                               max_channels=2)
+
+    results = extractor.execute_api_only_extraction('out')
+
+    assert results['channels_processed'] == 2
+    assert sum(backend.stats()['errors_by_reason'].values()) > 0
+    assert len(extractor.retry_queue) == 0
+
+
+def test_failed_video_steps_are_queued_and_replayed(make_extractor):
+    backend = MockYouTubeBackend()
+    channel_list = _channel_list('channels.json', ['@alpha'])
+    backend._list_commentThreads = lambda query: backend._error(503, 'backendError')
+    first = make_extractor(backend, channel_list_file=channel_list, max_retries=2)
+    first.execute_api_only_extraction('out')
+
+    assert first.retry_queue.stats() == {'comments': 8}
+    assert all(video['comments'] == [] for video in ExtractionStore('out').get_channel('Alpha')['videos'])
+
+    del backend._list_commentThreads
+    pages = backend.stats()['requests_by_endpoint']['playlistItems.list']
+    second = make_extractor(backend, channel_list_file=channel_list, api_cache_file=None)
+    second.execute_api_only_extraction('out')
+
+    # The stored channel is patched in place, not extracted again
+    assert backend.stats()['requests_by_endpoint']['playlistItems.list'] == pages
+    assert len(second.retry_queue) == 0
+    videos = ExtractionStore('out').get_channel('Alpha')['videos']
+    assert any(video['comments'] for video in videos)
+
+
+def test_failed_handle_lookups_queue_the_channel(make_extractor):
+    backend = MockYouTubeBackend()
+    channel_list = _channel_list('channels.json', ['@alpha'])
+    backend._list_channels = lambda query: backend._error(503, 'backendError')
+    first = make_extractor(backend, channel_list_file=channel_list, max_retries=2)
+    first.execute_api_only_extraction('out')
+
+    assert first.retry_queue.stats() == {'channel': 1}
+    assert 'Alpha' not in ExtractionStore('out')
+
+    del backend._list_channels
+    second = make_extractor(backend, channel_list_file=channel_list)
+    second.execute_api_only_extraction('out')
+
+    assert len(second.retry_queue) == 0
+    assert ExtractionStore('out').video_count('Alpha') == 8
@@ -0,0 +1,62 @@
+import csv
+
+from csv_upsert import UpsertCsvWriter
+
+FIELDS = ['video_id', 'title', 'view_count']
+
+
+def _read(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_reruns_add_update_and_skip_rows(tmp_path):
+    path = str(tmp_path / 'ml.csv')
+    writer = UpsertCsvWriter(path, FIELDS)
+    assert writer.upsert([{'video_id': 'v1', 'title': 'One', 'view_count': 10},
+                          {'video_id': 'v2', 'title': 'Two', 'view_count': 20}]) == \
+        {'added': 2, 'updated': 0, 'unchanged': 0}
+
+    counts = UpsertCsvWriter(path, FIELDS).upsert([
+        {'video_id': 'v1', 'title': 'One', 'view_count': 10},
+        {'video_id': 'v2', 'title': 'Two', 'view_count': 25},
+        {'video_id': 'v3', 'title': 'Three', 'view_count': None},
+    ])
+
+    assert counts == {'added': 1, 'updated': 1, 'unchanged': 1}
+    assert _read(path) == [
+        {'video_id': 'v1', 'title': 'One', 'view_count': '10'},
+        {'video_id': 'v2', 'title': 'Two', 'view_count': '25'},
+        {'video_id': 'v3', 'title': 'Three', 'view_count': ''},
+    ]
+
+
+def test_duplicates_from_append_only_runs_keep_the_last_row(tmp_path):
+    path = tmp_path / 'ml.csv'
+    path.write_text('video_id,title,view_count\nv1,Old,1\nv2,Two,2\nv1,New,3\n', encoding='utf-8')
+
+    counts = UpsertCsvWriter(str(path), FIELDS).upsert([{'video_id': 'v1', 'title': 'New', 'view_count': 3}])
+
+    assert counts == {'added': 0, 'updated': 0, 'unchanged': 1}
+    assert [row['title'] for row in _read(str(path))] == ['Two', 'New']
+
+
+def test_outside_edits_invalidate_the_index(tmp_path):
+    path = str(tmp_path / 'ml.csv')
+    UpsertCsvWriter(path, FIELDS).upsert([{'video_id': 'v1', 'title': 'One', 'view_count': 10}])
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        f.write('v2,Added by hand,5\n')
+
+    counts = UpsertCsvWriter(path, FIELDS).upsert([{'video_id': 'v2', 'title': 'Added by hand', 'view_count': 5}])
+
+    assert counts == {'added': 0, 'updated': 0, 'unchanged': 1}
+    assert len(_read(path)) == 2
+
+
+def test_new_columns_are_added_to_an_existing_file(tmp_path):
+    path = tmp_path / 'ml.csv'
+    path.write_text('video_id,title\nv1,One\n', encoding='utf-8')
+
+    UpsertCsvWriter(str(path), FIELDS).upsert([{'video_id': 'v1', 'title': 'One', 'view_count': 10}])
+
+    assert _read(str(path)) == [{'video_id': 'v1', 'title': 'One', 'view_count': '10'}]
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from enrichment_journal import EnrichmentJournal
+from extraction_storage import ExtractionStore
+from mock_youtube_api import MockYouTubeBackend
+
+
+def _record(*video_ids):
+    return {'channel_info': {'name': 'Alpha'}, 'channel_data': {}, 'genre': 'gaming',
+            'selection_result': {'selected_videos': [{'video_id': video_id} for video_id in video_ids]}}
+
+
+def test_open_channels_resume_with_their_finished_steps(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = EnrichmentJournal(path)
+    journal.record_selection('Alpha', _record('v1', 'v2'))
+    journal.record_step('Alpha', 'v1', 'comments', [{'comment_id': 'c1'}])
+    journal.record_step('Alpha', 'v2', 'thumbnail_local_path', 'thumbs/v2.jpg')
+    # Not open: retry queue replays are not journaled
+    journal.record_step('Beta', 'v9', 'comments', [])
+    # Simulated crash: the journal is never closed
+
+    reopened = EnrichmentJournal(path)
+    assert reopened.open_channels() == ['Alpha']
+    assert reopened.steps_done('Alpha') == 2
+    assert reopened.resume('Alpha')['videos'] == [
+        {'video_id': 'v1', 'comments': [{'comment_id': 'c1'}]},
+        {'video_id': 'v2', 'thumbnail_local_path': 'thumbs/v2.jpg'},
+    ]
+    assert reopened.resume('Beta') is None
+    reopened.close()
+
+
+def test_a_new_selection_starts_the_channel_afresh(tmp_path):
+    journal = EnrichmentJournal(str(tmp_path / 'journal.jsonl'))
+    journal.record_selection('Alpha', _record('v1'))
+    journal.record_step('Alpha', 'v1', 'comments', [])
+    journal.record_selection('Alpha', _record('v3'))
+
+    assert journal.steps_done('Alpha') == 0
+    assert journal.resume('Alpha')['videos'] == [{'video_id': 'v3'}]
+    journal.close()
+
+
+def test_torn_line_is_dropped_and_finished_channels_compacted_away(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = EnrichmentJournal(str(path))
+    journal.record_selection('Alpha', _record('v1'))
+    journal.record_selection('Beta', _record('v2'))
+    journal.record_step('Beta', 'v2', 'comments', [])
+    journal.finish('Alpha')
+    journal.close()
+    with open(path, 'ab') as f:
+        f.write(b'{"type":"step","channel":"Beta","vid')
+
+    reopened = EnrichmentJournal(str(path))
+    assert reopened.open_channels() == ['Beta']
+    assert reopened.steps_done('Beta') == 1
+    reopened.close()
+    lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [(line['type'], line['channel']) for line in lines] == [('selection', 'Beta'), ('step', 'Beta')]
+
+
+class Crash(BaseException):
+    """Stands in for the process dying; BaseException gets past every `except Exception`"""
+
+
+def test_interrupted_channel_resumes_without_repeating_steps(make_extractor, monkeypatch):
+    backend = MockYouTubeBackend()
+    with open('channels.json', 'w', encoding='utf-8') as f:
+        json.dump({'gaming': [{'name': 'Alpha', 'handle': '@alpha', 'tier': 'Mid', 'channel_id': 'TBD'}]}, f)
+    options = {'channel_list_file': 'channels.json', 'api_cache_file': None, 'caption_cache_file': None}
+
+    record_step = EnrichmentJournal.record_step
+    journaled = []
+
+    def record_step_then_crash(journal, channel_name, video_id, field, value):
+        if len(journaled) == 10:
+            raise Crash()
+        journaled.append(field)
+        record_step(journal, channel_name, video_id, field, value)
+
+    monkeypatch.setattr(EnrichmentJournal, 'record_step', record_step_then_crash)
+    with pytest.raises(Crash):
+        make_extractor(backend, **options).execute_api_only_extraction('out')
+    monkeypatch.setattr(EnrichmentJournal, 'record_step', record_step)
+    before = dict(backend.stats()['requests_by_endpoint'])
+
+    make_extractor(backend, **options).execute_api_only_extraction('out')
+
+    after = backend.stats()['requests_by_endpoint']
+    # Selection comes from the journal, and only steps it lacks are run again
+    assert after['playlistItems.list'] == before['playlistItems.list']
+    assert after['commentThreads.list'] - before['commentThreads.list'] == 8 - journaled.count('comments')
+    assert after['captions.list'] - before['captions.list'] == 8 - journaled.count('caption_info')
+    videos = ExtractionStore('out').get_channel('Alpha')['videos']
+    assert len(videos) == 8
+    assert all('comments' in video and 'caption_info' in video and video['thumbnail_local_path']
+               for video in videos)
+
+
+
+def test_failed_thumbnails_are_retried_on_resume(make_extractor, monkeypatch):
+    backend = MockYouTubeBackend(thumbnail_error_rate=1.0)
+    with open('channels.json', 'w', encoding='utf-8') as f:
+        json.dump({'gaming': [{'name': 'Alpha', 'handle': '@alpha', 'tier': 'Mid', 'channel_id': 'TBD'}]}, f)
+    options = {'channel_list_file': 'channels.json', 'thumbnail_retries': 0}
+
+    append_channel = ExtractionStore.append_channel
+
+    def crash(store, channel_name, record):
+        raise Crash()
+
+    # Every step has run, but the channel record never reached the store
+    monkeypatch.setattr(ExtractionStore, 'append_channel', crash)
+    with pytest.raises(Crash):
+        make_extractor(backend, **options).execute_api_only_extraction('out')
+    monkeypatch.setattr(ExtractionStore, 'append_channel', append_channel)
+    backend.thumbnail_error_rate = 0.0
+    comment_requests = backend.stats()['requests_by_endpoint']['commentThreads.list']
+
+    make_extractor(backend, **options).execute_api_only_extraction('out')
+
+    assert backend.stats()['requests_by_endpoint']['commentThreads.list'] == comment_requests
+    assert backend.stats()['thumbnails_served'] == 8
+    videos = ExtractionStore('out').get_channel('Alpha')['videos']
+    assert all(video['thumbnail_local_path'] for video in videos)
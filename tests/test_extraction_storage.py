@@ -0,0 +1,96 @@
+import json
+import os
+
+from extraction_storage import ExtractionStore
+
+
+def _record(*video_ids):
+    return {'channel_info': {'name': 'x'}, 'videos': [{'video_id': video_id} for video_id in video_ids]}
+
+
+def test_latest_record_per_channel_wins(tmp_path):
+    store = ExtractionStore(str(tmp_path))
+    store.append_channel('Alpha', _record('a1'))
+    store.append_channel('Beta', _record('b1', 'b2'))
+    store.append_channel('Alpha', _record('a1', 'a2', 'a3'))
+    store.append_meta({'extraction_date': '2025-01-01', 'quota_used': 12})
+
+    reopened = ExtractionStore(str(tmp_path))
+    assert reopened.channel_names() == ['Alpha', 'Beta']
+    assert reopened.video_count('Alpha') == 3
+    assert reopened.get_channel('Alpha') == _record('a1', 'a2', 'a3')
+    assert reopened.summary() == {'extraction_date': '2025-01-01', 'channels_processed': 2,
+                                  'videos_selected': 5, 'quota_used': 12}
+
+
+def test_torn_trailing_record_is_discarded(tmp_path):
+    store = ExtractionStore(str(tmp_path))
+    store.append_channel('Alpha', _record('a1'))
+    with open(store.path, 'ab') as f:
+        f.write(b'{"type":"channel","key":"Beta","vid')
+
+    reopened = ExtractionStore(str(tmp_path))
+    assert reopened.channel_names() == ['Alpha']
+    reopened.append_channel('Beta', _record('b1'))
+    assert ExtractionStore(str(tmp_path)).get_channel('Beta') == _record('b1')
+
+
+def test_compact_keeps_offsets_valid_and_exports_json(tmp_path):
+    store = ExtractionStore(str(tmp_path))
+    for i in range(3):
+        store.append_channel('Alpha', _record(*[f"a{j}" for j in range(i + 1)]))
+    store.append_channel('Beta', _record('b1'))
+    store.append_meta({'quota_used': 7})
+    size_before = os.path.getsize(store.path)
+
+    store.compact()
+
+    assert os.path.getsize(store.path) < size_before
+    assert store.get_channel('Alpha') == _record('a0', 'a1', 'a2')
+    assert store.get_channel('Beta') == _record('b1')
+    store.append_channel('Gamma', _record('g1'))
+    assert store.get_channel('Gamma') == _record('g1')
+    with open(store.json_path, encoding='utf-8') as f:
+        document = json.load(f)
+    assert document['channels_processed'] == 2
+    assert document['data']['Alpha'] == _record('a0', 'a1', 'a2')
+    # The export it just wrote is not re-imported on the next open
+    assert ExtractionStore(str(tmp_path)).channel_names() == ['Alpha', 'Beta', 'Gamma']
+
+
+def test_legacy_json_document_is_imported_once(tmp_path):
+    legacy = {'extraction_date': '2024-06-01', 'quota_used': 3, 'data': {'Alpha': _record('a1', 'a2')}}
+    with open(tmp_path / 'api_only_complete_data.json', 'w', encoding='utf-8') as f:
+        json.dump(legacy, f)
+
+    store = ExtractionStore(str(tmp_path))
+    assert store.get_channel('Alpha') == _record('a1', 'a2')
+    assert store.summary()['quota_used'] == 3
+    store.append_channel('Beta', _record('b1'))
+    assert ExtractionStore(str(tmp_path)).channel_names() == ['Alpha', 'Beta']
+
+
+def test_edited_json_keeps_channels_appended_after_the_export(tmp_path):
+    store = ExtractionStore(str(tmp_path))
+    store.append_channel('Alpha', _record('a1', 'a2'))
+    store.append_channel('Beta', _record('b1'))
+    store.append_meta({'quota_used': 5})
+    store.compact()
+    store.append_channel('Gamma', _record('g1'))
+    store.append_meta({'quota_used': 9})
+
+    # A cleanup script edits the stale export: drops a video from Alpha and removes Beta
+    with open(store.json_path, encoding='utf-8') as f:
+        document = json.load(f)
+    document['data']['Alpha'] = _record('a1')
+    del document['data']['Beta']
+    with open(store.json_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f)
+
+    reopened = ExtractionStore(str(tmp_path))
+    assert reopened.channel_names() == ['Alpha', 'Gamma']
+    assert reopened.get_channel('Alpha') == _record('a1')
+    assert reopened.get_channel('Gamma') == _record('g1')
+    assert reopened.summary()['quota_used'] == 9
+    # The merge is recorded as the export, so it is not imported again
+    assert ExtractionStore(str(tmp_path)).channel_names() == ['Alpha', 'Gamma']
@@ -0,0 +1,76 @@
+import requests
+
+from mock_youtube_api import MockYouTubeBackend, MockYouTubeServer, SyntheticCatalog, run_benchmark
+
+
+def test_catalog_is_deterministic_per_seed():
+    catalog = SyntheticCatalog(seed=0)
+    channel_id = catalog.channel_id_for_handle('@Alpha')
+    assert channel_id == catalog.channel_id_for_handle('alpha')
+    video_ids, total = catalog.upload_ids('UU' + channel_id[2:], 0, 5)
+
+    assert total == catalog.upload_count(channel_id)
+    assert catalog.video(video_ids[0]) == SyntheticCatalog(seed=0).video(video_ids[0])
+    assert SyntheticCatalog(seed=1).channel_id_for_handle('@Alpha') != channel_id
+    # Newest first
+    assert catalog.published_at(video_ids[0]) > catalog.published_at(video_ids[-1])
+
+
+def test_playlist_pages_chain_to_the_end():
+    backend = MockYouTubeBackend()
+    channel_id = backend.catalog.channel_id_for_handle('@alpha')
+    seen, token = [], ''
+    while token is not None:
+        status, payload = backend.handle_api('playlistItems', {'playlistId': 'UU' + channel_id[2:],
+                                                               'maxResults': '50', 'pageToken': token})
+        assert status == 200
+        seen += [item['contentDetails']['videoId'] for item in payload['items']]
+        token = payload.get('nextPageToken')
+
+    assert len(seen) == len(set(seen)) == backend.catalog.upload_count(channel_id)
+    assert backend.handle_api('playlistItems', {'playlistId': 'PLother'})[0] == 404
+
+
+def test_quota_is_billed_per_key():
+    backend = MockYouTubeBackend(quota_per_key=3)
+    query = {'id': 'UCx', 'key': 'MOCK-KEY-0001'}
+    assert [backend.handle_api('channels', query)[0] for _ in range(4)] == [200, 200, 200, 403]
+    status, payload = backend.handle_api('channels', query)
+    assert payload['error']['errors'][0]['reason'] == 'quotaExceeded'
+    assert backend.handle_api('channels', {'id': 'UCx', 'key': 'MOCK-KEY-0002'})[0] == 200
+
+    stats = backend.stats()
+    assert stats['units_by_key'] == {'…0001': 3, '…0002': 1}
+    assert stats['errors_by_reason'] == {'quotaExceeded': 2}
+    assert stats['requests_by_endpoint'] == {'channels.list': 6}
+
+
+def test_thumbnails_revalidate_by_etag():
+    backend = MockYouTubeBackend()
+    status, headers, body = backend.handle_thumbnail('/vi/abcde000001/hqdefault.jpg', {})
+    assert status == 200 and body
+
+    assert backend.handle_thumbnail('/vi/abcde000001/hqdefault.jpg', {'If-None-Match': headers['ETag']})[0] == 304
+    assert backend.handle_thumbnail('/vi/abcde000001', {})[0] == 404
+    backend.thumbnail_error_rate = 1.0
+    assert backend.handle_thumbnail('/vi/abcde000001/hqdefault.jpg', {})[0] == 503
+
+
+def test_server_answers_api_and_thumbnail_requests():
+    backend = MockYouTubeBackend()
+    with MockYouTubeServer(backend) as server:
+        response = requests.get(f"{server.url}/youtube/v3/channels",
+                                params={'forHandle': '@alpha', 'part': 'snippet', 'key': 'k'}, timeout=5)
+        channel = response.json()['items'][0]
+        thumbnail_url = channel['snippet']['thumbnails']['high']['url']
+        assert thumbnail_url.startswith(server.url)
+        assert requests.get(thumbnail_url, timeout=5).status_code == 200
+
+
+def test_benchmark_reruns_are_served_from_the_caches():
+    rows = run_benchmark(channels=1, workers=[2], runs=2, latency=0.0, video_workers=4,
+                         extractor_options={'videos_per_channel': 4})
+
+    assert [row['run'] for row in rows] == [1, 2]
+    assert rows[0]['channels'] == rows[1]['channels'] == 5
+    assert rows[1]['api_requests'] < rows[0]['api_requests']
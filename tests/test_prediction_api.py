@@ -0,0 +1,367 @@
+import copy
+import json
+import logging
+import warnings
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import prediction_api
+from mock_youtube_api import SyntheticCatalog
+from prediction_api import (EMBEDDING_DIMENSIONS, FeaturePlan, ThumbnailFeatureCache, ThumbnailProcessor,
+                            parse_batch_candidates, parse_sweep_titles)
+
+THUMBNAILS = [SyntheticCatalog().thumbnail(video_id) for video_id in ('abcde000001', 'fghij000002')]
+
+
+@pytest.fixture
+def embed_calls(predictor, monkeypatch):
+    """Counts generate_embeddings calls per text type"""
+    calls = Counter()
+    generate_embeddings = predictor.generate_embeddings
+
+    def counting(text, text_type, n_components=30):
+        calls[text_type] += 1
+        return generate_embeddings(text, text_type, n_components)
+
+    monkeypatch.setattr(predictor, 'generate_embeddings', counting)
+    return calls
+
+
+def _video(title='How to build a PC in 2025!', **fields):
+    return {'title': title, 'genre': 'gaming', 'description': 'Parts list below', 'tags': ['pc', 'build'],
+            'duration_seconds': 600, **fields}
+
+
+def test_each_text_field_is_embedded_once_per_prediction(predictor, embed_calls):
+    predictor.predict_performance('How to build a PC in 2025!', 'gaming', 50000,
+                                  video_data={'description': 'Parts list below', 'tags': ['pc', 'build']})
+    assert embed_calls == Counter({text_type: 1 for text_type in EMBEDDING_DIMENSIONS})
+
+
+def test_shared_cache_embeds_distinct_texts_once(predictor, embed_calls):
+    cache = {}
+    first = predictor.compute_text_embeddings(_video(), cache)
+    second = predictor.compute_text_embeddings(_video(title='Budget PC build'), cache)
+
+    assert embed_calls == Counter({'title': 2, 'description': 1, 'tags': 1, 'thumb_text': 1})
+    assert first['description'] is second['description']
+    assert {text_type: len(block) for text_type, block in first.items()} == EMBEDDING_DIMENSIONS
+
+
+def test_embeddings_have_the_trained_dimensions(predictor, embed_calls):
+    embeddings = predictor.compute_text_embeddings(_video())
+
+    assert embed_calls == Counter({text_type: 1 for text_type in EMBEDDING_DIMENSIONS})
+    assert {text_type: len(block) for text_type, block in embeddings.items()} == EMBEDDING_DIMENSIONS
+
+
+def test_precomputed_embeddings_give_the_same_rows(predictor):
+    video_data = _video()
+    thumbnail_features = predictor.thumbnail_processor._get_default_features()
+    embeddings = predictor.compute_text_embeddings(video_data)
+    for model_type in ('ctr', 'rqs'):
+        assert np.array_equal(predictor.prepare_features_with_thumbnail(video_data, thumbnail_features, model_type),
+                              predictor.prepare_features_with_thumbnail(video_data, thumbnail_features, model_type,
+                                                                        embeddings))
+
+
+def _legacy_feature_row(video_data, thumbnail_features, feature_list, embeddings):
+    """The per-column substring dispatch FeaturePlan replaced, kept as the reference it must match"""
+    features = {}
+    for col in feature_list:
+        text_type = next((t for t in EMBEDDING_DIMENSIONS if f'{t}_embed_' in col), None)
+        if text_type is not None:
+            idx = int(col.split('_')[-1])
+            block = embeddings[text_type]
+            features[col] = block[idx] if idx < len(block) else 0.0
+        elif col in thumbnail_features:
+            features[col] = float(thumbnail_features[col])
+        elif 'avg_r' in col or 'average_r' in col:
+            features[col] = thumbnail_features.get('avg_r', 128.0)
+        elif 'avg_g' in col or 'average_g' in col:
+            features[col] = thumbnail_features.get('avg_g', 128.0)
+        elif 'avg_b' in col or 'average_b' in col:
+            features[col] = thumbnail_features.get('avg_b', 128.0)
+        elif 'brightness' in col:
+            features[col] = thumbnail_features.get('brightness', 128.0)
+        elif 'contrast' in col:
+            features[col] = thumbnail_features.get('contrast', 50.0)
+        elif 'saturation' in col:
+            features[col] = thumbnail_features.get('saturation', 128.0)
+        elif 'warm_cool' in col:
+            features[col] = thumbnail_features.get('warm_cool', 0.0)
+        elif 'face' in col:
+            features[col] = thumbnail_features.get('face_area_percentage', 0.0)
+        elif 'edge_density' in col:
+            features[col] = thumbnail_features.get('edge_density', 0.1)
+        elif col.startswith('genre_'):
+            features[col] = 1.0 if col == f"genre_{video_data.get('genre', 'unknown')}" else 0.0
+        elif 'duration' in col:
+            features[col] = video_data.get('duration_seconds', 300.0)
+        elif 'title_length' in col:
+            features[col] = len(video_data.get('title', ''))
+        elif 'title_word_count' in col:
+            features[col] = len(video_data.get('title', '').split())
+        elif col in video_data:
+            features[col] = float(video_data[col])
+        else:
+            features[col] = 0.0
+    return pd.DataFrame([features])[feature_list].to_numpy(dtype=float)
+
+
+@pytest.fixture(scope='module')
+def thumbnail_features():
+    processor = ThumbnailProcessor()
+    return [processor._get_default_features()] + [
+        processor.extract_features(thumbnail) for thumbnail in THUMBNAILS
+    ]
+
+
+@pytest.mark.parametrize('video_data', [
+    _video(),
+    _video(title='', genre='catholic', description='', tags='not a list', like_count=12, has_captions=True),
+    {'title': 'Minimal'},
+])
+def test_plans_match_the_legacy_rows_for_the_trained_models(predictor, thumbnail_features, video_data):
+    embeddings = predictor.compute_text_embeddings(video_data)
+    for model_type in ('ctr', 'rqs'):
+        feature_list = predictor.feature_lists[model_type]
+        for features in thumbnail_features:
+            assert np.array_equal(predictor.feature_plans[model_type].build(video_data, features, embeddings),
+                                  _legacy_feature_row(video_data, features, feature_list, embeddings))
+
+
+def test_plan_matches_the_legacy_row_for_every_column_kind(thumbnail_features):
+    defaults = ThumbnailProcessor()._get_default_features()
+    feature_list = [
+        'title_embed_0', 'title_embed_29', 'description_embed_3', 'tags_embed_19', 'thumb_text_embed_14',
+        'title_embed_40', 'brightness', 'thumb_average_r', 'avg_g_norm', 'mean_saturation', 'face_count',
+        'edge_density_hi', 'warm_cool_ratio', 'genre_gaming', 'genre_catholic', 'genre_unknown',
+        'duration_seconds', 'log_duration', 'title_length', 'title_word_count', 'like_count', 'missing_column'
+    ]
+    plan = FeaturePlan(feature_list, defaults)
+    # Short blocks exercise the missing-component path
+    embeddings = {text_type: np.arange(1.0, n + 1) for text_type, n in EMBEDDING_DIMENSIONS.items()}
+    embeddings['title'] = embeddings['title'][:10]
+    for video_data in (_video(like_count=7), {'title': 'x', 'genre': 'nope'}):
+        for features in thumbnail_features:
+            assert np.array_equal(plan.build(video_data, features, embeddings),
+                                  _legacy_feature_row(video_data, features, feature_list, embeddings))
+
+
+def test_estimators_get_the_column_names_they_were_fitted_on(predictor):
+    assert set(predictor.feature_columns) >= {'ctr', 'ctr_baseline', 'rqs'}
+    with warnings.catch_warnings():
+        warnings.filterwarnings('error', message='X does not have valid feature names')
+        warnings.filterwarnings('error', message='X has feature names')
+        predictor.predict_performance('How to build a PC', 'gaming', 50000, THUMBNAILS[0], _video())
+
+
+def test_feature_lists_out_of_order_are_rejected_at_load(predictor, monkeypatch):
+    monkeypatch.setattr(predictor, 'feature_columns', {})
+    estimator = predictor.models['ctr']
+    feature_list = list(estimator.feature_names_in_)
+
+    predictor._register_feature_columns('ctr', estimator, feature_list)
+    assert list(predictor.feature_columns['ctr']) == feature_list
+    with pytest.raises(ValueError, match='names or order differ'):
+        predictor._register_feature_columns('ctr', estimator, feature_list[::-1])
+
+
+@pytest.fixture
+def client(predictor, monkeypatch):
+    """Test client for the standalone app, sharing the session's predictor instead of loading at startup"""
+    monkeypatch.setattr(prediction_api, 'predictor', predictor)
+    return TestClient(prediction_api.app)
+
+
+def test_batch_matches_one_prediction_per_candidate(predictor, monkeypatch):
+    candidates = [
+        {'title': 'How to build a PC in 2025!', 'genre': 'gaming', 'subscriber_count': 50000,
+         'thumbnail_index': 1, 'video_data': _video()},
+        {'title': 'EPIC CHALLENGE 100 days', 'genre': 'challenge_stunts', 'subscriber_count': 1200,
+         'thumbnail_index': None, 'video_data': {'duration_seconds': 60}},
+        {'title': 'Prayer', 'genre': 'bogus', 'subscriber_count': 300, 'thumbnail_index': 0, 'video_data': None},
+        {'title': 'How to build a PC in 2025!', 'genre': 'gaming', 'subscriber_count': 50000,
+         'thumbnail_index': 0, 'video_data': _video()},
+    ]
+    singles = [
+        predictor.predict_performance(c['title'], c['genre'], c['subscriber_count'],
+                                      None if c['thumbnail_index'] is None else THUMBNAILS[c['thumbnail_index']],
+                                      copy.deepcopy(c['video_data']))
+        for c in candidates
+    ]
+    analyzed = []
+    analyze_thumbnail = predictor.analyze_thumbnail
+    monkeypatch.setattr(predictor, 'analyze_thumbnail', lambda data: analyzed.append(data) or analyze_thumbnail(data))
+
+    assert predictor.predict_performance_batch(copy.deepcopy(candidates), THUMBNAILS) == singles
+    assert sorted(analyzed) == sorted(THUMBNAILS)
+
+
+def test_per_candidate_ctr_details_are_logged_at_debug_level(predictor, capsys, caplog):
+    candidates = [{'title': f"Title {i}", 'genre': 'gaming', 'subscriber_count': 1000, 'thumbnail_index': None,
+                   'video_data': None} for i in range(3)]
+
+    with caplog.at_level(logging.DEBUG, logger='prediction_api'):
+        predictor.predict_performance_batch(candidates, [])
+
+    assert 'CTR' not in capsys.readouterr().out
+    assert len([record for record in caplog.records if record.getMessage().startswith('CTR: ')]) == 3
+
+
+@pytest.mark.parametrize('candidates, detail', [
+    ('[{"title": ', 'not valid JSON'),
+    ('[]', 'non-empty JSON list'),
+    (json.dumps([{'title': 'x'}] * 101), 'At most 100'),
+    ('[{"title": "x", "genre": "gaming"}]', 'missing subscriber_count'),
+    ('[{"title": " ", "genre": "gaming", "subscriber_count": 10}]', 'title must be a non-empty string'),
+    ('[{"title": "x", "genre": "gaming", "subscriber_count": 0}]', 'subscriber_count must be a positive integer'),
+    ('[{"title": "x", "genre": "gaming", "subscriber_count": true}]', 'subscriber_count must be a positive integer'),
+    ('[{"title": "x", "genre": "gaming", "subscriber_count": 10, "thumbnail_index": 1}]', 'thumbnail_index 1'),
+    ('[{"title": "x", "genre": "gaming", "subscriber_count": 10, "duration_seconds": -5}]', 'duration_seconds'),
+    ('[{"title": "x", "genre": "gaming", "subscriber_count": 10, "tags": ["a", 1]}]', 'tags must be'),
+    ('[{"title": "x", "genre": "gaming", "subscriber_count": 10, "has_captions": "yes"}]', 'has_captions'),
+])
+def test_invalid_batch_candidates_are_rejected(candidates, detail):
+    with pytest.raises(HTTPException) as excinfo:
+        parse_batch_candidates(candidates, n_thumbnails=1)
+    assert excinfo.value.status_code == 400
+    assert detail in excinfo.value.detail
+
+
+def test_batch_endpoint(client):
+    candidates = [{'title': 'How to build a PC', 'genre': 'gaming', 'subscriber_count': 50000, 'thumbnail_index': 0,
+                   'tags': 'pc, build'},
+                  {'title': 'Budget PC build', 'genre': 'gaming', 'subscriber_count': 50000, 'tags': ['pc, cheap']}]
+    files = [('thumbnails', ('a.jpg', THUMBNAILS[0], 'image/jpeg'))]
+
+    response = client.post('/api/predict/batch', data={'candidates': json.dumps(candidates)}, files=files)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['count'] == 2
+    assert [p['input_data']['thumbnail_index'] for p in body['predictions']] == [0, None]
+    assert [p['input_data']['recommended_tags'] for p in body['predictions']] == [['pc', 'build'], ['pc, cheap']]
+
+    candidates[1]['thumbnail_index'] = 1
+    response = client.post('/api/predict/batch', data={'candidates': json.dumps(candidates)}, files=files)
+    assert response.status_code == 400
+    assert response.json()['detail'].startswith('Candidate 1: thumbnail_index 1')
+
+
+def test_sweep_ranks_every_title_thumbnail_combination(predictor):
+    titles = ['How to build a PC', 'I built a PC for $300', 'PC BUILD GONE WRONG!!!']
+    video_data = {'description': 'Parts list below', 'tags': ['pc', 'build'], 'duration_seconds': 600}
+    sweep = predictor.predict_variant_sweep(titles, 'gaming', 50000, THUMBNAILS, video_data)
+
+    assert sweep['combinations'] == len(sweep['ranking']) == 6
+    assert sorted((row['title_index'], row['thumbnail_index']) for row in sweep['ranking']) == [
+        (t, i) for t in range(3) for i in range(2)]
+    scores = [row['performance_score'] for row in sweep['ranking']]
+    assert scores == sorted(scores, reverse=True)
+    assert [row['rank'] for row in sweep['ranking']] == [1, 2, 3, 4, 5, 6]
+    assert sweep['best'] is sweep['ranking'][0]
+    assert [analysis['thumbnail_index'] for analysis in sweep['thumbnail_analysis']] == [0, 1]
+
+    best = sweep['best']
+    single = predictor.predict_performance(best['title'], 'gaming', 50000, THUMBNAILS[best['thumbnail_index']],
+                                           dict(video_data))
+    assert best['title'] == titles[best['title_index']]
+    assert best['performance_score'] == single['performance_score']
+    assert best['predicted_views'] == single['predicted_views']
+
+
+def test_sweep_without_thumbnails_scores_titles_only(predictor):
+    sweep = predictor.predict_variant_sweep(['A', 'B'], 'bogus', 1000)
+    assert [row['thumbnail_index'] for row in sweep['ranking']] == [None, None]
+    assert sweep['thumbnail_analysis'] == []
+    assert 'warnings' in sweep
+
+
+def test_sweep_titles_are_deduplicated_and_limited():
+    assert parse_sweep_titles('Base', json.dumps(['Alt', ' ', 'Base', 'Alt']), 2) == ['Base', 'Alt']
+    assert parse_sweep_titles('Base', None, 0) == ['Base']
+    assert len(parse_sweep_titles('Base', json.dumps([f"v{i}" for i in range(99)]), 5)) == 100
+    for title, variants, n_thumbnails, detail in [
+        ('  ', None, 1, 'must not be blank'),
+        ('Base', '["a", ', 1, 'not valid JSON'),
+        ('Base', '{"a": 1}', 1, 'JSON list of strings'),
+        ('Base', json.dumps([f"v{i}" for i in range(100)]), 5, '505 combinations'),
+    ]:
+        with pytest.raises(HTTPException) as excinfo:
+            parse_sweep_titles(title, variants, n_thumbnails)
+        assert excinfo.value.status_code == 400
+        assert detail in excinfo.value.detail
+
+
+def test_sweep_endpoint(client):
+    files = [('thumbnails', (f"{i}.jpg", thumbnail, 'image/jpeg')) for i, thumbnail in enumerate(THUMBNAILS)]
+    data = {'title': 'How to build a PC', 'genre': 'gaming', 'subscriber_count': '50000',
+            'title_variants': json.dumps(['I built a PC for $300'])}
+
+    response = client.post('/api/predict/sweep', data=data, files=files)
+    assert response.status_code == 200
+    assert response.json()['combinations'] == 4
+    assert response.json()['input_data']['genre'] == 'gaming'
+
+    response = client.post('/api/predict/sweep', data={**data, 'title': '   '}, files=files)
+    assert response.status_code == 400
+
+
+def test_feature_cache_evicts_least_recently_used():
+    cache = ThumbnailFeatureCache(max_entries=2)
+    keys = [ThumbnailFeatureCache.key(data) for data in (b'a', b'b', b'c')]
+    cache.put(keys[0], {'brightness': 1.0})
+    cache.put(keys[1], {'brightness': 2.0})
+    assert cache.get(keys[0]) == {'brightness': 1.0}
+    cache.put(keys[2], {'brightness': 3.0})
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) and cache.get(keys[2])
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1, 1)
+    assert stats['hit_rate'] == 0.75
+
+
+def test_feature_cache_is_bounded_by_size():
+    features = {f"feature_{i}": float(i) for i in range(20)}
+    one_entry = ThumbnailFeatureCache(max_bytes=10 ** 6)
+    one_entry.put(b'k' * 16, features)
+    cache = ThumbnailFeatureCache(max_bytes=one_entry.bytes * 2)
+    for i in range(5):
+        cache.put(bytes([i]) * 16, features)
+    assert cache.stats()['entries'] == 2 and cache.bytes <= cache.max_bytes
+
+    cache.put(b'x' * 16, {'text': 'x' * cache.max_bytes})
+    assert cache.get(b'x' * 16) is None
+
+
+def test_repeat_thumbnails_are_served_from_the_cache(monkeypatch):
+    processor = ThumbnailProcessor()
+    extractions = []
+    extract = processor._extract_features_uncached
+    monkeypatch.setattr(processor, '_extract_features_uncached',
+                        lambda data: extractions.append(data) or extract(data))
+
+    first = processor.extract_features(THUMBNAILS[0])
+    palette = copy.deepcopy(first['color_palette'])
+    first['brightness'] = -1.0
+    first['color_palette'][0][0] = -1
+    first['average_rgb'].append(0.0)
+    second = processor.extract_features(THUMBNAILS[0])
+    assert second['brightness'] != -1.0
+    assert second['color_palette'] == palette
+    assert len(second['average_rgb']) == 3
+    processor.extract_features(THUMBNAILS[1])
+    assert extractions == [THUMBNAILS[0], THUMBNAILS[1]]
+
+    # Undecodable uploads fall back to defaults and are not cached
+    assert processor.extract_features(b'not an image') == processor._get_default_features()
+    processor.extract_features(b'not an image')
+    assert extractions[2:] == [b'not an image', b'not an image']
+    assert processor.feature_cache.stats()['entries'] == 2
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from rate_limiter import QuotaDeferredError, QuotaExhaustedError, QuotaScheduler, TokenBucket
+
+
+def test_token_bucket_paces_after_the_burst():
+    bucket = TokenBucket(rate=50, capacity=5)
+    started = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    # 5 tokens up front, the other 10 at 50 per second
+    assert time.monotonic() - started >= 0.18
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_rejects_oversized_requests():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=10, capacity=2).acquire(3)
+
+
+def test_scheduler_charges_endpoint_costs():
+    scheduler = QuotaScheduler(daily_budget=1000, rate=1000, reserve_units=0)
+    assert scheduler.admit('videos.list') == 1
+    assert scheduler.admit('captions.list') == 50
+    summary = scheduler.summary()
+    assert summary['used'] == 51
+    assert summary['units_by_endpoint'] == {'videos.list': 1, 'captions.list': 50}
+    assert scheduler.remaining == 949
+
+
+def test_scheduler_defers_expensive_calls_inside_the_reserve():
+    scheduler = QuotaScheduler(daily_budget=100, rate=1000, reserve_units=60)
+    with pytest.raises(QuotaDeferredError):
+        scheduler.admit('captions.list')
+    # One-unit calls still spend the reserve, down to the last unit
+    for _ in range(100):
+        scheduler.admit('videos.list')
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.admit('videos.list')
+    assert scheduler.exhausted
+    assert scheduler.summary()['deferred_by_endpoint'] == {'captions.list': 1}
+
+
+def test_scheduler_never_overspends_under_concurrency():
+    scheduler = QuotaScheduler(daily_budget=200, rate=10000, reserve_units=0)
+    admitted = []
+
+    def worker():
+        while True:
+            try:
+                admitted.append(scheduler.admit('playlistItems.list'))
+            except QuotaExhaustedError:
+                return
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(admitted) == scheduler.used == 200
@@ -0,0 +1,41 @@
+from retry_queue import CHANNEL_UNIT, RetryQueue
+
+
+def test_failures_accumulate_and_persist(tmp_path):
+    path = str(tmp_path / 'retry_queue.json')
+    queue = RetryQueue(path)
+    queue.add('Alpha', 'comments', 'transient', 'HTTP 503', video_id='v1', endpoint='commentThreads.list')
+    queue.add('Alpha', 'comments', 'rate_limit', 'HTTP 429', video_id='v1', endpoint='commentThreads.list')
+    queue.add('Alpha', 'caption_info', 'transient', 'HTTP 500', video_id='v2')
+    queue.add('Beta', CHANNEL_UNIT, 'transient', 'HTTP 502')
+    queue.save()
+
+    reloaded = RetryQueue(path)
+    assert len(reloaded) == 3
+    assert reloaded.stats() == {'comments': 1, 'caption_info': 1, 'channel': 1}
+    entry = reloaded.video_units()['Alpha'][0]
+    assert (entry['video_id'], entry['failures'], entry['error_class']) == ('v1', 2, 'rate_limit')
+    # Whole channels are reprocessed instead of replayed
+    assert 'Beta' not in reloaded.video_units()
+    assert reloaded.has_channel('Beta')
+
+
+def test_removing_units(tmp_path):
+    path = str(tmp_path / 'retry_queue.json')
+    queue = RetryQueue(path)
+    queue.add('Alpha', 'comments', 'transient', 'HTTP 503', video_id='v1')
+    queue.add('Alpha', 'caption_info', 'transient', 'HTTP 503', video_id='v1')
+    queue.add('Beta', 'comments', 'transient', 'HTTP 503', video_id='v2')
+
+    queue.remove('Alpha', 'comments', 'v1')
+    queue.remove('Alpha', 'comments', 'v1')
+    queue.discard_channel('Beta')
+    queue.save()
+
+    assert RetryQueue(path).stats() == {'caption_info': 1}
+
+
+def test_unreadable_queue_starts_empty(tmp_path):
+    path = tmp_path / 'retry_queue.json'
+    path.write_text('[{"channel": ', encoding='utf-8')
+    assert len(RetryQueue(str(path))) == 0
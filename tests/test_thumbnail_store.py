@@ -0,0 +1,115 @@
+import os
+
+import requests
+from requests.adapters import BaseAdapter
+
+from thumbnail_store import ThumbnailDownloader
+
+CDN = 'https://i.ytimg.com'
+
+
+class FakeCdn(BaseAdapter):
+    """
+    Answers thumbnail URLs from memory with an ETag, and 304 when If-None-Match matches
+    `status` forces every response to that HTTP status; `requests` counts every request, `served` full bodies
+    """
+
+    def __init__(self, status=200):
+        super().__init__()
+        self.status = status
+        self.requests = 0
+        self.served = 0
+
+    @staticmethod
+    def image(video_id):
+        return f"jpeg bytes of {video_id}".encode('utf-8')
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        body = self.image(request.url.split('/')[-2])
+        etag = f'"{len(body)}"'
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = b''
+        if self.status == 200:
+            response.headers['ETag'] = etag
+            if request.headers.get('If-None-Match') == etag:
+                response.status_code = 304
+            else:
+                response._content = body
+                self.served += 1
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _downloader(cdn, **options):
+    downloader = ThumbnailDownloader(**options)
+    downloader.session.mount(CDN + '/', cdn)
+    return downloader
+
+
+def _url(video_id):
+    return f"{CDN}/vi/{video_id}/hqdefault.jpg"
+
+
+def test_download_many_over_the_pooled_session(tmp_path):
+    cdn = FakeCdn()
+    downloader = _downloader(cdn, pool_size=4)
+    items = [(f"vid{i:08d}", _url(f"vid{i:08d}")) for i in range(12)]
+
+    results = downloader.download_many(items, str(tmp_path), max_workers=4)
+
+    assert sorted(results) == sorted(video_id for video_id, _ in items)
+    for video_id, path in results.items():
+        assert path == os.path.join(str(tmp_path), f"{video_id}.jpg")
+        with open(path, 'rb') as f:
+            assert f.read() == FakeCdn.image(video_id)
+    assert cdn.served == 12
+    assert downloader.session.get_adapter('http://example.com/')._pool_maxsize == 4
+
+
+def test_failed_download_returns_none(tmp_path):
+    downloader = _downloader(FakeCdn(status=503), max_retries=0)
+
+    assert downloader.download('vid00000001', _url('vid00000001'), str(tmp_path)) is None
+    assert not os.listdir(str(tmp_path))
+
+
+def test_existing_thumbnails_are_skipped_across_runs(tmp_path):
+    cdn = FakeCdn()
+    first = _downloader(cdn)
+    path = first.download('vid00000001', _url('vid00000001'), str(tmp_path))
+    first.close()
+
+    second = _downloader(cdn)
+    assert second.download('vid00000001', _url('vid00000001'), str(tmp_path)) == path
+    assert second.stats['skipped'] == 1
+    assert cdn.requests == 1
+
+
+def test_revalidation_sends_the_stored_etag(tmp_path):
+    cdn = FakeCdn()
+    first = _downloader(cdn)
+    first.download('vid00000001', _url('vid00000001'), str(tmp_path))
+    first.close()
+
+    downloader = _downloader(cdn, revalidate=True)
+    assert downloader.download('vid00000001', _url('vid00000001'), str(tmp_path)) == str(tmp_path / 'vid00000001.jpg')
+    assert downloader.stats == {'downloaded': 0, 'skipped': 0, 'not_modified': 1, 'adopted': 0}
+    assert (cdn.requests, cdn.served) == (2, 1)
+
+
+def test_files_without_a_manifest_entry_are_adopted(tmp_path):
+    cdn = FakeCdn()
+    (tmp_path / 'vid00000001.jpg').write_bytes(b'jpeg bytes from an older run')
+    downloader = _downloader(cdn)
+
+    path = downloader.download('vid00000001', _url('vid00000001'), str(tmp_path))
+
+    assert path == str(tmp_path / 'vid00000001.jpg')
+    assert downloader.stats['adopted'] == 1
+    assert cdn.requests == 0
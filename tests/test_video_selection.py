@@ -0,0 +1,61 @@
+import random
+from collections import Counter
+
+from video_selection import StreamingSelector, split_target
+
+
+def _items(scores):
+    return [{'id': i, 'view_count': score} for i, score in enumerate(scores)]
+
+
+def test_split_target():
+    assert split_target(40) == (10, 10, 20)
+    assert split_target(8) == (2, 2, 4)
+    assert split_target(3) == (0, 0, 3)
+
+
+def test_top_and_bottom_match_a_stable_sort():
+    rng = random.Random(7)
+    # Few distinct scores so ties are common
+    items = _items([rng.randrange(20) for _ in range(500)])
+    selector = StreamingSelector(10, 10, 20, rng=random.Random(1))
+    selector.extend(items)
+    result = selector.result()
+
+    ranked = sorted(items, key=lambda item: item['view_count'], reverse=True)
+    assert result['top'] == ranked[:10]
+    assert result['bottom'] == ranked[-10:]
+    middle = {item['id'] for item in ranked[10:-10]}
+    assert len(result['sample']) == 20
+    assert {item['id'] for item in result['sample']} <= middle
+    assert selector.seen == 500
+
+
+def test_memory_stays_bounded():
+    selector = StreamingSelector(5, 5, 10, rng=random.Random(3))
+    for item in _items(range(10000)):
+        selector.add(item)
+        assert len(selector._items) <= 20
+    assert [item['view_count'] for item in selector.result()['top']] == [9999, 9998, 9997, 9996, 9995]
+
+
+def test_short_streams_fill_top_then_bottom_then_sample():
+    selector = StreamingSelector(2, 2, 4)
+    selector.extend(_items([5, 1, 3]))
+    result = selector.result()
+    assert [item['view_count'] for item in result['top']] == [5, 3]
+    assert [item['view_count'] for item in result['bottom']] == [1]
+    assert result['sample'] == []
+
+
+def test_reservoir_sample_is_uniform_over_the_middle():
+    counts = Counter()
+    rng = random.Random(11)
+    for _ in range(2000):
+        selector = StreamingSelector(1, 1, 2, rng=rng)
+        selector.extend(_items(range(12)))
+        counts.update(item['id'] for item in selector.result()['sample'])
+
+    # Ten middle items, two picks each time: every item expects 400
+    assert set(counts) == set(range(1, 11))
+    assert all(300 < count < 500 for count in counts.values())
@@ -0,0 +1,124 @@
+import json
+import random
+import socket
+from datetime import datetime, timezone
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import youtube_client
+from mock_youtube_api import MockYouTubeBackend
+from rate_limiter import QuotaExhaustedError
+from youtube_client import (NOT_FOUND, PERMANENT, QUOTA, RATE_LIMIT, TRANSIENT, KeyPool, RetryPolicy,
+                            classify_error, is_quota_exceeded, key_id, quota_day)
+
+
+def _pool(keys=('key-a', 'key-b'), **options):
+    return KeyPool(list(keys), client_factory=lambda api_key: object(), **options)
+
+
+def test_keys_are_charged_most_remaining_first():
+    pool = _pool(quota_per_key=100)
+    assert [pool.acquire(30) for _ in range(4)] == ['key-a', 'key-b', 'key-a', 'key-b']
+    assert pool.remaining('key-a') == pool.remaining('key-b') == 40
+
+    pool.mark_exhausted('key-a')
+    assert pool.acquire(40) == 'key-b'
+    assert pool.exhausted
+    with pytest.raises(QuotaExhaustedError):
+        pool.acquire(1)
+
+
+def test_clients_are_built_per_thread_and_key():
+    pool = _pool()
+    assert pool.client('key-a') is pool.client('key-a')
+    assert pool.client('key-a') is not pool.client('key-b')
+
+
+def test_quota_day_turns_at_midnight_pacific():
+    assert quota_day(datetime(2025, 1, 2, 7, 59, tzinfo=timezone.utc)) == '2025-01-01'
+    assert quota_day(datetime(2025, 1, 2, 8, 0, tzinfo=timezone.utc)) == '2025-01-02'
+
+
+def test_usage_is_kept_for_the_same_quota_day(tmp_path):
+    usage_file = str(tmp_path / 'key_usage.json')
+    pool = _pool(quota_per_key=100, usage_file=usage_file)
+    pool.acquire(70)
+    pool.mark_exhausted('key-b')
+    pool.save()
+
+    saved = json.loads(open(usage_file, encoding='utf-8').read())
+    assert 'key-a' not in json.dumps(saved)
+    assert saved['keys'][key_id('key-a')] == {'used': 70, 'quota_exceeded': False}
+
+    reloaded = _pool(quota_per_key=100, usage_file=usage_file)
+    assert reloaded.remaining('key-a') == 30
+    assert reloaded.remaining('key-b') == 0
+
+
+def test_usage_from_an_earlier_day_is_ignored(tmp_path, monkeypatch):
+    usage_file = str(tmp_path / 'key_usage.json')
+    pool = _pool(quota_per_key=100, usage_file=usage_file)
+    pool.acquire(90)
+    pool.save()
+
+    monkeypatch.setattr(youtube_client, 'quota_day', lambda now=None: '2099-01-01')
+    assert _pool(quota_per_key=100, usage_file=usage_file).remaining('key-a') == 100
+    # A pool left running across midnight resets too
+    assert pool.acquire(100) == 'key-a'
+
+
+def test_extractor_fails_over_when_a_key_runs_out(make_extractor):
+    backend = MockYouTubeBackend(quota_per_key=5000)
+    # The first key was spent elsewhere today, which the pool cannot know until YouTube says so
+    backend.units_by_key['MOCK-KEY-0001'] = 5000
+    extractor = make_extractor(backend, api_keys=['MOCK-KEY-0001', 'MOCK-KEY-0002'])
+
+    results = extractor.execute_api_only_extraction('out')
+
+    assert results['channels_processed'] == 5
+    assert backend.stats()['errors_by_reason']['quotaExceeded'] == 1
+    assert extractor.key_pool.summary()['…0001']['quota_exceeded']
+    assert not extractor.retry_queue.stats()
+
+
+def _http_error(status, reason=None):
+    errors = [{'reason': reason, 'message': reason}] if reason else []
+    content = json.dumps({'error': {'code': status, 'errors': errors}}).encode('utf-8')
+    return HttpError(httplib2.Response({'status': status}), content)
+
+
+@pytest.mark.parametrize('error, expected', [
+    (_http_error(403, 'quotaExceeded'), QUOTA),
+    (_http_error(403, 'dailyLimitExceeded'), QUOTA),
+    (_http_error(403, 'rateLimitExceeded'), RATE_LIMIT),
+    (_http_error(429), RATE_LIMIT),
+    (_http_error(404, 'videoNotFound'), NOT_FOUND),
+    (_http_error(503), TRANSIENT),
+    (_http_error(400, 'backendError'), TRANSIENT),
+    (_http_error(403, 'commentsDisabled'), PERMANENT),
+    (_http_error(400, 'invalidParameter'), PERMANENT),
+    (socket.timeout('timed out'), TRANSIENT),
+    (ConnectionResetError(), TRANSIENT),
+    (KeyError('items'), PERMANENT),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_only_quota_403s_are_quota_exceeded():
+    assert is_quota_exceeded(_http_error(403, 'quotaExceeded'))
+    assert not is_quota_exceeded(_http_error(403, 'forbidden'))
+    assert not is_quota_exceeded(_http_error(500, 'quotaExceeded'))
+
+
+def test_retry_policy_backs_off_with_full_jitter():
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=5.0, rng=random.Random(0))
+    assert policy.should_retry(TRANSIENT, 1) and policy.should_retry(RATE_LIMIT, 2)
+    assert not policy.should_retry(TRANSIENT, 3)
+    assert not policy.should_retry(QUOTA, 1) and not policy.should_retry(PERMANENT, 1)
+    for attempt, cap in ((1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= cap
+        assert max(delays) > cap / 2